@@ -0,0 +1,60 @@
+"""
+Print the sampled per-route database query profile
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from backend import query_profiler
+
+
+class Command(BaseCommand):
+    help = 'Report query counts, DB time and repeated SQL per route from sampled requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=3,
+            help='Repeated SQL fingerprints to show per route'
+        )
+        parser.add_argument(
+            '--flagged',
+            action='store_true',
+            help='Only routes whose query count grows with result size'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON'
+        )
+
+    def handle(self, *args, **options):
+        report = query_profiler.report(top=options['top'])
+        routes = report['routes']
+        if options['flagged']:
+            routes = [route for route in routes if route['grows_with_result_size']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(dict(report, routes=routes), indent=2))
+            return
+
+        if not routes:
+            self.stdout.write(f"No sampled requests (sample rate {report['sample_rate']:g})")
+            return
+
+        for route in routes:
+            line = (
+                f"{route['route']}: {route['avg_queries']:.1f} queries/request "
+                f"(max {route['max_queries']}), {route['avg_db_time'] * 1000:.1f} ms DB, "
+                f"{route['sampled_requests']} sampled"
+            )
+            if route['grows_with_result_size']:
+                self.stdout.write(self.style.WARNING(
+                    f"{line} -- N+1 suspect: +{route['queries_per_item']:.2f} queries per item"
+                ))
+            else:
+                self.stdout.write(line)
+            for entry in route['top_fingerprints']:
+                self.stdout.write(f"    {entry['avg_per_request']:6.1f}x  {entry['sql'][:160]}")
@@ -0,0 +1,47 @@
+"""
+Evaluate alert rules in a dedicated process
+
+Run with ENABLE_ALERTING=False on the web processes so evaluation and
+notification delivery stay out of the request workers.
+"""
+
+from django.core.management.base import BaseCommand
+
+from backend.alerting import AlertRunner
+from backend.system_sampler import start_sampler
+
+
+class Command(BaseCommand):
+    help = 'Evaluate alert rules over the recorded metric series'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Evaluate once, wait for notifications and exit'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between evaluations (default: ALERT_EVALUATION_SECONDS)'
+        )
+
+    def handle(self, *args, **options):
+        runner = AlertRunner(interval=options['interval'])
+        start_sampler()
+
+        if options['once']:
+            notified = runner.run_once()
+            if notified is None:
+                self.stdout.write(self.style.WARNING('Another process holds the alerting lock; skipped'))
+                return
+            runner.engine.notifier.drain()
+            self.stdout.write(self.style.SUCCESS(f'Evaluated alert rules: {len(notified)} notification(s)'))
+            return
+
+        self.stdout.write(f'Evaluating alert rules every {runner.interval:g}s (Ctrl+C to stop)')
+        try:
+            runner.run_forever()
+        except KeyboardInterrupt:
+            runner.engine.notifier.drain(timeout=30)
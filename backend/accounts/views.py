@@ -20,6 +20,7 @@ from .serializers import (
 from .models import User
 from django.db.models import Count, Q
 from datetime import datetime, timedelta
+from analytics.snapshots import SnapshotMixin
 
 User = get_user_model()
 
@@ -408,11 +409,12 @@ class PasswordResetConfirmView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AdminStatsView(APIView):
+class AdminStatsView(SnapshotMixin, APIView):
     """
     Admin dashboard statistics endpoint
     """
     permission_classes = [IsAuthenticated]
+    metric_set = 'user_stats'
     
     def get(self, request):
         # Check if user is admin
@@ -421,6 +423,13 @@ class AdminStatsView(APIView):
                 'error': 'Admin access required'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        snapshot = self.get_snapshot()
+        return Response({
+            **snapshot.data,
+            'snapshot': snapshot.freshness()
+        }, status=status.HTTP_200_OK)
+    
+    def compute(self, scope, time_range):
         # Calculate user statistics
         total_users = User.objects.count()
         
@@ -438,7 +447,7 @@ class AdminStatsView(APIView):
         # User role distribution
         role_distribution = User.objects.values('role').annotate(count=Count('role'))
         
-        return Response({
+        return {
             'total_users': total_users,
             'active_users': active_users,
             'total_guides': total_guides,
@@ -451,7 +460,7 @@ class AdminStatsView(APIView):
                     date_joined__lt=first_day_of_month
                 ).count()
             }
-        }, status=status.HTTP_200_OK)
+        }
 
 
 class AvailableSupportersView(APIView):
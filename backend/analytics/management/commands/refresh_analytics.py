@@ -0,0 +1,66 @@
+"""
+Recompute the dashboard analytics snapshots
+
+Run from cron with --once, or as a long-lived process that refreshes every
+ANALYTICS_SNAPSHOT_SECONDS; set ENABLE_ANALYTICS_REFRESHER=False on the web
+processes to keep the refresh out of the request workers.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Compute dashboard aggregates into analytics snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Refresh once and exit'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between refreshes (default: ANALYTICS_SNAPSHOT_SECONDS)'
+        )
+        parser.add_argument(
+            '--set',
+            action='append',
+            dest='metric_sets',
+            help=f"Metric set to refresh (repeatable; default all: {', '.join(snapshots.METRIC_SETS)})"
+        )
+
+    def handle(self, *args, **options):
+        names = options['metric_sets']
+        unknown = sorted(set(names or ()) - set(snapshots.METRIC_SETS))
+        if unknown:
+            raise CommandError(f"Unknown metric set(s): {', '.join(unknown)}")
+
+        refresher = snapshots.SnapshotRefresher(names, interval=options['interval'])
+        if not options['once']:
+            self.stdout.write(f'Refreshing analytics snapshots every {refresher.interval:g}s (Ctrl+C to stop)')
+
+        while True:
+            started = time.monotonic()
+            result = refresher.run_once()
+            elapsed = time.monotonic() - started
+            if result is None:
+                self.stdout.write(self.style.WARNING('Another process holds the analytics lock; skipped'))
+            else:
+                computed, failed = result
+                self.stdout.write(self.style.SUCCESS(
+                    f'Refreshed {computed} analytics snapshot(s) in {elapsed:.2f}s'
+                ))
+                if failed:
+                    self.stdout.write(self.style.ERROR(f'{failed} snapshot(s) failed; see the log'))
+            if options['once']:
+                return
+            try:
+                time.sleep(max(refresher.interval - elapsed, 0))
+            except KeyboardInterrupt:
+                return
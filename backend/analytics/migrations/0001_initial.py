@@ -0,0 +1,30 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:44
+
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_set', models.CharField(max_length=50)),
+                ('scope', models.CharField(default='global', help_text="'global' or e.g. 'guide:<id>'", max_length=50)),
+                ('time_range', models.CharField(default='all', max_length=10)),
+                ('data', models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('computed_at', models.DateTimeField()),
+                ('compute_seconds', models.FloatField(default=0)),
+            ],
+            options={
+                'unique_together': {('metric_set', 'scope', 'time_range')},
+            },
+        ),
+    ]
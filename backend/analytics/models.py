@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class AnalyticsSnapshot(models.Model):
+    """Latest computed aggregates of one dashboard metric set"""
+    metric_set = models.CharField(max_length=50)
+    scope = models.CharField(max_length=50, default='global', help_text="'global' or e.g. 'guide:<id>'")
+    time_range = models.CharField(max_length=10, default='all')
+
+    # Encoded the way the API renders it, so a stored snapshot is served unchanged
+    data = models.JSONField(encoder=JSONEncoder)
+    computed_at = models.DateTimeField()
+    compute_seconds = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ['metric_set', 'scope', 'time_range']
+
+    def __str__(self):
+        return f"{self.metric_set} [{self.scope}, {self.time_range}] at {self.computed_at}"
+
+    def age_seconds(self, now=None):
+        return ((now or timezone.now()) - self.computed_at).total_seconds()
+
+    def freshness(self):
+        """Freshness fields served alongside the snapshot data"""
+        return {
+            'computed_at': self.computed_at.isoformat(),
+            'age_seconds': round(max(self.age_seconds(), 0), 1),
+            'compute_seconds': round(self.compute_seconds, 3),
+        }
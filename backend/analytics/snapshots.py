@@ -0,0 +1,196 @@
+"""
+Materialized dashboard aggregates.
+
+The admin, guide and crisis dashboards each run dozens of global COUNT and
+AVG queries. Their views (SnapshotMixin) implement ``compute(scope,
+time_range)`` and serve the stored AnalyticsSnapshot for that key instead,
+which ``SnapshotRefresher`` recomputes every ANALYTICS_SNAPSHOT_SECONDS,
+in one process per host (whichever holds the analytics lock): a thread
+started by the WSGI/ASGI entry points (``ENABLE_ANALYTICS_REFRESHER``) or
+``manage.py refresh_analytics``. A missing snapshot, or one older than
+ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS (no refresher running), is computed on
+request, and ``?fresh=1`` forces a recompute. Every METRIC_SETS entry is
+checked when the app loads, so a misregistered set fails at startup.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from backend import timeseries
+
+from .models import AnalyticsSnapshot
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = 'global'
+ALL_TIME = 'all'
+
+DEFAULT_MAX_AGE_SECONDS = 900
+
+# Metric set name -> view computing it
+METRIC_SETS = {
+    'system_analytics': 'backend.analytics_views.SystemAnalyticsView',
+    'guide_analytics': 'backend.analytics_views.GuideAnalyticsView',
+    'system_stats': 'backend.admin_views.SystemStatsView',
+    'user_stats': 'accounts.views.AdminStatsView',
+    'assessment_stats': 'assessments.views.AdminAssessmentStatsView',
+    'crisis_stats': 'crisis.views.CrisisStatsView',
+}
+
+
+def max_age():
+    return getattr(settings, 'ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS)
+
+
+def metric_set_view(name):
+    """
+    View class registered for ``name``; raises ImproperlyConfigured unless
+    it is a SnapshotMixin whose ``metric_set`` is ``name`` and which
+    implements ``compute``
+    """
+    view_class = import_string(METRIC_SETS[name])
+    if not issubclass(view_class, SnapshotMixin):
+        raise ImproperlyConfigured(f"Metric set '{name}': {view_class.__qualname__} is not a SnapshotMixin")
+    if view_class.metric_set != name:
+        raise ImproperlyConfigured(
+            f"Metric set '{name}': {view_class.__qualname__}.metric_set is {view_class.metric_set!r}"
+        )
+    if not callable(getattr(view_class, 'compute', None)):
+        raise ImproperlyConfigured(f"Metric set '{name}': {view_class.__qualname__} does not implement compute()")
+    return view_class
+
+
+def check_metric_sets():
+    """Resolve every registered metric set so a bad entry fails at startup"""
+    for name in METRIC_SETS:
+        metric_set_view(name)
+
+
+def compute_snapshot(name, scope=GLOBAL_SCOPE, time_range=ALL_TIME):
+    """Compute and store the snapshot of ``name`` for ``scope`` and ``time_range``"""
+    started = time.perf_counter()
+    data = metric_set_view(name)().compute(scope, time_range)
+    snapshot, _ = AnalyticsSnapshot.objects.update_or_create(
+        metric_set=name, scope=scope, time_range=time_range,
+        defaults={
+            'data': data,
+            'computed_at': timezone.now(),
+            'compute_seconds': time.perf_counter() - started,
+        },
+    )
+    # Read back as the API would serve it
+    snapshot.data = AnalyticsSnapshot._meta.get_field('data').to_python(data)
+    return snapshot
+
+
+def get_snapshot(name, scope=GLOBAL_SCOPE, time_range=ALL_TIME, fresh=False):
+    """Stored snapshot, recomputed when ``fresh``, missing or older than the max age"""
+    if not fresh:
+        snapshot = AnalyticsSnapshot.objects.filter(
+            metric_set=name, scope=scope, time_range=time_range
+        ).first()
+        if snapshot is not None and snapshot.age_seconds() <= max_age():
+            return snapshot
+    return compute_snapshot(name, scope, time_range)
+
+
+def refresh(names=None):
+    """
+    Recompute every scope and time range of ``names`` (default: all sets);
+    returns ``(computed, failed)`` counts. A failing snapshot is logged and
+    keeps its previous value.
+    """
+    computed = failed = 0
+    for name in names or METRIC_SETS:
+        view_class = metric_set_view(name)
+        for scope in view_class.snapshot_scopes():
+            for time_range in view_class.snapshot_time_ranges:
+                try:
+                    compute_snapshot(name, scope, time_range)
+                except Exception:
+                    logger.exception("Failed to compute analytics snapshot %s [%s, %s]", name, scope, time_range)
+                    failed += 1
+                else:
+                    computed += 1
+    return computed, failed
+
+
+class SnapshotRefresher:
+    """Refreshes the snapshots every interval while holding the analytics lock"""
+
+    def __init__(self, names=None, interval=None, lock_path=None):
+        self.names = names
+        self.interval = interval or settings.ANALYTICS_SNAPSHOT_SECONDS
+        self.lock = timeseries.LeaderLock(lock_path or settings.ANALYTICS_LOCK_PATH)
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def run_once(self):
+        """``refresh()`` counts if this process is the leader; None otherwise"""
+        if not self.lock.acquire():
+            return None
+        close_old_connections()
+        try:
+            return refresh(self.names)
+        finally:
+            close_old_connections()
+
+    def run_forever(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Analytics snapshot refresh failed")
+
+    def start(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self.lock = timeseries.LeaderLock(self.lock.path)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='analytics-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_refresher = None
+
+
+def start_refresher():
+    """Start the snapshot refresher thread in this process, if enabled"""
+    global _refresher
+    if not getattr(settings, 'ENABLE_ANALYTICS_REFRESHER', True):
+        return
+    if _refresher is None:
+        _refresher = SnapshotRefresher()
+    _refresher.start()
+
+
+class SnapshotMixin:
+    """
+    APIView serving a materialized metric set. Subclasses set ``metric_set``
+    (a METRIC_SETS name) and implement ``compute(scope, time_range)``
+    returning JSON-serializable data.
+    """
+    metric_set = None
+    snapshot_time_ranges = (ALL_TIME,)
+
+    @classmethod
+    def snapshot_scopes(cls):
+        """Scopes precomputed by the refresher; others are computed on first request"""
+        return (GLOBAL_SCOPE,)
+
+    def get_snapshot(self, scope=GLOBAL_SCOPE, time_range=ALL_TIME):
+        fresh = self.request.query_params.get('fresh') == '1'
+        return get_snapshot(self.metric_set, scope, time_range, fresh=fresh)
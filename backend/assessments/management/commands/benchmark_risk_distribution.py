@@ -0,0 +1,103 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from assessments.models import Assessment, AssessmentType
+from assessments.risk import RISK_BUCKETS, risk_distribution
+
+User = get_user_model()
+
+LEVELS = list(RISK_BUCKETS) + ['minimal', 'moderate', 'severe']
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic data"""
+
+
+def legacy_risk_distribution(users):
+    """The previous per-user implementation, kept for comparison"""
+    risk_counts = dict.fromkeys(RISK_BUCKETS, 0)
+    for user in users:
+        latest_assessment = Assessment.objects.filter(user=user).order_by('-completed_at').first()
+        if latest_assessment and latest_assessment.risk_level:
+            risk_level = latest_assessment.risk_level.lower()
+            if risk_level in risk_counts:
+                risk_counts[risk_level] += 1
+        else:
+            risk_counts['low'] += 1
+    return {
+        'lowRisk': risk_counts['low'],
+        'mediumRisk': risk_counts['medium'],
+        'highRisk': risk_counts['high'],
+        'criticalRisk': risk_counts['critical']
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the latest-assessment risk distribution against synthetic users (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--assessments-per-user', type=int, default=3)
+        parser.add_argument('--skip-legacy', action='store_true',
+                            help='Only time the set-based query')
+
+    def handle(self, *args, **options):
+        for total in options['users']:
+            try:
+                with transaction.atomic():
+                    self._seed(total, options['assessments_per_user'])
+                    self._measure(total, options['skip_legacy'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _seed(self, total, per_user):
+        rng = random.Random(total)
+        assessment_type = AssessmentType.objects.create(
+            name=f'BENCH{total}', display_name='Benchmark', description='-', instructions='-'
+        )
+        users = User.objects.bulk_create(
+            [User(email=f'bench{i}@example.invalid', username=f'bench{i}', role='user') for i in range(total)],
+            batch_size=2000,
+        )
+        Assessment.objects.bulk_create(
+            [
+                Assessment(
+                    user=user, assessment_type=assessment_type, total_score=0,
+                    risk_level=rng.choice(LEVELS), interpretation='-',
+                )
+                for user in users[: total * 9 // 10]
+                for _ in range(rng.randint(1, per_user))
+            ],
+            batch_size=2000,
+        )
+
+    def _measure(self, total, skip_legacy):
+        users = User.objects.filter(role='user', email__endswith='@example.invalid')
+        runs = [('set-based', lambda: risk_distribution(users, unassessed_as_low=True))]
+        if not skip_legacy:
+            runs.append(('legacy', lambda: legacy_risk_distribution(users)))
+
+        results = {}
+        for label, run in runs:
+            queries = 0
+
+            def count_queries(execute, *args):
+                nonlocal queries
+                queries += 1
+                return execute(*args)
+
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                results[label] = run()
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{total:>7} users  {label:<10} {queries:>7} queries  {elapsed * 1000:>10.1f} ms'
+            )
+
+        if len(set(map(repr, results.values()))) > 1:
+            self.stdout.write(self.style.ERROR(f'Results differ: {results}'))
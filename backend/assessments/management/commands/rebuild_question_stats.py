@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db.models import BigIntegerField, Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from assessments.models import (
+    Assessment, AssessmentQuestion, AssessmentResponse, AssessmentType, QuestionOption
+)
+
+
+def aggregate_of(model, fk, aggregate):
+    """Correlated subquery of ``aggregate`` over ``model`` rows pointing at the outer row"""
+    values = (
+        model.objects.filter(**{fk: OuterRef('pk')})
+        .order_by()
+        .values(fk)
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Coalesce(Subquery(values, output_field=BigIntegerField()), 0)
+
+
+def rebuild_question_stats():
+    """Recompute the assessment answer counters from source rows; returns rows fixed per model"""
+    targets = [
+        (AssessmentQuestion, {
+            'response_count': aggregate_of(AssessmentResponse, 'question', Count('pk')),
+            'response_score_sum': aggregate_of(AssessmentResponse, 'question', Sum('response_value')),
+        }),
+        (QuestionOption, {
+            'response_count': aggregate_of(AssessmentResponse, 'selected_option_id', Count('pk')),
+        }),
+        (AssessmentType, {
+            'assessment_count': aggregate_of(Assessment, 'assessment_type', Count('pk')),
+            'assessment_score_sum': aggregate_of(Assessment, 'assessment_type', Sum('total_score')),
+        }),
+    ]
+    fixed = {}
+    for model, counters in targets:
+        expected = {f'expected_{field}': value for field, value in counters.items()}
+        drifted = Q()
+        for field in counters:
+            drifted |= ~Q(**{f'expected_{field}': F(field)})
+        # Only rewrite rows that drifted
+        fixed[model.__name__] = (
+            model.objects.annotate(**expected)
+            .filter(drifted)
+            .update(**counters)
+        )
+    return fixed
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-question, per-option and per-type assessment answer counters'
+
+    def handle(self, *args, **options):
+        for model, rows in rebuild_question_stats().items():
+            self.stdout.write(f'{model}: {rows} row(s) corrected')
+        self.stdout.write(self.style.SUCCESS('Assessment answer counters rebuilt'))
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:40
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    AssessmentType = apps.get_model('assessments', 'AssessmentType')
+    AssessmentQuestion = apps.get_model('assessments', 'AssessmentQuestion')
+    QuestionOption = apps.get_model('assessments', 'QuestionOption')
+    Assessment = apps.get_model('assessments', 'Assessment')
+    AssessmentResponse = apps.get_model('assessments', 'AssessmentResponse')
+
+    def aggregate_of(model, fk, aggregate):
+        values = (
+            model.objects.filter(**{fk: OuterRef('pk')})
+            .order_by().values(fk).annotate(value=aggregate).values('value')
+        )
+        return Coalesce(Subquery(values, output_field=BigIntegerField()), 0)
+
+    AssessmentQuestion.objects.update(
+        response_count=aggregate_of(AssessmentResponse, 'question', Count('pk')),
+        response_score_sum=aggregate_of(AssessmentResponse, 'question', Sum('response_value')),
+    )
+    QuestionOption.objects.update(
+        response_count=aggregate_of(AssessmentResponse, 'selected_option_id', Count('pk')),
+    )
+    AssessmentType.objects.update(
+        assessment_count=aggregate_of(Assessment, 'assessment_type', Count('pk')),
+        assessment_score_sum=aggregate_of(Assessment, 'assessment_type', Sum('total_score')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_assessment_user_latest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='response_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='response_score_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmenttype',
+            name='assessment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmenttype',
+            name='assessment_score_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='questionoption',
+            name='response_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -4,7 +4,25 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import json
 
-class AssessmentType(models.Model):
+from backend.counters import CounterFieldsMixin, apply_counter_deltas
+
+
+def record_response_stats(responses, sign=1):
+    """
+    Count ``(question_id, option_id, response_value)`` rows into the
+    question and option answer counters (``sign=-1`` to remove them)
+    """
+    questions, options = {}, {}
+    for question_id, option_id, value in responses:
+        changes = questions.setdefault(question_id, {'response_count': 0, 'response_score_sum': 0})
+        changes['response_count'] += sign
+        changes['response_score_sum'] += sign * value
+        if option_id:
+            options.setdefault(option_id, {'response_count': 0})['response_count'] += sign
+    apply_counter_deltas(AssessmentQuestion, questions)
+    apply_counter_deltas(QuestionOption, options)
+
+class AssessmentType(CounterFieldsMixin, models.Model):
     """Types of mental health assessments available"""
     # Standard assessment types (for reference)
     STANDARD_ASSESSMENT_CHOICES = [
@@ -21,6 +39,11 @@ class AssessmentType(models.Model):
     max_score = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     is_standard = models.BooleanField(default=False, help_text="True for standard assessments (PHQ9, GAD7, PCL5)")
+    # Completed assessments and their summed total_score, maintained by
+    # Assessment.save and the post_delete handler in signals.py
+    assessment_count = models.PositiveIntegerField(default=0)
+    assessment_score_sum = models.BigIntegerField(default=0)
+    counter_fields = ('assessment_count', 'assessment_score_sum')
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, help_text="User who created this assessment type")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -53,7 +76,7 @@ class AssessmentType(models.Model):
     def __str__(self):
         return self.display_name
 
-class AssessmentQuestion(models.Model):
+class AssessmentQuestion(CounterFieldsMixin, models.Model):
     """Individual questions for each assessment type"""
     QUESTION_TYPES = [
         ('multiple_choice', 'Multiple Choice'),
@@ -73,6 +96,11 @@ class AssessmentQuestion(models.Model):
     min_value = models.IntegerField(null=True, blank=True)  # For rating scales
     max_value = models.IntegerField(null=True, blank=True)  # For rating scales
     scale_labels = models.JSONField(null=True, blank=True)  # For custom scale labels
+    # Answers and their summed response_value, maintained by
+    # AssessmentResponse.save, record_response_stats and signals.py
+    response_count = models.PositiveIntegerField(default=0)
+    response_score_sum = models.BigIntegerField(default=0)
+    counter_fields = ('response_count', 'response_score_sum')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -105,20 +133,43 @@ class Assessment(models.Model):
     class Meta:
         db_table = 'assessments_assessment'
         ordering = ['-completed_at']
+        indexes = [
+            # Latest assessment per user (risk distribution, dashboards)
+            models.Index(fields=['user', '-completed_at'], name='assess_user_latest'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.assessment_type.name} ({self.completed_at.date()})"
 
+    def save(self, *args, **kwargs):
+        previous = None
+        if self.pk:
+            previous = Assessment.objects.filter(pk=self.pk).values('assessment_type_id', 'total_score').first()
+        super().save(*args, **kwargs)
+
+        deltas = {}
+        if previous:
+            changes = deltas.setdefault(previous['assessment_type_id'], {'assessment_count': 0, 'assessment_score_sum': 0})
+            changes['assessment_count'] -= 1
+            changes['assessment_score_sum'] -= previous['total_score']
+        changes = deltas.setdefault(self.assessment_type_id, {'assessment_count': 0, 'assessment_score_sum': 0})
+        changes['assessment_count'] += 1
+        changes['assessment_score_sum'] += self.total_score
+        apply_counter_deltas(AssessmentType, deltas)
+
     def get_percentage_score(self):
         """Calculate percentage score"""
         return round((self.total_score / self.assessment_type.max_score) * 100, 1)
 
-class QuestionOption(models.Model):
+class QuestionOption(CounterFieldsMixin, models.Model):
     """Options for multiple choice questions"""
     question = models.ForeignKey(AssessmentQuestion, on_delete=models.CASCADE, related_name='options')
     text = models.CharField(max_length=500)
     score = models.IntegerField()
     order = models.PositiveIntegerField(default=0)
+    # Answers selecting this option, maintained with the question counters
+    response_count = models.PositiveIntegerField(default=0)
+    counter_fields = ('response_count',)
     
     class Meta:
         db_table = 'assessments_question_option'
@@ -142,6 +193,18 @@ class AssessmentResponse(models.Model):
         db_table = 'assessments_response'
         unique_together = ['assessment', 'question']
 
+    def save(self, *args, **kwargs):
+        previous = None
+        if self.pk:
+            previous = AssessmentResponse.objects.filter(pk=self.pk).values_list(
+                'question_id', 'selected_option_id_id', 'response_value'
+            ).first()
+        super().save(*args, **kwargs)
+
+        if previous:
+            record_response_stats([previous], sign=-1)
+        record_response_stats([(self.question_id, self.selected_option_id_id, self.response_value)])
+
     def __str__(self):
         return f"{self.assessment} - Q{self.question.question_number}: {self.response_value}"
 
@@ -2,7 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db.models import Avg, Count, Q
-from .models import AssessmentType, AssessmentQuestion, Assessment, AssessmentResponse
+from .models import AssessmentType, AssessmentQuestion, Assessment, AssessmentResponse, QuestionOption
 import json
 
 User = get_user_model()
@@ -22,7 +22,8 @@ class QuestionResponseTracker:
             question = AssessmentQuestion.objects.get(id=question_id)
             user = User.objects.get(id=user_id)
             
-            # Create or update the response
+            # Create or update the response; AssessmentResponse.save moves
+            # the answer between the question/option counters
             response, created = AssessmentResponse.objects.update_or_create(
                 assessment=assessment,
                 question=question,
@@ -33,9 +34,6 @@ class QuestionResponseTracker:
                 }
             )
             
-            # Update real-time analytics
-            QuestionResponseTracker.update_question_analytics(question_id)
-            
             return {
                 'success': True,
                 'response_id': response.id,
@@ -49,40 +47,33 @@ class QuestionResponseTracker:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _options_by_question(questions):
+        """Options of ``questions`` with their answer counters, in display order"""
+        options = {}
+        for option in QuestionOption.objects.filter(question__in=questions).order_by('question_id', 'order', 'pk'):
+            options.setdefault(option.question_id, []).append(option)
+        return options
+
     @staticmethod
     def update_question_analytics(question_id):
         """
-        Update real-time analytics for a specific question
+        Real-time analytics for a specific question, read from its
+        answer counters
         """
         try:
             question = AssessmentQuestion.objects.get(id=question_id)
-            
-            # Get all responses for this question
-            responses = AssessmentResponse.objects.filter(question=question)
-            
-            # Calculate analytics
-            total_responses = responses.count()
-            avg_score = responses.aggregate(avg_score=Avg('response_value'))['avg_score'] or 0
-            
-            # Calculate option distribution
-            option_distribution = {}
-            for option in question.options.all():
-                count = responses.filter(selected_option_id=option.id).count()
-                option_distribution[option.text] = count
-            
-            # Store analytics in cache or update question metadata
-            analytics_data = {
+            options = QuestionResponseTracker._options_by_question([question]).get(question.id, [])
+            total_responses = question.response_count
+            avg_score = question.response_score_sum / total_responses if total_responses else 0
+
+            return {
                 'total_responses': total_responses,
                 'average_score': round(avg_score, 2),
-                'option_distribution': option_distribution,
+                'option_distribution': {option.text: option.response_count for option in options},
                 'last_updated': timezone.now().isoformat()
             }
             
-            # You could store this in Redis cache for real-time access
-            # or update a separate analytics table
-            
-            return analytics_data
-            
         except Exception as e:
             return {'error': str(e)}
     
@@ -90,46 +81,40 @@ class QuestionResponseTracker:
     def get_real_time_question_analytics(question_id=None, assessment_type_id=None):
         """
         Get real-time analytics for questions
+
+        Reads the per-question and per-option answer counters: two queries
+        regardless of how many responses have been recorded.
         """
         try:
+            questions = AssessmentQuestion.objects.filter(response_count__gt=0).select_related('assessment_type')
             if question_id:
-                questions = AssessmentQuestion.objects.filter(id=question_id)
+                questions = questions.filter(id=question_id)
             elif assessment_type_id:
-                questions = AssessmentQuestion.objects.filter(assessment_type_id=assessment_type_id)
-            else:
-                questions = AssessmentQuestion.objects.all()
+                questions = questions.filter(assessment_type_id=assessment_type_id)
+            questions = list(questions)
+            options = QuestionResponseTracker._options_by_question(questions)
             
             analytics_data = []
             
             for question in questions:
-                responses = AssessmentResponse.objects.filter(question=question)
-                total_responses = responses.count()
-                
-                if total_responses > 0:
-                    avg_score = responses.aggregate(avg_score=Avg('response_value'))['avg_score'] or 0
-                    
-                    # Option distribution
-                    option_distribution = {}
-                    option_percentages = {}
-                    
-                    for option in question.options.all():
-                        count = responses.filter(selected_option_id=option.id).count()
-                        option_distribution[option.text] = count
-                        option_percentages[option.text] = (count / total_responses) * 100 if total_responses > 0 else 0
-                    
-                    analytics_data.append({
-                        'question_id': question.id,
-                        'question_text': question.question_text,
-                        'assessment_type': question.assessment_type.name,
-                        'total_responses': total_responses,
-                        'average_score': round(avg_score, 2),
-                        'option_distribution': option_distribution,
-                        'option_percentages': {k: round(v, 1) for k, v in option_percentages.items()},
-                        'options': [
-                            {'text': opt.text, 'score': opt.score}
-                            for opt in question.options.all()
-                        ]
-                    })
+                total_responses = question.response_count
+                question_options = options.get(question.id, [])
+                analytics_data.append({
+                    'question_id': question.id,
+                    'question_text': question.question_text,
+                    'assessment_type': question.assessment_type.name,
+                    'total_responses': total_responses,
+                    'average_score': round(question.response_score_sum / total_responses, 2),
+                    'option_distribution': {opt.text: opt.response_count for opt in question_options},
+                    'option_percentages': {
+                        opt.text: round(opt.response_count / total_responses * 100, 1)
+                        for opt in question_options
+                    },
+                    'options': [
+                        {'text': opt.text, 'score': opt.score}
+                        for opt in question_options
+                    ]
+                })
             
             return {
                 'questions': analytics_data,
@@ -189,38 +174,30 @@ class QuestionResponseTracker:
     def get_assessment_completion_rates():
         """
         Get completion rates for different assessment types
+
+        Assessments are only stored once submitted, so every counted
+        assessment is a completed one. Reads the per-type counters.
         """
         try:
-            assessment_types = AssessmentType.objects.all()
             completion_data = []
             
-            for assessment_type in assessment_types:
-                total_started = Assessment.objects.filter(assessment_type=assessment_type).count()
-                total_completed = Assessment.objects.filter(
-                    assessment_type=assessment_type, 
-                    is_completed=True
-                ).count()
-                
-                completion_rate = (total_completed / total_started * 100) if total_started > 0 else 0
-                
+            for assessment_type in AssessmentType.objects.order_by('pk'):
+                total = assessment_type.assessment_count
                 completion_data.append({
                     'assessment_type': assessment_type.name,
                     'display_name': assessment_type.display_name,
-                    'total_started': total_started,
-                    'total_completed': total_completed,
-                    'completion_rate': round(completion_rate, 1),
-                    'average_score': Assessment.objects.filter(
-                        assessment_type=assessment_type,
-                        is_completed=True
-                    ).aggregate(avg_score=Avg('total_score'))['avg_score'] or 0
+                    'total_started': total,
+                    'total_completed': total,
+                    'completion_rate': 100.0 if total else 0,
+                    'average_score': assessment_type.assessment_score_sum / total if total else 0
                 })
             
+            total_started = sum(d['total_started'] for d in completion_data)
             return {
                 'assessment_types': completion_data,
                 'overall_completion_rate': round(
-                    sum(d['total_completed'] for d in completion_data) / 
-                    sum(d['total_started'] for d in completion_data) * 100, 1
-                ) if sum(d['total_started'] for d in completion_data) > 0 else 0
+                    sum(d['total_completed'] for d in completion_data) / total_started * 100, 1
+                ) if total_started > 0 else 0
             }
             
         except Exception as e:
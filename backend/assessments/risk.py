@@ -0,0 +1,74 @@
+"""
+Risk distribution over each user's latest assessment.
+
+The analytics dashboards bucket users by the risk level of their most
+recent assessment. This is done in one grouped query: the latest risk
+level is a correlated subquery per user and the outer query counts users
+per level, instead of one "latest assessment" query per user.
+"""
+
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Lower
+
+from backend.time_buckets import bucketed
+
+from .models import Assessment
+
+RISK_BUCKETS = ('low', 'medium', 'high', 'critical')
+
+# Levels treated as elevated risk in trend charts (both the scored
+# assessment scale and the dashboard buckets)
+ELEVATED_RISK_LEVELS = ('moderately_severe', 'severe', 'high', 'critical')
+
+
+def latest_risk_level(user_ref='pk'):
+    """Subquery for the risk level of the user's most recent assessment"""
+    return Subquery(
+        Assessment.objects.filter(user=OuterRef(user_ref))
+        .order_by('-completed_at', '-pk')
+        .values('risk_level')[:1]
+    )
+
+
+def risk_distribution(users, unassessed_as_low=False):
+    """
+    Count ``users`` per latest risk bucket.
+
+    Levels outside RISK_BUCKETS are not counted. Users without an
+    assessment (or with a blank level) count as low risk only when
+    ``unassessed_as_low`` is set.
+    """
+    counts = dict.fromkeys(RISK_BUCKETS, 0)
+    rows = (
+        users.order_by()
+        .annotate(latest_risk=Lower(latest_risk_level()))
+        .values('latest_risk')
+        .annotate(total=Count('pk'))
+    )
+    for row in rows:
+        level = row['latest_risk']
+        if not level:
+            if unassessed_as_low:
+                counts['low'] += row['total']
+        elif level in counts:
+            counts[level] += row['total']
+
+    return {
+        'lowRisk': counts['low'],
+        'mediumRisk': counts['medium'],
+        'highRisk': counts['high'],
+        'criticalRisk': counts['critical']
+    }
+
+
+def risk_trend(assessments, buckets=7):
+    """Daily share (%) of ``assessments`` at an elevated risk level, oldest first"""
+    rows = bucketed(
+        assessments, 'completed_at', 'day', buckets,
+        total=Count('pk'),
+        elevated=Count('pk', filter=Q(risk_level__in=ELEVATED_RISK_LEVELS)),
+    )
+    return [
+        round(row['elevated'] / row['total'] * 100, 1) if row['total'] else 0
+        for row in rows
+    ]
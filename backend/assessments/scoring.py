@@ -0,0 +1,173 @@
+"""
+Compiled scoring tables for assessment submissions.
+
+Scoring a submission needs, per question, the option scores in display
+order and whether the question is reverse scored, plus the risk bands of
+the assessment type. ``get_scoring_table`` compiles these once per
+assessment type into an immutable ScoringTable (two queries) and keeps it
+in a per-process dict, so a submission is scored in memory.
+
+A table is tagged with the ``updated_at`` of its AssessmentType. Saving or
+deleting a question or option bumps that timestamp (see signals.py), and
+the submit view already loads the type, so every worker notices the
+change on its next submission and recompiles.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from .models import AssessmentQuestion, QuestionOption
+
+
+class ScoringError(ValueError):
+    """A submitted response that cannot be scored against the table"""
+
+
+@dataclass(frozen=True)
+class RiskBands:
+    """Risk levels by percentage of the maximum score"""
+
+    bounds: tuple  # ascending upper bounds, one fewer than levels
+    levels: tuple
+    inclusive: bool = True  # whether a score on a bound belongs to the lower level
+
+    def level(self, percentage):
+        find = bisect_left if self.inclusive else bisect_right
+        return self.levels[find(self.bounds, percentage)]
+
+
+DEFAULT_RISK_BANDS = RiskBands((25, 50, 75), ('minimal', 'mild', 'moderate', 'severe'))
+
+RISK_BANDS = {
+    # PHQ-9: 0-4, 5-9, 10-14, 15-19, 20-27
+    'PHQ9': RiskBands((20, 40, 60, 80), ('minimal', 'mild', 'moderate', 'moderately_severe', 'severe')),
+    # GAD-7: 0-4, 5-9, 10-14, 15-21
+    'GAD7': DEFAULT_RISK_BANDS,
+    # PCL-5: < 33, 33-43, 44-52, 53+
+    'PCL5': RiskBands((50, 65, 80), ('minimal', 'mild', 'moderate', 'severe'), inclusive=False),
+}
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    """Option IDs and scores of one question, in display order"""
+
+    question_id: int
+    option_ids: tuple
+    scores: tuple
+    reverse_scored: bool
+    max_option_score: int = 0
+
+    def score(self, index):
+        """``(option_id, score)`` for the option at ``index``"""
+        if not 0 <= index < len(self.scores):
+            raise ScoringError(
+                f"Invalid option index {index} for question. Available options: {len(self.scores)}."
+            )
+        score = self.scores[index]
+        if self.reverse_scored:
+            score = self.max_option_score - score
+        return self.option_ids[index], score
+
+
+@dataclass(frozen=True)
+class ScoredResponse:
+    question_id: int
+    option_id: int
+    score: int
+
+
+@dataclass(frozen=True)
+class ScoringTable:
+    """Everything needed to score one assessment type's submissions"""
+
+    assessment_type_id: int
+    version: object  # AssessmentType.updated_at when compiled
+    max_score: int
+    questions: MappingProxyType
+    risk_bands: RiskBands
+
+    def score(self, responses):
+        """Score ``[{'question_id', 'selected_option_index'}]``; returns (total, [ScoredResponse])"""
+        scored = []
+        answered = set()
+        for response in responses:
+            question = self.questions.get(response['question_id'])
+            if question is None:
+                raise ScoringError(
+                    "Invalid question ID or question does not belong to this assessment type."
+                )
+            if question.question_id in answered:
+                raise ScoringError(f"Question {question.question_id} was answered more than once.")
+            answered.add(question.question_id)
+            option_id, score = question.score(response['selected_option_index'])
+            scored.append(ScoredResponse(question.question_id, option_id, score))
+        return sum(response.score for response in scored), scored
+
+    def risk_level(self, total_score):
+        if self.max_score <= 0:
+            return 'minimal'
+        return self.risk_bands.level(total_score / self.max_score * 100)
+
+    def percentage(self, total_score):
+        if self.max_score <= 0:
+            return 0
+        return round(total_score / self.max_score * 100, 1)
+
+
+def compile_table(assessment_type):
+    """Build the ScoringTable of ``assessment_type`` from the database"""
+    options = {}
+    for option_id, question_id, score in (
+        QuestionOption.objects.filter(question__assessment_type=assessment_type)
+        .order_by('question_id', 'order', 'pk')
+        .values_list('pk', 'question_id', 'score')
+    ):
+        options.setdefault(question_id, []).append((option_id, score))
+
+    questions = {}
+    for question_id, reverse_scored in AssessmentQuestion.objects.filter(
+        assessment_type=assessment_type
+    ).values_list('pk', 'is_reverse_scored'):
+        question_options = options.get(question_id, [])
+        questions[question_id] = CompiledQuestion(
+            question_id=question_id,
+            option_ids=tuple(option_id for option_id, _ in question_options),
+            scores=tuple(score for _, score in question_options),
+            reverse_scored=reverse_scored,
+            max_option_score=max((score for _, score in question_options), default=0),
+        )
+
+    return ScoringTable(
+        assessment_type_id=assessment_type.pk,
+        version=assessment_type.updated_at,
+        max_score=assessment_type.max_score,
+        questions=MappingProxyType(questions),
+        risk_bands=RISK_BANDS.get(assessment_type.name, DEFAULT_RISK_BANDS),
+    )
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def get_scoring_table(assessment_type):
+    """Compiled table for ``assessment_type``, rebuilt when the type has changed"""
+    table = _tables.get(assessment_type.pk)
+    if (table is None or table.version != assessment_type.updated_at
+            or table.max_score != assessment_type.max_score):
+        table = compile_table(assessment_type)
+        with _lock:
+            _tables[assessment_type.pk] = table
+    return table
+
+
+def invalidate(assessment_type_id=None):
+    """Drop this process's compiled table(s)"""
+    with _lock:
+        if assessment_type_id is None:
+            _tables.clear()
+        else:
+            _tables.pop(assessment_type_id, None)
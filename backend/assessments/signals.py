@@ -0,0 +1,66 @@
+"""
+Invalidate compiled scoring tables when questions or options change, and
+release the answer counters of deleted assessments and options.
+
+Bumping ``AssessmentType.updated_at`` with a queryset update (no save
+signals) marks the table stale in every worker; see scoring.py.
+The responses of a deleted assessment or option are taken off the
+counters by its pre_delete, which also fires for cascaded and bulk
+deletes. AssessmentResponse has no receivers of its own, so the cascade
+removes its rows with one DELETE; deleting responses directly is
+therefore not tracked, and ``manage.py rebuild_question_stats`` corrects
+the counters afterwards.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from backend.counters import apply_counter_deltas
+
+from . import scoring
+from .models import (
+    Assessment, AssessmentQuestion, AssessmentResponse, AssessmentType, QuestionOption,
+    record_response_stats
+)
+
+
+def touch_assessment_type(assessment_type_id):
+    AssessmentType.objects.filter(pk=assessment_type_id).update(updated_at=timezone.now())
+    scoring.invalidate(assessment_type_id)
+
+
+@receiver([post_save, post_delete], sender=AssessmentQuestion)
+def question_changed(sender, instance, **kwargs):
+    touch_assessment_type(instance.assessment_type_id)
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def option_changed(sender, instance, **kwargs):
+    assessment_type_id = (
+        AssessmentQuestion.objects.filter(pk=instance.question_id)
+        .values_list('assessment_type_id', flat=True).first()
+    )
+    if assessment_type_id is not None:
+        touch_assessment_type(assessment_type_id)
+
+
+@receiver(pre_delete, sender=QuestionOption)
+def release_option_stats(sender, instance, **kwargs):
+    record_response_stats(
+        AssessmentResponse.objects.filter(selected_option_id=instance)
+        .values_list('question_id', 'selected_option_id', 'response_value'),
+        sign=-1
+    )
+
+
+@receiver(pre_delete, sender=Assessment)
+def release_assessment_stats(sender, instance, **kwargs):
+    record_response_stats(
+        AssessmentResponse.objects.filter(assessment=instance)
+        .values_list('question_id', 'selected_option_id', 'response_value'),
+        sign=-1
+    )
+    apply_counter_deltas(AssessmentType, {
+        instance.assessment_type_id: {'assessment_count': -1, 'assessment_score_sum': -instance.total_score}
+    })
@@ -7,7 +7,8 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction
 from .models import (
     AssessmentType, AssessmentQuestion, Assessment, AssessmentResponse, 
-    AssessmentRecommendation, AssessmentRequest, ClientAssessmentAssignment
+    AssessmentRecommendation, AssessmentRequest, ClientAssessmentAssignment,
+    record_response_stats
 )
 from .serializers import (
     AssessmentTypeSerializer, AssessmentSerializer, TakeAssessmentSerializer,
@@ -16,10 +17,15 @@ from .serializers import (
     ClientAssessmentAssignmentSerializer, CreateAssignmentSerializer,
     CreateAssessmentTypeSerializer
 )
+from .scoring import ScoringError, get_scoring_table
+from analytics.snapshots import SnapshotMixin
 from accounts.permissions import HasCompletedOnboarding
 from django.db.models import Count, Avg
 from datetime import datetime, timedelta
 from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
 
 class AssessmentTypeListView(generics.ListAPIView):
     """List available assessment types"""
@@ -61,62 +67,19 @@ class TakeAssessmentView(APIView):
         assessment_type_id = serializer.validated_data['assessment_type_id']
         responses_data = serializer.validated_data['responses']
 
+        try:
+            assessment_type = AssessmentType.objects.get(id=assessment_type_id)
+            table = get_scoring_table(assessment_type)
+            total_score, scored = table.score(responses_data)
+        except ScoringError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        risk_level = table.risk_level(total_score)
+        interpretation = self._get_interpretation(assessment_type, risk_level, total_score)
+        recommendations = self._get_recommendations(assessment_type, risk_level)
+
         try:
             with transaction.atomic():
-                assessment_type = AssessmentType.objects.get(id=assessment_type_id)
-                print(f"Processing assessment submission for type: {assessment_type.name} (ID: {assessment_type.id})")
-
-                # Calculate total score
-                total_score = 0
-                assessment_responses = []
-
-                for response_data in responses_data:
-                    print(f"Processing response: {response_data}")
-                    question = AssessmentQuestion.objects.get(
-                        id=response_data['question_id'],
-                        assessment_type=assessment_type
-                    )
-                    print(f"Found question: {question.question_text} (ID: {question.id})")
-
-                    selected_index = response_data['selected_option_index']
-
-                    # Get score from question options
-                    options = list(question.options.all().order_by('order'))
-                    print(f"Question has {len(options)} options, selected index: {selected_index}")
-                    if selected_index < len(options):
-                        score = options[selected_index].score
-                        print(f"Selected option: '{options[selected_index].text}' with score: {score}")
-                        if question.is_reverse_scored:
-                            # Reverse scoring logic
-                            max_score = max([opt.score for opt in options])
-                            score = max_score - score
-                            print(f"Reverse scored: {score}")
-                    else:
-                        print(f"ERROR: Invalid option index {selected_index} for question with {len(options)} options")
-                        return Response(
-                            {"error": f"Invalid option index {selected_index} for question. Available options: {len(options)}."},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-
-                    total_score += score
-                    print(f"Running total score: {total_score}")
-                    assessment_responses.append({
-                        'question': question,
-                        'selected_option_index': selected_index,
-                        'score': score
-                    })
-
-                # Determine risk level based on assessment type and score
-                if assessment_type.max_score > 0:
-                    risk_level = self._calculate_risk_level(assessment_type, total_score)
-                else:
-                    risk_level = 'minimal'  # Default if max_score is 0
-
-                # Get interpretation and recommendations
-                interpretation = self._get_interpretation(assessment_type, risk_level, total_score)
-                recommendations = self._get_recommendations(assessment_type, risk_level)
-
-                # Create assessment record
                 assessment = Assessment.objects.create(
                     user=request.user,
                     assessment_type=assessment_type,
@@ -125,109 +88,43 @@ class TakeAssessmentView(APIView):
                     interpretation=interpretation,
                     recommendations=recommendations
                 )
-
-                # Create response records
-                print(f"Creating {len(assessment_responses)} response records...")
-                for response_data in assessment_responses:
-                    # Get the selected option object
-                    question = response_data['question']
-                    selected_index = response_data['selected_option_index']
-                    options = list(question.options.all().order_by('order'))
-                    selected_option = options[selected_index] if selected_index < len(options) else None
-                    
-                    print(f"Creating response for question {question.id}: option {selected_option.text if selected_option else 'None'}, score {response_data['score']}")
-                    
-                    AssessmentResponse.objects.create(
+                AssessmentResponse.objects.bulk_create([
+                    AssessmentResponse(
                         assessment=assessment,
-                        question=question,
-                        selected_option_id=selected_option,
-                        response_value=response_data['score']
+                        question_id=response.question_id,
+                        selected_option_id_id=response.option_id,
+                        response_value=response.score
                     )
-
-                # Return assessment results
-                print(f"Assessment completed successfully! Final score: {total_score}, Risk level: {risk_level}")
-                
-                # Create a simple response without the complex serializer to avoid field issues
-                response_data = {
-                    'id': assessment.id,
-                    'assessment_type': {
-                        'id': assessment_type.id,
-                        'name': assessment_type.name,
-                        'display_name': assessment_type.display_name
-                    },
-                    'total_score': total_score,
-                    'risk_level': risk_level,
-                    'interpretation': interpretation,
-                    'recommendations': recommendations,
-                    'completed_at': assessment.completed_at.isoformat(),
-                    'percentage_score': round((total_score / assessment_type.max_score) * 100, 1)
-                }
-                
-                return Response(response_data, status=status.HTTP_201_CREATED)
-
-        except AssessmentQuestion.DoesNotExist as e:
-            print(f"Question not found error: {e}")
-            return Response(
-                {"error": "Invalid question ID or question does not belong to this assessment type."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+                    for response in scored
+                ])
+                # bulk_create skips AssessmentResponse.save; count the answers here
+                record_response_stats(
+                    (response.question_id, response.option_id, response.score) for response in scored
+                )
         except Exception as e:
-            print(f"Unexpected error in assessment submission: {e}")
-            print(f"Error type: {type(e).__name__}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to save assessment submission")
             return Response(
                 {"error": f"An error occurred while processing the assessment: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _calculate_risk_level(self, assessment_type, total_score):
-        """Calculate risk level based on assessment type and score"""
-        if assessment_type.max_score == 0:
-            return 'minimal'
-        percentage = (total_score / assessment_type.max_score) * 100
-
-        if assessment_type.name == 'PHQ9':
-            if percentage <= 20:  # 0-4
-                return 'minimal'
-            elif percentage <= 40:  # 5-9
-                return 'mild'
-            elif percentage <= 60:  # 10-14
-                return 'moderate'
-            elif percentage <= 80:  # 15-19
-                return 'moderately_severe'
-            else:  # 20-27
-                return 'severe'
-
-        elif assessment_type.name == 'GAD7':
-            if percentage <= 25:  # 0-4
-                return 'minimal'
-            elif percentage <= 50:  # 5-9
-                return 'mild'
-            elif percentage <= 75:  # 10-14
-                return 'moderate'
-            else:  # 15-21
-                return 'severe'
-
-        elif assessment_type.name == 'PCL5':
-            if percentage < 50:  # < 33
-                return 'minimal'
-            elif percentage < 65:  # 33-43
-                return 'mild'
-            elif percentage < 80:  # 44-52
-                return 'moderate'
-            else:  # 53+
-                return 'severe'
-
-        # Default categorization
-        if percentage <= 25:
-            return 'minimal'
-        elif percentage <= 50:
-            return 'mild'
-        elif percentage <= 75:
-            return 'moderate'
-        else:
-            return 'severe'
+        # Create a simple response without the complex serializer to avoid field issues
+        response_data = {
+            'id': assessment.id,
+            'assessment_type': {
+                'id': assessment_type.id,
+                'name': assessment_type.name,
+                'display_name': assessment_type.display_name
+            },
+            'total_score': total_score,
+            'risk_level': risk_level,
+            'interpretation': interpretation,
+            'recommendations': recommendations,
+            'completed_at': assessment.completed_at.isoformat(),
+            'percentage_score': table.percentage(total_score)
+        }
+
+        return Response(response_data, status=status.HTTP_201_CREATED)
 
     def _get_interpretation(self, assessment_type, risk_level, total_score):
         """Get interpretation text based on results"""
@@ -551,11 +448,12 @@ class AdminDashboardStatsView(APIView):
         return Response(stats)
 
 
-class AdminAssessmentStatsView(APIView):
+class AdminAssessmentStatsView(SnapshotMixin, APIView):
     """
     Admin dashboard assessment statistics endpoint
     """
     permission_classes = [IsAuthenticated]
+    metric_set = 'assessment_stats'
     
     def get(self, request):
         # Check if user is admin
@@ -564,6 +462,13 @@ class AdminAssessmentStatsView(APIView):
                 'error': 'Admin access required'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        snapshot = self.get_snapshot()
+        return Response({
+            **snapshot.data,
+            'snapshot': snapshot.freshness()
+        }, status=status.HTTP_200_OK)
+    
+    def compute(self, scope, time_range):
         # Total assessments taken
         total_assessments = Assessment.objects.count()
         
@@ -593,7 +498,7 @@ class AdminAssessmentStatsView(APIView):
                     'average_score': round(avg_score, 2)
                 })
         
-        return Response({
+        return {
             'total_assessments': total_assessments,
             'assessments_this_month': assessments_this_month,
             'completion_rate': round(completion_rate, 2),
@@ -611,7 +516,7 @@ class AdminAssessmentStatsView(APIView):
                     completed_at__lt=first_day_of_month
                 ).count()
             }
-        }, status=status.HTTP_200_OK)
+        }
 
 
 # Test endpoint for debugging authentication
@@ -14,12 +14,17 @@ from assessments.models import Assessment, AssessmentRequest
 from community.models import ForumPost, ForumComment, ChatRoom
 from content.models import Article, Video, AudioContent
 
+from analytics.snapshots import SnapshotMixin
 
-class SystemStatsView(APIView):
+from .system_sampler import latest_snapshot
+
+
+class SystemStatsView(SnapshotMixin, APIView):
     """
     System-wide admin dashboard statistics endpoint
     """
     permission_classes = [IsAuthenticated]
+    metric_set = 'system_stats'
     
     def get(self, request):
         # Check if user is admin
@@ -29,46 +34,29 @@ class SystemStatsView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         try:
-            # System health metrics
-            cpu_usage = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            # System health metrics from the background sampler
+            snapshot = latest_snapshot()
+            cpu_usage = snapshot.cpu_percent
             
-            # Database statistics
-            total_users = User.objects.count()
-            total_assessments = Assessment.objects.count()
-            total_forum_posts = ForumPost.objects.count()
-            total_content_items = (
-                Article.objects.count() + 
-                Video.objects.count() + 
-                AudioContent.objects.count()
-            )
-            
-            # Activity in last 24 hours
-            yesterday = timezone.now() - timedelta(days=1)
-            recent_activity = {
-                'new_users': User.objects.filter(date_joined__gte=yesterday).count(),
-                'new_assessments': Assessment.objects.filter(completed_at__gte=yesterday).count(),
-                'new_forum_posts': ForumPost.objects.filter(created_at__gte=yesterday).count(),
-                'new_comments': ForumComment.objects.filter(created_at__gte=yesterday).count(),
-            }
+            # Database statistics and last 24 hours of activity
+            stats = self.get_snapshot()
             
             # System alerts (basic checks)
             alerts = []
-            if cpu_usage > 80:
+            if cpu_usage is not None and cpu_usage > 80:
                 alerts.append({
                     'type': 'warning',
                     'message': f'High CPU usage: {cpu_usage}%'
                 })
-            if memory.percent > 85:
+            if snapshot.memory_percent > 85:
                 alerts.append({
                     'type': 'warning',
-                    'message': f'High memory usage: {memory.percent}%'
+                    'message': f'High memory usage: {snapshot.memory_percent}%'
                 })
-            if disk.percent > 90:
+            if snapshot.disk_percent > 90:
                 alerts.append({
                     'type': 'critical',
-                    'message': f'Low disk space: {disk.percent}% used'
+                    'message': f'Low disk space: {snapshot.disk_percent}% used'
                 })
             
             # Content reports (placeholder - would need actual reporting system)
@@ -80,20 +68,15 @@ class SystemStatsView(APIView):
                 'content_reports': content_reports,
                 'system_metrics': {
                     'cpu_usage': cpu_usage,
-                    'memory_usage': memory.percent,
-                    'disk_usage': disk.percent,
-                    'available_memory_gb': round(memory.available / (1024**3), 2),
-                    'total_memory_gb': round(memory.total / (1024**3), 2)
+                    'memory_usage': snapshot.memory_percent,
+                    'disk_usage': snapshot.disk_percent,
+                    'available_memory_gb': round(snapshot.memory_available / (1024**3), 2),
+                    'total_memory_gb': round(snapshot.memory_total / (1024**3), 2)
                 },
-                'database_stats': {
-                    'total_users': total_users,
-                    'total_assessments': total_assessments,
-                    'total_forum_posts': total_forum_posts,
-                    'total_content_items': total_content_items
-                },
-                'recent_activity': recent_activity,
+                **stats.data,
                 'alerts': alerts,
-                'uptime_hours': round((timezone.now().timestamp() - psutil.boot_time()) / 3600, 1)
+                'uptime_hours': round((timezone.now().timestamp() - psutil.boot_time()) / 3600, 1),
+                'snapshot': stats.freshness()
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -103,3 +86,25 @@ class SystemStatsView(APIView):
                 'system_alerts': 1,
                 'content_reports': 0
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def compute(self, scope, time_range):
+        # Activity in last 24 hours
+        yesterday = timezone.now() - timedelta(days=1)
+        return {
+            'database_stats': {
+                'total_users': User.objects.count(),
+                'total_assessments': Assessment.objects.count(),
+                'total_forum_posts': ForumPost.objects.count(),
+                'total_content_items': (
+                    Article.objects.count() + 
+                    Video.objects.count() + 
+                    AudioContent.objects.count()
+                )
+            },
+            'recent_activity': {
+                'new_users': User.objects.filter(date_joined__gte=yesterday).count(),
+                'new_assessments': Assessment.objects.filter(completed_at__gte=yesterday).count(),
+                'new_forum_posts': ForumPost.objects.filter(created_at__gte=yesterday).count(),
+                'new_comments': ForumComment.objects.filter(created_at__gte=yesterday).count(),
+            }
+        }
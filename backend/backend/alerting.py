@@ -1,285 +1,243 @@
 """
 Alerting System
-Monitors system metrics and triggers alerts based on thresholds
+Evaluates alert rules over sliding windows of the recorded metric series
+
+Request rules (error rate, latency percentiles, request rate) read the
+per-minute points of the time-series store (backend/timeseries.py); host
+rules average the system sampler's ring buffer. A rule fires once its
+condition has held for ``for_duration`` seconds, is not re-notified while
+it stays active (except every ``ALERT_REPEAT_SECONDS``), and resolves
+automatically when the condition clears.
+
+Evaluation runs in one process per host: ``AlertRunner`` only evaluates
+while holding a lock file, either on a thread started by the WSGI/ASGI
+entry points (``ENABLE_ALERTING``) or in the foreground via
+``manage.py run_alerts``. The lock is local, so with several hosts each
+one evaluates its own series and sends its own notifications; to alert
+once, set ENABLE_ALERTING=False everywhere and run ``run_alerts`` on a
+single host. Notifications are handed to a small worker pool and retried
+with backoff, so SMTP never blocks evaluation.
 """
 
 import time
 import logging
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
 from django.core.cache import cache
 from django.conf import settings
 from django.core.mail import send_mail
-import psutil
-import threading
+from django.db import close_old_connections
+
+from . import metrics, timeseries
+from .system_sampler import get_sampler, latest_snapshot
 
 # Logger
 alert_logger = logging.getLogger('performance')
 
-class AlertManager:
+DEFAULT_EVALUATION_SECONDS = 30
+DEFAULT_REPEAT_SECONDS = 3600
+
+# Request-derived rates and percentiles need this many requests in the window
+MIN_WINDOW_REQUESTS = 20
+
+HOST_METRICS = ('cpu_percent', 'memory_percent', 'disk_percent')
+PERCENTILE_METRICS = {
+    'p50_response_time': 0.5,
+    'p95_response_time': 0.95,
+    'p99_response_time': 0.99,
+}
+
+OPERATORS = {
+    '>': lambda value, threshold: value > threshold,
+    '<': lambda value, threshold: value < threshold,
+    '>=': lambda value, threshold: value >= threshold,
+    '<=': lambda value, threshold: value <= threshold,
+    '==': lambda value, threshold: value == threshold,
+    '!=': lambda value, threshold: value != threshold,
+}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Threshold on a metric computed over the last ``window`` seconds"""
+
+    id: str
+    name: str
+    description: str
+    metric: str
+    threshold: Any
+    operator: str = '>'
+    window: int = 300
+    for_duration: int = 0
+    severity: str = 'warning'
+    enabled: bool = True
+
+    def matches(self, value) -> bool:
+        return value is not None and OPERATORS[self.operator](value, self.threshold)
+
+
+def default_rules() -> List[AlertRule]:
+    """Built-in alert rules"""
+    return [
+        AlertRule('high_cpu_usage', 'High CPU Usage', 'CPU usage is above threshold',
+                  'cpu_percent', 80.0, window=60, for_duration=300),
+        AlertRule('critical_cpu_usage', 'Critical CPU Usage', 'CPU usage is critically high',
+                  'cpu_percent', 95.0, window=60, for_duration=60, severity='critical'),
+        AlertRule('high_memory_usage', 'High Memory Usage', 'Memory usage is above threshold',
+                  'memory_percent', 85.0, window=60, for_duration=300),
+        AlertRule('critical_memory_usage', 'Critical Memory Usage', 'Memory usage is critically high',
+                  'memory_percent', 95.0, window=60, for_duration=60, severity='critical'),
+        AlertRule('high_disk_usage', 'High Disk Usage', 'Disk usage is above threshold',
+                  'disk_percent', 90.0, window=60, for_duration=600),
+        AlertRule('slow_response_time', 'Slow Response Time', '95th percentile response time is too high',
+                  'p95_response_time', 2.0, window=300, for_duration=120),
+        AlertRule('high_error_rate', 'High Error Rate', 'Server error rate is above threshold',
+                  'error_rate', 5.0, window=300, for_duration=180, severity='critical'),
+        AlertRule('database_connection_failure', 'Database Connection Failure', 'Database is not responding',
+                  'database_healthy', False, operator='==', window=0, for_duration=30, severity='critical'),
+        AlertRule('security_threat_detected', 'Security Threat Detected', 'Suspicious activity detected',
+                  'suspicious_requests', 10, window=0, for_duration=60, severity='critical'),
+    ]
+
+
+def default_channels() -> Dict[str, Dict]:
+    """Notification channels and the severities each receives"""
+    return {
+        'email': {
+            'enabled': True,
+            'recipients': ['admin@example.com', 'devops@example.com'],
+            'severity_filter': ['warning', 'critical'],
+        },
+        'slack': {
+            'enabled': False,  # Would need Slack webhook URL
+            'webhook_url': '',
+            'channel': '#alerts',
+            'severity_filter': ['critical'],
+        },
+        'webhook': {
+            'enabled': True,
+            'url': '/monitoring/alerts/webhook/',
+            'severity_filter': ['warning', 'critical'],
+        },
+    }
+
+
+class MetricWindows:
     """
-    Manages alert rules, thresholds, and notifications
+    Metric values over windows ending at ``now``; store reads are shared
+    between rules using the same window
     """
-    
-    def __init__(self):
-        self.alert_rules = self._load_alert_rules()
-        self.active_alerts = {}
-        self.notification_channels = self._setup_notification_channels()
-    
-    def _load_alert_rules(self) -> Dict[str, Dict]:
-        """Load alert rules configuration"""
-        return {
-            'high_cpu_usage': {
-                'name': 'High CPU Usage',
-                'description': 'CPU usage is above threshold',
-                'metric': 'cpu_percent',
-                'threshold': 80.0,
-                'operator': '>',
-                'duration': 300,  # 5 minutes
-                'severity': 'warning',
-                'enabled': True,
-            },
-            'critical_cpu_usage': {
-                'name': 'Critical CPU Usage',
-                'description': 'CPU usage is critically high',
-                'metric': 'cpu_percent',
-                'threshold': 95.0,
-                'operator': '>',
-                'duration': 60,  # 1 minute
-                'severity': 'critical',
-                'enabled': True,
-            },
-            'high_memory_usage': {
-                'name': 'High Memory Usage',
-                'description': 'Memory usage is above threshold',
-                'metric': 'memory_percent',
-                'threshold': 85.0,
-                'operator': '>',
-                'duration': 300,
-                'severity': 'warning',
-                'enabled': True,
-            },
-            'critical_memory_usage': {
-                'name': 'Critical Memory Usage',
-                'description': 'Memory usage is critically high',
-                'metric': 'memory_percent',
-                'threshold': 95.0,
-                'operator': '>',
-                'duration': 60,
-                'severity': 'critical',
-                'enabled': True,
-            },
-            'high_disk_usage': {
-                'name': 'High Disk Usage',
-                'description': 'Disk usage is above threshold',
-                'metric': 'disk_percent',
-                'threshold': 90.0,
-                'operator': '>',
-                'duration': 600,  # 10 minutes
-                'severity': 'warning',
-                'enabled': True,
-            },
-            'slow_response_time': {
-                'name': 'Slow Response Time',
-                'description': 'Average response time is too high',
-                'metric': 'avg_response_time',
-                'threshold': 2.0,
-                'operator': '>',
-                'duration': 300,
-                'severity': 'warning',
-                'enabled': True,
-            },
-            'high_error_rate': {
-                'name': 'High Error Rate',
-                'description': 'Error rate is above threshold',
-                'metric': 'error_rate',
-                'threshold': 5.0,  # 5%
-                'operator': '>',
-                'duration': 180,
-                'severity': 'critical',
-                'enabled': True,
-            },
-            'database_connection_failure': {
-                'name': 'Database Connection Failure',
-                'description': 'Database is not responding',
-                'metric': 'database_healthy',
-                'threshold': False,
-                'operator': '==',
-                'duration': 30,
-                'severity': 'critical',
-                'enabled': True,
-            },
-            'security_threat_detected': {
-                'name': 'Security Threat Detected',
-                'description': 'Suspicious activity detected',
-                'metric': 'suspicious_requests',
-                'threshold': 10,
-                'operator': '>',
-                'duration': 60,
-                'severity': 'critical',
-                'enabled': True,
-            },
-        }
-    
-    def _setup_notification_channels(self) -> Dict[str, Dict]:
-        """Setup notification channels"""
-        return {
-            'email': {
-                'enabled': True,
-                'recipients': ['admin@example.com', 'devops@example.com'],
-                'severity_filter': ['warning', 'critical'],
-            },
-            'slack': {
-                'enabled': False,  # Would need Slack webhook URL
-                'webhook_url': '',
-                'channel': '#alerts',
-                'severity_filter': ['critical'],
-            },
-            'webhook': {
-                'enabled': True,
-                'url': '/monitoring/alerts/webhook/',
-                'severity_filter': ['warning', 'critical'],
-            },
-        }
-    
-    def check_alerts(self, metrics: Dict[str, Any]) -> List[Dict]:
-        """Check all alert rules against current metrics"""
-        triggered_alerts = []
-        
-        for rule_id, rule in self.alert_rules.items():
-            if not rule['enabled']:
-                continue
-            
-            if self._evaluate_rule(rule, metrics):
-                alert = self._create_alert(rule_id, rule, metrics)
-                if self._should_trigger_alert(rule_id, alert):
-                    triggered_alerts.append(alert)
-                    self._send_notifications(alert)
-        
-        return triggered_alerts
-    
-    def _evaluate_rule(self, rule: Dict, metrics: Dict[str, Any]) -> bool:
-        """Evaluate a single alert rule"""
-        metric_name = rule['metric']
-        threshold = rule['threshold']
-        operator = rule['operator']
-        
-        # Get metric value from nested metrics structure
-        metric_value = self._get_metric_value(metrics, metric_name)
-        
-        if metric_value is None:
-            return False
-        
-        # Evaluate condition
-        if operator == '>':
-            return metric_value > threshold
-        elif operator == '<':
-            return metric_value < threshold
-        elif operator == '>=':
-            return metric_value >= threshold
-        elif operator == '<=':
-            return metric_value <= threshold
-        elif operator == '==':
-            return metric_value == threshold
-        elif operator == '!=':
-            return metric_value != threshold
-        
-        return False
-    
-    def _get_metric_value(self, metrics: Dict[str, Any], metric_name: str) -> Optional[float]:
-        """Extract metric value from metrics dictionary"""
-        # Handle nested metric paths
-        if metric_name == 'cpu_percent':
-            return metrics.get('system', {}).get('cpu_percent')
-        elif metric_name == 'memory_percent':
-            return metrics.get('system', {}).get('memory_percent')
-        elif metric_name == 'disk_percent':
-            return metrics.get('system', {}).get('disk_percent')
-        elif metric_name == 'avg_response_time':
-            return metrics.get('application', {}).get('api', {}).get('avg_response_time')
-        elif metric_name == 'database_healthy':
-            return metrics.get('database', {}).get('healthy')
-        elif metric_name == 'error_rate':
-            # Calculate error rate from status codes
-            status_codes = metrics.get('application', {}).get('api', {}).get('status_codes', {})
-            total_requests = sum(status_codes.values())
-            error_requests = sum(int(count) for code, count in status_codes.items() if code.startswith(('4', '5')))
-            return (error_requests / total_requests * 100) if total_requests > 0 else 0
-        elif metric_name == 'suspicious_requests':
-            return metrics.get('security', {}).get('suspicious_requests', 0)
-        
+
+    def __init__(self, now: float, store=None, sampler=None):
+        self.now = now
+        self.store = store or timeseries.get_store()
+        self.sampler = sampler or get_sampler()
+        self._points = {}
+
+    def _point(self, window: int):
+        if window not in self._points:
+            self._points[window] = self.store.window(window, now=self.now)
+        return self._points[window]
+
+    def value(self, metric: str, window: int):
+        if metric in HOST_METRICS:
+            samples = self.sampler.history(seconds=window) if window else []
+            if not samples:
+                samples = [latest_snapshot()]
+            values = [getattr(sample, metric) for sample in samples if getattr(sample, metric) is not None]
+            return sum(values) / len(values) if values else None
+        if metric == 'database_healthy':
+            return metrics_collector._collect_database_metrics()['healthy']
+        if metric == 'suspicious_requests':
+            return cache.get('suspicious_requests_count', 0)
+
+        point = self._point(window)
+        if metric == 'request_rate':
+            return point.requests / window
+        if point.requests < MIN_WINDOW_REQUESTS:
+            return None
+        if metric == 'error_rate':
+            return point.errors / point.requests * 100
+        if metric == 'avg_response_time':
+            return point.latency_sum / point.requests
+        if metric in PERCENTILE_METRICS:
+            return timeseries.percentile(metrics.LATENCY_BUCKETS, point.histogram, PERCENTILE_METRICS[metric])
         return None
-    
-    def _create_alert(self, rule_id: str, rule: Dict, metrics: Dict[str, Any]) -> Dict:
-        """Create alert object"""
-        return {
-            'id': f"{rule_id}_{int(time.time())}",
-            'rule_id': rule_id,
-            'name': rule['name'],
-            'description': rule['description'],
-            'severity': rule['severity'],
-            'metric': rule['metric'],
-            'threshold': rule['threshold'],
-            'current_value': self._get_metric_value(metrics, rule['metric']),
-            'timestamp': time.time(),
-            'status': 'active',
-        }
-    
-    def _should_trigger_alert(self, rule_id: str, alert: Dict) -> bool:
-        """Check if alert should be triggered based on duration"""
-        rule = self.alert_rules[rule_id]
-        duration = rule['duration']
-        
-        # Check if this alert is already active
-        if rule_id in self.active_alerts:
-            # Check if enough time has passed since first detection
-            first_detected = self.active_alerts[rule_id]['first_detected']
-            if time.time() - first_detected >= duration:
-                return True
-        else:
-            # First time detecting this condition
-            self.active_alerts[rule_id] = {
-                'first_detected': time.time(),
-                'last_triggered': 0,
-            }
-        
-        return False
-    
-    def _send_notifications(self, alert: Dict):
-        """Send alert notifications through configured channels"""
-        severity = alert['severity']
-        
-        for channel_name, channel_config in self.notification_channels.items():
-            if not channel_config['enabled']:
-                continue
-            
-            if severity not in channel_config['severity_filter']:
+
+
+class NotificationQueue:
+    """
+    Delivers alert notifications on a worker pool, retrying failed
+    deliveries with exponential backoff
+    """
+
+    def __init__(self, channels=None, retries=None, backoff=None, workers=2):
+        self.channels = channels if channels is not None else default_channels()
+        self.retries = retries if retries is not None else getattr(settings, 'ALERT_NOTIFY_RETRIES', 3)
+        self.backoff = backoff if backoff is not None else getattr(settings, 'ALERT_NOTIFY_BACKOFF_SECONDS', 5.0)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='alert-notify')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, alert: Dict):
+        """Queue ``alert`` for every enabled channel accepting its severity"""
+        futures = []
+        for channel_name, config in self.channels.items():
+            if not config['enabled'] or alert['severity'] not in config['severity_filter']:
                 continue
-            
+            future = self._executor.submit(self._deliver, channel_name, config, alert)
+            with self._lock:
+                self._pending.add(future)
+            future.add_done_callback(self._discard)
+            futures.append(future)
+        return futures
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def drain(self, timeout: Optional[float] = None):
+        """Wait for queued deliveries (used before a one-shot run exits)"""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+    def _deliver(self, channel_name: str, config: Dict, alert: Dict) -> bool:
+        sender = getattr(self, f'_send_{channel_name}_notification')
+        for attempt in range(self.retries + 1):
             try:
-                if channel_name == 'email':
-                    self._send_email_notification(alert, channel_config)
-                elif channel_name == 'slack':
-                    self._send_slack_notification(alert, channel_config)
-                elif channel_name == 'webhook':
-                    self._send_webhook_notification(alert, channel_config)
+                sender(alert, config)
+                return True
             except Exception as e:
-                alert_logger.error(f"Failed to send {channel_name} notification: {e}")
-    
+                if attempt == self.retries:
+                    alert_logger.error(
+                        f"Failed to send {channel_name} notification after {attempt + 1} attempts: {e}"
+                    )
+                    return False
+                delay = self.backoff * 2 ** attempt
+                alert_logger.warning(f"Retrying {channel_name} notification in {delay:.0f}s: {e}")
+                time.sleep(delay)
+
     def _send_email_notification(self, alert: Dict, config: Dict):
         """Send email notification"""
-        subject = f"[{alert['severity'].upper()}] {alert['name']}"
+        prefix = 'RESOLVED' if alert['status'] == 'resolved' else alert['severity'].upper()
+        subject = f"[{prefix}] {alert['name']}"
         message = f"""
 Alert: {alert['name']}
+Status: {alert['status']}
 Severity: {alert['severity']}
 Description: {alert['description']}
 Current Value: {alert['current_value']}
 Threshold: {alert['threshold']}
+Window: {alert['window']}s
 Time: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert['timestamp']))}
 
 Please investigate and take appropriate action.
         """
-        
+
         send_mail(
             subject=subject,
             message=message,
@@ -287,85 +245,180 @@ Please investigate and take appropriate action.
             recipient_list=config['recipients'],
             fail_silently=False,
         )
-        
-        alert_logger.info(f"Email alert sent: {alert['name']}")
-    
+
+        alert_logger.info(f"Email alert sent: {alert['name']} ({alert['status']})")
+
     def _send_slack_notification(self, alert: Dict, config: Dict):
         """Send Slack notification"""
         # Implementation would use Slack webhook
         # This is a placeholder for the actual implementation
-        alert_logger.info(f"Slack alert would be sent: {alert['name']}")
-    
+        alert_logger.info(f"Slack alert would be sent: {alert['name']} ({alert['status']})")
+
     def _send_webhook_notification(self, alert: Dict, config: Dict):
         """Send webhook notification"""
         # Implementation would make HTTP POST to webhook URL
         # This is a placeholder for the actual implementation
-        alert_logger.info(f"Webhook alert would be sent: {alert['name']}")
-    
-    def resolve_alert(self, rule_id: str):
-        """Mark alert as resolved"""
-        if rule_id in self.active_alerts:
-            del self.active_alerts[rule_id]
-            alert_logger.info(f"Alert resolved: {rule_id}")
-    
+        alert_logger.info(f"Webhook alert would be sent: {alert['name']} ({alert['status']})")
+
+
+class AlertEngine:
+    """
+    Evaluates rules and tracks their state: pending while the condition
+    holds for less than ``for_duration``, then firing until it clears
+    """
+
+    def __init__(self, rules=None, notifier=None, store=None, sampler=None, repeat_seconds=None):
+        self.rules = rules if rules is not None else default_rules()
+        self.notifier = notifier or NotificationQueue()
+        self.store = store
+        self.sampler = sampler
+        self.repeat_seconds = repeat_seconds or getattr(settings, 'ALERT_REPEAT_SECONDS', DEFAULT_REPEAT_SECONDS)
+        # rule id -> {'pending_since', 'alert', 'last_notified'}
+        self._state = {}
+
+    def evaluate(self, now: Optional[float] = None) -> List[Dict]:
+        """Run every enabled rule once; returns the alerts notified this round"""
+        now = now or time.time()
+        windows = MetricWindows(now, store=self.store, sampler=self.sampler)
+        notified = []
+
+        for rule in self.rules:
+            if not rule.enabled:
+                continue
+            try:
+                value = windows.value(rule.metric, rule.window)
+            except Exception as e:
+                alert_logger.error(f"Failed to evaluate alert rule {rule.id}: {e}")
+                continue
+
+            state = self._state.get(rule.id)
+            if rule.matches(value):
+                if state is None:
+                    state = self._state[rule.id] = {'pending_since': now, 'alert': None, 'last_notified': 0}
+                if state['alert'] is None:
+                    if now - state['pending_since'] < rule.for_duration:
+                        continue
+                    state['alert'] = self._create_alert(rule, value, now)
+                else:
+                    state['alert']['current_value'] = value
+                    if now - state['last_notified'] < self.repeat_seconds:
+                        continue
+                state['last_notified'] = now
+                notified.append(dict(state['alert']))
+            elif state is not None:
+                del self._state[rule.id]
+                if state['alert'] is not None:
+                    alert_logger.info(f"Alert resolved: {rule.id}")
+                    notified.append(dict(state['alert'], status='resolved', current_value=value, resolved_at=now))
+
+        for alert in notified:
+            if alert['status'] == 'active':
+                alert_logger.warning(f"Alert firing: {alert['rule_id']} ({alert['current_value']})")
+            self.notifier.submit(alert)
+        return notified
+
+    def _create_alert(self, rule: AlertRule, value, now: float) -> Dict:
+        """Create alert object"""
+        return {
+            'id': f"{rule.id}_{int(now)}",
+            'rule_id': rule.id,
+            'name': rule.name,
+            'description': rule.description,
+            'severity': rule.severity,
+            'metric': rule.metric,
+            'threshold': rule.threshold,
+            'window': rule.window,
+            'current_value': value,
+            'timestamp': now,
+            'status': 'active',
+        }
+
     def get_active_alerts(self) -> List[Dict]:
-        """Get list of currently active alerts"""
-        return [
-            {
-                'rule_id': rule_id,
-                'name': self.alert_rules[rule_id]['name'],
-                'severity': self.alert_rules[rule_id]['severity'],
-                'first_detected': data['first_detected'],
-                'duration': time.time() - data['first_detected'],
-            }
-            for rule_id, data in self.active_alerts.items()
-        ]
+        """Get list of currently firing alerts"""
+        return [dict(state['alert']) for state in self._state.values() if state['alert'] is not None]
+
+
+class AlertRunner:
+    """Evaluates the engine every interval while holding the alerting lock"""
+
+    def __init__(self, engine=None, interval=None, lock_path=None):
+        self.engine = engine or AlertEngine()
+        self.interval = interval or getattr(settings, 'ALERT_EVALUATION_SECONDS', DEFAULT_EVALUATION_SECONDS)
+        self.lock = timeseries.LeaderLock(
+            lock_path or os.path.join(os.path.dirname(timeseries.store_path()), 'alerting.lock')
+        )
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def run_once(self, now: Optional[float] = None) -> Optional[List[Dict]]:
+        """Evaluate once if this process is the leader; None otherwise"""
+        if not self.lock.acquire():
+            return None
+        close_old_connections()
+        try:
+            return self.engine.evaluate(now)
+        finally:
+            close_old_connections()
+
+    def run_forever(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                alert_logger.error(f"Alert evaluation failed: {e}")
+
+    def start(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self.lock = timeseries.LeaderLock(self.lock.path)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='alert-runner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
 
 
 class MetricsCollector:
     """
-    Collects metrics from various sources for alerting
+    Collects point-in-time metrics from various sources
     """
-    
-    def __init__(self):
-        self.alert_manager = AlertManager()
-    
+
     def collect_all_metrics(self) -> Dict[str, Any]:
-        """Collect all metrics for alerting"""
+        """Collect all current metrics"""
         return {
             'system': self._collect_system_metrics(),
             'application': self._collect_application_metrics(),
             'database': self._collect_database_metrics(),
             'security': self._collect_security_metrics(),
         }
-    
+
     def _collect_system_metrics(self) -> Dict[str, float]:
         """Collect system metrics"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
+            snapshot = latest_snapshot()
             return {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'disk_percent': disk.percent,
+                'cpu_percent': snapshot.cpu_percent,
+                'memory_percent': snapshot.memory_percent,
+                'disk_percent': snapshot.disk_percent,
             }
         except Exception as e:
             alert_logger.error(f"Failed to collect system metrics: {e}")
             return {}
-    
+
     def _collect_application_metrics(self) -> Dict[str, Any]:
         """Collect application metrics"""
         try:
-            api_metrics = cache.get('api_metrics', {})
+            api_metrics = metrics.api_summary()
             return {
                 'api': api_metrics
             }
         except Exception as e:
             alert_logger.error(f"Failed to collect application metrics: {e}")
             return {}
-    
+
     def _collect_database_metrics(self) -> Dict[str, Any]:
         """Collect database metrics"""
         try:
@@ -376,7 +429,7 @@ class MetricsCollector:
         except Exception as e:
             alert_logger.error(f"Database health check failed: {e}")
             return {'healthy': False}
-    
+
     def _collect_security_metrics(self) -> Dict[str, int]:
         """Collect security metrics"""
         try:
@@ -387,43 +440,23 @@ class MetricsCollector:
         except Exception as e:
             alert_logger.error(f"Failed to collect security metrics: {e}")
             return {}
-    
-    def run_alert_check(self):
-        """Run complete alert check cycle"""
-        try:
-            metrics = self.collect_all_metrics()
-            triggered_alerts = self.alert_manager.check_alerts(metrics)
-            
-            if triggered_alerts:
-                alert_logger.warning(f"Triggered {len(triggered_alerts)} alerts")
-            
-            return triggered_alerts
-        except Exception as e:
-            alert_logger.error(f"Alert check failed: {e}")
-            return []
 
 
 # Global metrics collector instance
 metrics_collector = MetricsCollector()
 
+_runner = None
 
-def run_periodic_alert_check():
-    """Run periodic alert checks in background thread"""
-    def alert_check_loop():
-        while True:
-            try:
-                metrics_collector.run_alert_check()
-                time.sleep(60)  # Check every minute
-            except Exception as e:
-                alert_logger.error(f"Alert check loop error: {e}")
-                time.sleep(60)
-    
-    # Start background thread for alert checking
-    alert_thread = threading.Thread(target=alert_check_loop, daemon=True)
-    alert_thread.start()
-    alert_logger.info("Started periodic alert checking")
-
-
-# Auto-start alert checking when module is imported
-if getattr(settings, 'ENABLE_ALERTING', True):
-    run_periodic_alert_check()
+
+def get_runner() -> AlertRunner:
+    global _runner
+    if _runner is None:
+        _runner = AlertRunner()
+    return _runner
+
+
+def start_alerting():
+    """Start the alert runner thread in this process, if enabled"""
+    if not getattr(settings, 'ENABLE_ALERTING', True):
+        return
+    get_runner().start()
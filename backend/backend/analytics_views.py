@@ -11,19 +11,52 @@ from django.contrib.auth import get_user_model
 # Import models from different apps
 from accounts.models import User
 from assessments.models import Assessment, ClientAssessmentAssignment, AssessmentRequest, AssessmentQuestion, AssessmentResponse
+from assessments.risk import risk_distribution, risk_trend
+from .time_buckets import bucketed, series
+from analytics.snapshots import SnapshotMixin
 from community.models import ForumPost, ForumComment, ChatRoom
 from content.models import Article, Video, AudioContent
 from crisis.models import CrisisAlert
+from crisis.sla import intervention_metrics
 from mood.models import MoodEntry as MoodTrackerEntry
 from wellness.models import MoodEntry, DailyChallenge, UserChallengeCompletion
 
 User = get_user_model()
 
-class SystemAnalyticsView(APIView):
+# Dashboard time ranges (snapshotted separately); anything else means 30d
+TIME_RANGES = ('7d', '30d', '90d', '1y')
+
+
+def snapshot_time_range(time_range):
+    return time_range if time_range in TIME_RANGES else '30d'
+
+
+def build_trends(assessments, population):
+    """Chart series shared by the system and guide dashboards"""
+    # Weekly engagement: share of the population assessed on each of the last 7 days
+    daily = bucketed(assessments, 'completed_at', 'day', 7, active=Count('user', distinct=True))
+    weekly_engagement = [
+        round(active / population * 100, 1) if population > 0 else 0
+        for active in series(daily, 'active')
+    ]
+    
+    # Monthly assessments (last 6 calendar months)
+    monthly = bucketed(assessments, 'completed_at', 'month', 6, total=Count('pk'))
+    
+    return {
+        'weeklyEngagement': weekly_engagement,
+        'monthlyAssessments': series(monthly, 'total'),
+        'riskTrends': risk_trend(assessments)
+    }
+
+
+class SystemAnalyticsView(SnapshotMixin, APIView):
     """
     Comprehensive system analytics with real data aggregation
     """
     permission_classes = [IsAuthenticated]
+    metric_set = 'system_analytics'
+    snapshot_time_ranges = TIME_RANGES
     
     def get(self, request):
         # Check permissions - allow guides and admins
@@ -35,32 +68,13 @@ class SystemAnalyticsView(APIView):
         try:
             # Get time range parameter
             time_range = request.GET.get('timeRange', '30d')
-            days = self._parse_time_range(time_range)
-            start_date = timezone.now() - timedelta(days=days)
-            
-            # Client Engagement Metrics
-            client_engagement = self._get_client_engagement(start_date)
-            
-            # Risk Assessment Distribution
-            risk_assessment = self._get_risk_assessment()
-            
-            # Intervention Metrics
-            interventions = self._get_intervention_metrics(start_date)
-            
-            # Trend Data
-            trends = self._get_trends(days)
-            
-            # System Overview
-            system_overview = self._get_system_overview()
+            snapshot = self.get_snapshot(time_range=snapshot_time_range(time_range))
             
             return Response({
-                'clientEngagement': client_engagement,
-                'riskAssessment': risk_assessment,
-                'interventions': interventions,
-                'trends': trends,
-                'systemOverview': system_overview,
+                **snapshot.data,
                 'timeRange': time_range,
-                'generatedAt': timezone.now().isoformat()
+                'generatedAt': snapshot.computed_at.isoformat(),
+                'snapshot': snapshot.freshness()
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -82,7 +96,9 @@ class SystemAnalyticsView(APIView):
                     'totalInterventions': 0,
                     'successfulInterventions': 0,
                     'escalations': 0,
-                    'averageResponseTime': 0
+                    'averageResponseTime': 0,
+                    'medianResponseTime': 0,
+                    'p90ResponseTime': 0
                 },
                 'trends': {
                     'weeklyEngagement': [0, 0, 0, 0, 0, 0, 0],
@@ -104,6 +120,22 @@ class SystemAnalyticsView(APIView):
         else:
             return 30
     
+    def compute(self, scope, time_range):
+        days = self._parse_time_range(time_range)
+        start_date = timezone.now() - timedelta(days=days)
+        return {
+            # Client Engagement Metrics
+            'clientEngagement': self._get_client_engagement(start_date),
+            # Risk Assessment Distribution
+            'riskAssessment': self._get_risk_assessment(),
+            # Intervention Metrics
+            'interventions': self._get_intervention_metrics(start_date),
+            # Trend Data
+            'trends': self._get_trends(days),
+            # System Overview
+            'systemOverview': self._get_system_overview()
+        }
+    
     def _get_client_engagement(self, start_date):
         """Calculate client engagement metrics"""
         # Total clients (users with role 'user')
@@ -112,7 +144,7 @@ class SystemAnalyticsView(APIView):
         # Active clients (users who completed assessments in time range)
         active_clients = User.objects.filter(
             role='user',
-            assessment_set__completed_at__gte=start_date
+            assessments__completed_at__gte=start_date
         ).distinct().count()
         
         # Assessments completed in time range
@@ -132,126 +164,20 @@ class SystemAnalyticsView(APIView):
     
     def _get_risk_assessment(self):
         """Calculate risk level distribution"""
-        # Get all users with role 'user'
-        total_users = User.objects.filter(role='user').count()
-        
-        # If no users, return zeros
-        if total_users == 0:
-            return {
-                'lowRisk': 0,
-                'mediumRisk': 0,
-                'highRisk': 0,
-                'criticalRisk': 0
-            }
-        
-        # Get latest assessment for each user
-        risk_counts = {'low': 0, 'medium': 0, 'high': 0, 'critical': 0}
-        
-        # Get all users and their latest assessments
-        users = User.objects.filter(role='user')
-        for user in users:
-            latest_assessment = Assessment.objects.filter(
-                user=user
-            ).order_by('-completed_at').first()
-            
-            if latest_assessment and latest_assessment.risk_level:
-                risk_level = latest_assessment.risk_level.lower()
-                if risk_level in risk_counts:
-                    risk_counts[risk_level] += 1
-            else:
-                # Users without assessments are considered low risk
-                risk_counts['low'] += 1
-        
-        return {
-            'lowRisk': risk_counts['low'],
-            'mediumRisk': risk_counts['medium'],
-            'highRisk': risk_counts['high'],
-            'criticalRisk': risk_counts['critical']
-        }
+        # Users without assessments are considered low risk
+        return risk_distribution(User.objects.filter(role='user'), unassessed_as_low=True)
     
     def _get_intervention_metrics(self, start_date):
         """Calculate intervention and crisis response metrics"""
         # Crisis alerts as interventions
-        total_interventions = CrisisAlert.objects.filter(
-            created_at__gte=start_date
-        ).count()
-        
-        # Successful interventions (resolved alerts)
-        successful_interventions = CrisisAlert.objects.filter(
-            created_at__gte=start_date,
-            status='resolved'
-        ).count()
-        
-        # Escalations (critical alerts)
-        escalations = CrisisAlert.objects.filter(
-            created_at__gte=start_date,
-            severity_level='critical'
-        ).count()
-        
-        # Calculate average response time (placeholder - would need actual response tracking)
-        # For now, use a reasonable estimate based on alert resolution times
-        resolved_alerts = CrisisAlert.objects.filter(
-            created_at__gte=start_date,
-            status='resolved',
-            resolved_at__isnull=False
-        )
-        
-        if resolved_alerts.exists():
-            total_response_time = sum([
-                (alert.resolved_at - alert.created_at).total_seconds() / 60
-                for alert in resolved_alerts
-            ])
-            average_response_time = total_response_time / resolved_alerts.count()
-        else:
-            average_response_time = 0
-        
-        return {
-            'totalInterventions': total_interventions,
-            'successfulInterventions': successful_interventions,
-            'escalations': escalations,
-            'averageResponseTime': round(average_response_time, 1)
-        }
+        return intervention_metrics(CrisisAlert.objects.filter(created_at__gte=start_date))
     
     def _get_trends(self, days):
         """Calculate trend data for charts"""
-        # Weekly engagement (last 7 days)
-        weekly_engagement = []
-        for i in range(7):
-            day_start = timezone.now() - timedelta(days=i+1)
-            day_end = day_start + timedelta(days=1)
-            
-            daily_active = User.objects.filter(
-                role='user',
-                assessment_set__completed_at__range=[day_start, day_end]
-            ).distinct().count()
-            
-            total_users = User.objects.filter(role='user').count()
-            engagement_rate = (daily_active / total_users * 100) if total_users > 0 else 0
-            weekly_engagement.append(round(engagement_rate, 1))
-        
-        weekly_engagement.reverse()  # Show oldest to newest
-        
-        # Monthly assessments (last few months)
-        monthly_assessments = []
-        for i in range(6):  # Last 6 months
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start + timedelta(days=30)
-            
-            monthly_count = Assessment.objects.filter(
-                completed_at__range=[month_start, month_end]
-            ).count()
-            monthly_assessments.append(monthly_count)
-        
-        monthly_assessments.reverse()
-        
-        # Risk trends (simplified)
-        risk_trends = [15, 25, 35, 45, 40, 30, 25]  # Placeholder trend data
-        
-        return {
-            'weeklyEngagement': weekly_engagement,
-            'monthlyAssessments': monthly_assessments,
-            'riskTrends': risk_trends
-        }
+        return build_trends(
+            Assessment.objects.filter(user__role='user'),
+            User.objects.filter(role='user').count()
+        )
     
     def _get_system_overview(self):
         """Get overall system statistics"""
@@ -274,11 +200,18 @@ class SystemAnalyticsView(APIView):
         }
 
 
-class GuideAnalyticsView(APIView):
+class GuideAnalyticsView(SnapshotMixin, APIView):
     """
     Guide-specific analytics endpoint
     """
     permission_classes = [IsAuthenticated]
+    metric_set = 'guide_analytics'
+    snapshot_time_ranges = TIME_RANGES
+    
+    @classmethod
+    def snapshot_scopes(cls):
+        guide_ids = ClientAssessmentAssignment.objects.order_by().values_list('guide', flat=True).distinct()
+        return [f'guide:{guide_id}' for guide_id in guide_ids]
     
     def get(self, request):
         if request.user.role not in ['guide', 'admin']:
@@ -288,50 +221,15 @@ class GuideAnalyticsView(APIView):
         
         try:
             time_range = request.GET.get('timeRange', '30d')
-            days = self._parse_time_range(time_range)
-            start_date = timezone.now() - timedelta(days=days)
-            
-            # Get guide's assigned clients
-            assigned_clients = ClientAssessmentAssignment.objects.filter(
-                guide=request.user
-            ).values('client').distinct()
-            
-            client_ids = [assignment['client'] for assignment in assigned_clients]
-            
-            # Client engagement for this guide
-            total_clients = len(client_ids)
-            active_clients = User.objects.filter(
-                id__in=client_ids,
-                assessment_set__completed_at__gte=start_date
-            ).distinct().count()
-            
-            assessments_completed = Assessment.objects.filter(
-                user_id__in=client_ids,
-                completed_at__gte=start_date
-            ).count()
-            
-            average_engagement = (active_clients / total_clients * 100) if total_clients > 0 else 0
-            
-            # Risk assessment for guide's clients
-            risk_distribution = self._get_guide_risk_distribution(client_ids)
-            
-            # Guide interventions
-            guide_interventions = self._get_guide_interventions(client_ids, start_date)
-            
-            # Trends for guide's clients
-            guide_trends = self._get_guide_trends(client_ids, days)
+            snapshot = self.get_snapshot(
+                scope=f'guide:{request.user.pk}',
+                time_range=snapshot_time_range(time_range)
+            )
             
             return Response({
-                'clientEngagement': {
-                    'totalClients': total_clients,
-                    'activeClients': active_clients,
-                    'assessmentsCompleted': assessments_completed,
-                    'averageEngagement': round(average_engagement, 1)
-                },
-                'riskAssessment': risk_distribution,
-                'interventions': guide_interventions,
-                'trends': guide_trends,
-                'timeRange': time_range
+                **snapshot.data,
+                'timeRange': time_range,
+                'snapshot': snapshot.freshness()
             })
             
         except Exception as e:
@@ -352,109 +250,62 @@ class GuideAnalyticsView(APIView):
         else:
             return 30
     
-    def _get_guide_risk_distribution(self, client_ids):
-        """Get risk distribution for guide's clients"""
-        risk_counts = {'low': 0, 'medium': 0, 'high': 0, 'critical': 0}
+    def compute(self, scope, time_range):
+        guide_id = int(scope.split(':', 1)[1])
+        days = self._parse_time_range(time_range)
+        start_date = timezone.now() - timedelta(days=days)
         
-        for client_id in client_ids:
-            latest_assessment = Assessment.objects.filter(
-                user_id=client_id
-            ).order_by('-completed_at').first()
-            
-            if latest_assessment and latest_assessment.risk_level:
-                risk_level = latest_assessment.risk_level.lower()
-                if risk_level in risk_counts:
-                    risk_counts[risk_level] += 1
+        # Get guide's assigned clients
+        assigned_clients = ClientAssessmentAssignment.objects.filter(
+            guide_id=guide_id
+        ).values('client').distinct()
         
-        return {
-            'lowRisk': risk_counts['low'],
-            'mediumRisk': risk_counts['medium'],
-            'highRisk': risk_counts['high'],
-            'criticalRisk': risk_counts['critical']
-        }
-    
-    def _get_guide_interventions(self, client_ids, start_date):
-        """Get intervention metrics for guide's clients"""
-        # Crisis alerts for guide's clients
-        total_interventions = CrisisAlert.objects.filter(
-            user_id__in=client_ids,
-            created_at__gte=start_date
-        ).count()
+        client_ids = [assignment['client'] for assignment in assigned_clients]
         
-        successful_interventions = CrisisAlert.objects.filter(
-            user_id__in=client_ids,
-            created_at__gte=start_date,
-            status='resolved'
-        ).count()
+        # Client engagement for this guide
+        total_clients = len(client_ids)
+        active_clients = User.objects.filter(
+            id__in=client_ids,
+            assessments__completed_at__gte=start_date
+        ).distinct().count()
         
-        escalations = CrisisAlert.objects.filter(
+        assessments_completed = Assessment.objects.filter(
             user_id__in=client_ids,
-            created_at__gte=start_date,
-            severity_level='critical'
+            completed_at__gte=start_date
         ).count()
         
-        # Average response time calculation
-        resolved_alerts = CrisisAlert.objects.filter(
-            user_id__in=client_ids,
-            created_at__gte=start_date,
-            status='resolved',
-            resolved_at__isnull=False
-        )
-        
-        if resolved_alerts.exists():
-            total_response_time = sum([
-                (alert.resolved_at - alert.created_at).total_seconds() / 60
-                for alert in resolved_alerts
-            ])
-            average_response_time = total_response_time / resolved_alerts.count()
-        else:
-            average_response_time = 0
+        average_engagement = (active_clients / total_clients * 100) if total_clients > 0 else 0
         
         return {
-            'totalInterventions': total_interventions,
-            'successfulInterventions': successful_interventions,
-            'escalations': escalations,
-            'averageResponseTime': round(average_response_time, 1)
+            'clientEngagement': {
+                'totalClients': total_clients,
+                'activeClients': active_clients,
+                'assessmentsCompleted': assessments_completed,
+                'averageEngagement': round(average_engagement, 1)
+            },
+            # Risk assessment for guide's clients
+            'riskAssessment': self._get_guide_risk_distribution(client_ids),
+            # Guide interventions
+            'interventions': self._get_guide_interventions(client_ids, start_date),
+            # Trends for guide's clients
+            'trends': self._get_guide_trends(client_ids, days)
         }
     
+    def _get_guide_risk_distribution(self, client_ids):
+        """Get risk distribution for guide's clients"""
+        return risk_distribution(User.objects.filter(id__in=client_ids))
+    
+    def _get_guide_interventions(self, client_ids, start_date):
+        """Get intervention metrics for guide's clients"""
+        # Crisis alerts for guide's clients
+        return intervention_metrics(CrisisAlert.objects.filter(
+            user_id__in=client_ids,
+            created_at__gte=start_date
+        ))
+    
     def _get_guide_trends(self, client_ids, days):
         """Get trend data for guide's clients"""
-        # Weekly engagement
-        weekly_engagement = []
-        for i in range(7):
-            day_start = timezone.now() - timedelta(days=i+1)
-            day_end = day_start + timedelta(days=1)
-            
-            daily_active = User.objects.filter(
-                id__in=client_ids,
-                assessment_set__completed_at__range=[day_start, day_end]
-            ).distinct().count()
-            
-            total_clients = len(client_ids)
-            engagement_rate = (daily_active / total_clients * 100) if total_clients > 0 else 0
-            weekly_engagement.append(round(engagement_rate, 1))
-        
-        weekly_engagement.reverse()
-        
-        # Monthly assessments
-        monthly_assessments = []
-        for i in range(6):
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start + timedelta(days=30)
-            
-            monthly_count = Assessment.objects.filter(
-                user_id__in=client_ids,
-                completed_at__range=[month_start, month_end]
-            ).count()
-            monthly_assessments.append(monthly_count)
-        
-        monthly_assessments.reverse()
-        
-        # Risk trends (placeholder)
-        risk_trends = [10, 15, 20, 25, 20, 15, 12]
-        
-        return {
-            'weeklyEngagement': weekly_engagement,
-            'monthlyAssessments': monthly_assessments,
-            'riskTrends': risk_trends
-        }
+        return build_trends(
+            Assessment.objects.filter(user_id__in=client_ids),
+            len(client_ids)
+        )
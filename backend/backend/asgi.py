@@ -0,0 +1,31 @@
+"""
+ASGI config for edumindsolutions project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn backend.asgi:application``) to
+enable the realtime event stream at /api/realtime/stream/.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+application = get_asgi_application()
+
+# Sample host CPU/memory/disk, record per-minute performance trends,
+# evaluate alert rules and refresh the dashboard snapshots (one process per
+# host) in the background
+from analytics.snapshots import start_refresher  # noqa: E402
+from backend.alerting import start_alerting  # noqa: E402
+from backend.system_sampler import start_sampler  # noqa: E402
+from backend.timeseries import start_recorder  # noqa: E402
+
+start_sampler()
+start_recorder()
+start_alerting()
+start_refresher()
@@ -0,0 +1,60 @@
+"""
+Helpers for denormalized counter columns.
+
+Counters are only ever changed with relative ``F()`` updates, so
+concurrent writers never lose increments, and models listing their
+``counter_fields`` in CounterFieldsMixin leave them out of full saves.
+"""
+
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+
+def adjust_counter(model, pk, field, delta):
+    """Atomically apply ``delta`` to a denormalized counter column"""
+    expression = F(field) + delta
+    if delta < 0:
+        # Never let drift push a PositiveIntegerField below zero
+        expression = Case(
+            When(**{f'{field}__gte': -delta}, then=expression),
+            default=Value(0),
+        )
+    model.objects.filter(pk=pk).update(**{field: expression})
+
+
+def apply_counter_deltas(model, deltas):
+    """
+    Apply ``{pk: {field: delta}}`` to denormalized counter columns in one
+    UPDATE; PositiveIntegerField counters never drop below zero
+    """
+    updates = {}
+    for field in {field for changes in deltas.values() for field in changes}:
+        whens = [
+            When(pk=pk, then=Value(changes[field]))
+            for pk, changes in deltas.items() if changes.get(field)
+        ]
+        if not whens:
+            continue
+        expression = F(field) + Case(*whens, default=Value(0))
+        if isinstance(model._meta.get_field(field), models.PositiveIntegerField):
+            expression = Greatest(expression, 0)
+        updates[field] = expression
+    if updates:
+        model.objects.filter(pk__in=list(deltas)).update(**updates)
+
+
+class CounterFieldsMixin:
+    """
+    Leave ``counter_fields`` out of the UPDATE when an existing row is
+    saved, so editing a stale instance cannot overwrite its counters
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
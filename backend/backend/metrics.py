@@ -0,0 +1,452 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and fixed-bucket histograms are kept in memory per worker
+process and only touched under a short lock, so recording a request never
+does a shared-cache read-modify-write. Each process periodically writes a
+JSON snapshot of its own values to ``METRICS_DIR`` (one file per pid,
+replaced atomically); readers merge every worker's file, substituting the
+live values of the current process.
+
+Counters only grow, like Prometheus counters, so ``METRICS_DIR`` should
+be emptied on deploy. Gauges from files that have not been refreshed for
+``METRICS_STALE_SECONDS`` are ignored. Stale files of processes that no
+longer exist are folded into an archive snapshot (``metrics-0.json``)
+that keeps their counters and histograms, so the merged totals do not go
+backwards when a worker is recycled.
+
+``render_prometheus`` turns the merged values into the text exposition
+format served at ``/metrics``, so a scrape only reads the worker files.
+"""
+
+import atexit
+import contextvars
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import psutil
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; one implicit +Inf bucket follows
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_FLUSH_SECONDS = 10
+DEFAULT_STALE_SECONDS = 60
+
+# Snapshot holding the counters and histograms of exited workers
+ARCHIVE_PID = 0
+
+# Query counts and database seconds spent per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUESTS_TOTAL = 'http_requests_total'
+REQUEST_DURATION = 'http_request_duration_seconds'
+REQUESTS_IN_FLIGHT = 'http_requests_in_flight'
+REQUEST_DB_QUERIES = 'http_request_db_queries'
+REQUEST_DB_SECONDS = 'http_request_db_seconds'
+CACHE_REQUESTS = 'cache_requests_total'
+QUEUE_DEPTH = 'background_queue_depth'
+PROCESS_RSS = 'process_resident_memory_bytes'
+PROCESS_CPU = 'process_cpu_seconds'
+WORKERS = 'metrics_workers'
+
+METRIC_INFO = {
+    REQUESTS_TOTAL: ('counter', 'HTTP requests by route, method and status code.'),
+    REQUEST_DURATION: ('histogram', 'HTTP request latency by route and method.'),
+    REQUESTS_IN_FLIGHT: ('gauge', 'HTTP requests currently being served.'),
+    REQUEST_DB_QUERIES: ('histogram', 'Database queries executed per request, by route.'),
+    REQUEST_DB_SECONDS: ('histogram', 'Database time per request in seconds, by route.'),
+    CACHE_REQUESTS: ('counter', 'Cache lookups by result (hit or miss).'),
+    QUEUE_DEPTH: ('gauge', 'Background jobs submitted but not yet started, by queue.'),
+    PROCESS_RSS: ('gauge', 'Resident memory of each worker process in bytes.'),
+    # Set from psutil per live worker (not monotonic once a worker exits), so a gauge
+    PROCESS_CPU: ('gauge', 'User and system CPU time used so far by each worker process in seconds.'),
+    WORKERS: ('gauge', 'Worker processes whose metrics are included.'),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_request_queries = contextvars.ContextVar('request_queries', default=None)
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'edumind-metrics')
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Thread-safe metric values for the current process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = defaultdict(float)
+        self._histograms = {}
+        self._last_request = 0.0
+        self._timer = None
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, _labels(labels))] += amount
+        self._schedule()
+
+    def gauge_add(self, name, amount, **labels):
+        with self._lock:
+            self._gauges[(name, _labels(labels))] += amount
+
+    def gauge_set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        index = bisect_left(buckets, value)
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [tuple(buckets), [0] * (len(buckets) + 1), 0.0]
+            histogram[1][index] += 1
+            histogram[2] += value
+        self._schedule()
+
+    def observe_request(self, route, method, status, seconds):
+        """Record one finished request and release its in-flight slot"""
+        with self._lock:
+            self._gauges[(REQUESTS_IN_FLIGHT, ())] -= 1
+            self._last_request = time.time()
+        self.inc(REQUESTS_TOTAL, route=route, method=method, status=str(status))
+        self.observe(REQUEST_DURATION, seconds, route=route, method=method)
+
+    def snapshot(self):
+        """JSON-serialisable copy of this process's values"""
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'updated': time.time(),
+                'last_request': self._last_request,
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                'gauges': [[name, labels, value] for (name, labels), value in self._gauges.items()],
+                'histograms': [
+                    [name, labels, list(buckets), list(counts), total]
+                    for (name, labels), (buckets, counts, total) in self._histograms.items()
+                ],
+            }
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        with self._lock:
+            if self._timer is None:
+                interval = getattr(settings, 'METRICS_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+                self._timer = threading.Timer(interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def sample_process(self):
+        """Record this worker's resident memory and CPU time"""
+        try:
+            process = psutil.Process()
+            with process.oneshot():
+                rss = process.memory_info().rss
+                cpu = process.cpu_times()
+        except psutil.Error:
+            return
+        pid = str(os.getpid())
+        self.gauge_set(PROCESS_RSS, rss, pid=pid)
+        self.gauge_set(PROCESS_CPU, cpu.user + cpu.system, pid=pid)
+
+    def flush(self):
+        """Write this process's snapshot to ``METRICS_DIR``"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not (self._counters or self._histograms):
+                return None
+        self.sample_process()
+        return write_snapshot('metrics', self.snapshot())
+
+    def collect(self):
+        """Values merged across every worker, with this process read live"""
+        snapshots = {snapshot['pid']: snapshot for snapshot in read_snapshots()}
+        self.sample_process()
+        snapshots[os.getpid()] = self.snapshot()
+        return merge(snapshots.values())
+
+
+def write_snapshot(kind, snapshot):
+    """Atomically write ``METRICS_DIR/{kind}-{pid}.json``; returns the path"""
+    directory = metrics_dir()
+    path = os.path.join(directory, f"{kind}-{snapshot['pid']}.json")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as handle:
+            json.dump(snapshot, handle)
+        os.replace(handle.name, path)
+    except OSError:
+        logger.exception("Failed to write %s snapshot to %s", kind, path)
+    return path
+
+
+def read_snapshots(kind='metrics', now=None):
+    """
+    Snapshots of every worker; for ``metrics``, those left by exited
+    processes are folded into the archive snapshot
+    """
+    now = now or time.time()
+    stale_after = getattr(settings, 'METRICS_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    snapshots, exited = [], []
+    for path in glob.glob(os.path.join(metrics_dir(), f'{kind}-*.json')):
+        try:
+            with open(path) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable metrics snapshot %s", path)
+            continue
+        if (kind == 'metrics' and snapshot['pid'] != ARCHIVE_PID
+                and now - snapshot['updated'] > stale_after and not _pid_alive(snapshot['pid'])):
+            exited.append((path, snapshot))
+        else:
+            snapshots.append(snapshot)
+    if exited:
+        archive = archive_snapshots(exited, now)
+        if archive is None:
+            snapshots.extend(snapshot for _, snapshot in exited)
+        else:
+            snapshots = [snapshot for snapshot in snapshots if snapshot['pid'] != ARCHIVE_PID] + [archive]
+    return snapshots
+
+
+def archive_snapshots(exited, now=None):
+    """
+    Fold ``(path, snapshot)`` pairs of exited workers into the archive and
+    delete their files; returns the archive, or None if another process is
+    archiving
+    """
+    from .timeseries import LeaderLock  # timeseries imports this module
+
+    directory = metrics_dir()
+    lock = LeaderLock(os.path.join(directory, 'metrics-archive.lock'))
+    if not lock.acquire():
+        return None
+    try:
+        archive_path = os.path.join(directory, f'metrics-{ARCHIVE_PID}.json')
+        snapshots = []
+        try:
+            with open(archive_path) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            pass
+        # Another process may have archived some of them since they were read
+        exited = [(path, snapshot) for path, snapshot in exited if os.path.exists(path)]
+        merged = merge(snapshots + [snapshot for _, snapshot in exited], now=now)
+        archive = {
+            'pid': ARCHIVE_PID,
+            'updated': now or time.time(),
+            'last_request': merged['last_request'],
+            'counters': [[name, labels, value] for (name, labels), value in merged['counters'].items()],
+            'gauges': [],
+            'histograms': [
+                [name, labels, list(buckets), counts, total]
+                for (name, labels), (buckets, counts, total) in merged['histograms'].items()
+            ],
+        }
+        write_snapshot('metrics', archive)
+        for path, _ in exited:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return archive
+    finally:
+        lock.release()
+
+
+def _pid_alive(pid):
+    return pid > 0 and psutil.pid_exists(pid)
+
+
+def merge(snapshots, now=None):
+    """
+    Sum snapshots into ``{'counters', 'gauges', 'histograms'}`` dicts keyed
+    by ``(name, labels)``; histograms map to ``(buckets, counts, sum)``.
+    """
+    now = now or time.time()
+    stale_after = getattr(settings, 'METRICS_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    counters, gauges, histograms = defaultdict(float), defaultdict(float), {}
+    last_request = 0.0
+    workers = 0
+    for snapshot in snapshots:
+        if snapshot['pid'] != ARCHIVE_PID:
+            workers += 1
+        last_request = max(last_request, snapshot.get('last_request', 0.0))
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        if now - snapshot['updated'] <= stale_after:
+            for name, labels, value in snapshot['gauges']:
+                gauges[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, buckets, counts, total in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            if merged is None or list(merged[0]) != buckets:
+                # Bucket layouts only change on deploy; keep the last one read
+                histograms[key] = (tuple(buckets), list(counts), total)
+            else:
+                histograms[key] = (merged[0], [a + b for a, b in zip(merged[1], counts)], merged[2] + total)
+    return {
+        'counters': dict(counters),
+        'gauges': dict(gauges),
+        'histograms': histograms,
+        'last_request': last_request,
+        'workers': workers,
+    }
+
+
+def _record_query(execute, sql, params, many, context):
+    totals = _request_queries.get()
+    if totals is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        totals[0] += 1
+        totals[1] += time.perf_counter() - started
+
+
+def track_request_queries():
+    """Start counting queries on the default connection for the current request"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+    _request_queries.set([0, 0.0])
+
+
+def request_queries():
+    """``(count, seconds)`` since ``track_request_queries``, or None; stops tracking"""
+    totals = _request_queries.get()
+    _request_queries.set(None)
+    return tuple(totals) if totals is not None else None
+
+
+class CacheMetricsMixin:
+    """Count cache hits and misses for ``get`` (and ``get_many`` built on it)"""
+
+    _metrics_missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._metrics_missing, version)
+        hit = value is not self._metrics_missing
+        registry.inc(CACHE_REQUESTS, result='hit' if hit else 'miss')
+        return value if hit else default
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+def route_label(request):
+    """Resolved URL name (or pattern) of a request; never the raw path"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+def api_summary(collected=None):
+    """
+    Request totals in the shape the monitoring views and alerting expect
+    (``total_requests``, ``status_codes``, ``endpoints``, ...)
+    """
+    collected = collected or registry.collect()
+    status_codes = defaultdict(int)
+    endpoints = {}
+    total_requests = 0
+    for (name, labels), value in collected['counters'].items():
+        if name == REQUESTS_TOTAL:
+            status_codes[dict(labels)['status']] += int(value)
+            total_requests += int(value)
+
+    total_time = 0.0
+    for (name, labels), (_, counts, seconds) in collected['histograms'].items():
+        if name == REQUEST_DURATION:
+            labels = dict(labels)
+            count = sum(counts)
+            total_time += seconds
+            endpoints[f"{labels['method']} {labels['route']}"] = {
+                'count': count,
+                'total_time': seconds,
+                'avg_time': seconds / count if count else 0,
+            }
+
+    return {
+        'total_requests': total_requests,
+        'total_response_time': total_time,
+        'avg_response_time': total_time / total_requests if total_requests else 0,
+        'status_codes': dict(status_codes),
+        'endpoints': endpoints,
+        'concurrent_requests': max(0, int(collected['gauges'].get((REQUESTS_IN_FLIGHT, ()), 0))),
+        'last_updated': collected['last_request'],
+    }
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def render_prometheus(collected):
+    """Text exposition format (version 0.0.4) of ``MetricsRegistry.collect()``"""
+    families = defaultdict(list)
+    for kind in ('counters', 'gauges'):
+        for (name, labels), value in sorted(collected[kind].items()):
+            families[name].append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    families[WORKERS].append(f"{WORKERS} {collected['workers']}")
+
+    for (name, labels), (buckets, counts, total) in sorted(collected['histograms'].items()):
+        lines = families[name]
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ['+Inf'], counts):
+            cumulative += count
+            le = bound if bound == '+Inf' else _format_value(float(bound))
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+    output = []
+    for name in sorted(families):
+        kind, help_text = METRIC_INFO.get(name, ('untyped', name))
+        output.append(f'# HELP {name} {help_text}')
+        output.append(f'# TYPE {name} {kind}')
+        output.extend(families[name])
+    return '\n'.join(output) + '\n'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
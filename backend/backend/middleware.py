@@ -10,11 +10,13 @@ from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from django.conf import settings
 from django.core.cache import cache
-from django.db import connection
 import threading
 import psutil
 import os
 
+from . import metrics, query_profiler
+from .system_sampler import latest_snapshot
+
 # Loggers
 access_logger = logging.getLogger('access')
 performance_logger = logging.getLogger('performance')
@@ -131,9 +133,8 @@ class MonitoringMiddleware(MiddlewareMixin):
     
     def log_performance_metrics(self, request, response, response_time):
         """Log detailed performance metrics"""
-        # Database query metrics
-        db_queries = len(connection.queries) if settings.DEBUG else 0
-        db_time = sum(float(q['time']) for q in connection.queries) if settings.DEBUG else 0
+        # Database query metrics (counted by MetricsMiddleware, DEBUG or not)
+        db_queries, db_time = getattr(request, '_db_queries', (0, 0))
         
         # Memory usage
         process = psutil.Process()
@@ -194,29 +195,22 @@ class MonitoringMiddleware(MiddlewareMixin):
             )
     
     def update_system_metrics(self):
-        """Update system-level metrics in cache"""
+        """Publish the background sampler's latest system snapshot to the cache"""
         try:
-            # CPU and memory metrics
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            # Network metrics
-            network = psutil.net_io_counters()
-            
-            metrics = {
-                'timestamp': time.time(),
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available': memory.available,
-                'disk_percent': disk.percent,
-                'disk_free': disk.free,
-                'network_bytes_sent': network.bytes_sent,
-                'network_bytes_recv': network.bytes_recv,
+            snapshot = latest_snapshot()
+            system_metrics = {
+                'timestamp': snapshot.timestamp,
+                'cpu_percent': snapshot.cpu_percent,
+                'memory_percent': snapshot.memory_percent,
+                'memory_available': snapshot.memory_available,
+                'disk_percent': snapshot.disk_percent,
+                'disk_free': snapshot.disk_free,
+                'network_bytes_sent': snapshot.network_bytes_sent,
+                'network_bytes_recv': snapshot.network_bytes_recv,
             }
             
             # Store in cache for dashboard
-            cache.set('system_metrics', metrics, timeout=60)
+            cache.set('system_metrics', system_metrics, timeout=60)
             
         except Exception as e:
             performance_logger.error(f"Failed to update system metrics: {e}")
@@ -283,61 +277,44 @@ class MonitoringMiddleware(MiddlewareMixin):
 class MetricsMiddleware(MiddlewareMixin):
     """
     Lightweight metrics collection middleware
+
+    Counts requests and records latency histograms per resolved route in
+    the per-process registry (backend/metrics.py), which is flushed to
+    ``METRICS_DIR`` in the background and merged across workers on read.
     """
     
     def process_request(self, request):
-        """Start request timing"""
-        request._monitoring_start_time = time.time()
+        """Start request timing and query counting"""
+        request._monitoring_start_time = time.perf_counter()
+        metrics.registry.gauge_add(metrics.REQUESTS_IN_FLIGHT, 1)
+        metrics.track_request_queries()
+        query_profiler.profiler.start()
         return None
     
     def process_response(self, request, response):
         """Collect response metrics"""
         if hasattr(request, '_monitoring_start_time'):
-            response_time = time.time() - request._monitoring_start_time
-            
-            # Update metrics in cache
+            response_time = time.perf_counter() - request._monitoring_start_time
             self.update_metrics(request, response, response_time)
         
         return response
     
     def update_metrics(self, request, response, response_time):
-        """Update aggregated metrics"""
+        """Record the request in the metrics registry"""
         try:
-            # Get current metrics
-            metrics = cache.get('api_metrics', {
-                'total_requests': 0,
-                'total_response_time': 0,
-                'status_codes': {},
-                'endpoints': {},
-                'last_updated': time.time(),
-            })
-            
-            # Update counters
-            metrics['total_requests'] += 1
-            metrics['total_response_time'] += response_time
-            metrics['last_updated'] = time.time()
-            
-            # Track status codes
-            status_code = str(response.status_code)
-            metrics['status_codes'][status_code] = metrics['status_codes'].get(status_code, 0) + 1
-            
-            # Track endpoints
-            endpoint = f"{request.method} {request.path}"
-            if endpoint not in metrics['endpoints']:
-                metrics['endpoints'][endpoint] = {
-                    'count': 0,
-                    'total_time': 0,
-                    'avg_time': 0,
-                }
-            
-            endpoint_metrics = metrics['endpoints'][endpoint]
-            endpoint_metrics['count'] += 1
-            endpoint_metrics['total_time'] += response_time
-            endpoint_metrics['avg_time'] = endpoint_metrics['total_time'] / endpoint_metrics['count']
-            
-            # Store updated metrics
-            cache.set('api_metrics', metrics, timeout=3600)
-            
+            route = metrics.route_label(request)
+            metrics.registry.observe_request(route, request.method, response.status_code, response_time)
+            queries = metrics.request_queries()
+            query_profiler.profiler.finish(route, response)
+            if queries is not None:
+                count, db_time = queries
+                request._db_queries = queries
+                metrics.registry.observe(
+                    metrics.REQUEST_DB_QUERIES, count, buckets=metrics.QUERY_COUNT_BUCKETS, route=route
+                )
+                metrics.registry.observe(
+                    metrics.REQUEST_DB_SECONDS, db_time, buckets=metrics.DB_TIME_BUCKETS, route=route
+                )
         except Exception as e:
             performance_logger.error(f"Failed to update metrics: {e}")
 
@@ -3,19 +3,25 @@ Monitoring and Observability API Views
 Provides endpoints for monitoring dashboards and alerting systems
 """
 
+import hmac
 import time
 import json
 import logging
 from datetime import datetime, timedelta
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.core.cache import cache
 from django.db import connection
 from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
 import psutil
 import os
 
+from . import metrics, query_profiler, timeseries
+from .system_sampler import latest_snapshot
+
 # Loggers
 performance_logger = logging.getLogger('performance')
 
@@ -24,47 +30,37 @@ performance_logger = logging.getLogger('performance')
 def system_metrics(request):
     """Get current system metrics"""
     try:
-        # Get cached metrics or generate new ones
-        metrics = cache.get('system_metrics')
-        
-        if not metrics:
-            # Generate fresh metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            network = psutil.net_io_counters()
-            
-            metrics = {
-                'timestamp': time.time(),
-                'cpu': {
-                    'percent': cpu_percent,
-                    'count': psutil.cpu_count(),
-                },
-                'memory': {
-                    'percent': memory.percent,
-                    'total': memory.total,
-                    'available': memory.available,
-                    'used': memory.used,
-                },
-                'disk': {
-                    'percent': disk.percent,
-                    'total': disk.total,
-                    'free': disk.free,
-                    'used': disk.used,
-                },
-                'network': {
-                    'bytes_sent': network.bytes_sent,
-                    'bytes_recv': network.bytes_recv,
-                    'packets_sent': network.packets_sent,
-                    'packets_recv': network.packets_recv,
-                },
-            }
-            
-            cache.set('system_metrics', metrics, timeout=30)
+        # Latest snapshot from the background sampler; never blocks
+        snapshot = latest_snapshot()
+        data = {
+            'timestamp': snapshot.timestamp,
+            'cpu': {
+                'percent': snapshot.cpu_percent,
+                'count': snapshot.cpu_count,
+            },
+            'memory': {
+                'percent': snapshot.memory_percent,
+                'total': snapshot.memory_total,
+                'available': snapshot.memory_available,
+                'used': snapshot.memory_used,
+            },
+            'disk': {
+                'percent': snapshot.disk_percent,
+                'total': snapshot.disk_total,
+                'free': snapshot.disk_free,
+                'used': snapshot.disk_used,
+            },
+            'network': {
+                'bytes_sent': snapshot.network_bytes_sent,
+                'bytes_recv': snapshot.network_bytes_recv,
+                'packets_sent': snapshot.network_packets_sent,
+                'packets_recv': snapshot.network_packets_recv,
+            },
+        }
         
         return JsonResponse({
             'status': 'success',
-            'data': metrics
+            'data': data
         })
         
     except Exception as e:
@@ -79,22 +75,8 @@ def system_metrics(request):
 def application_metrics(request):
     """Get application-specific metrics"""
     try:
-        # Get API metrics from cache
-        api_metrics = cache.get('api_metrics', {
-            'total_requests': 0,
-            'total_response_time': 0,
-            'status_codes': {},
-            'endpoints': {},
-            'last_updated': time.time(),
-        })
-        
-        # Calculate derived metrics
-        avg_response_time = 0
-        if api_metrics['total_requests'] > 0:
-            avg_response_time = api_metrics['total_response_time'] / api_metrics['total_requests']
-        
-        # Get concurrent requests
-        concurrent_requests = cache.get('concurrent_requests', 0)
+        # Request metrics merged across worker processes
+        api_metrics = metrics.api_summary()
         
         # Database metrics
         db_metrics = get_database_metrics()
@@ -107,8 +89,8 @@ def application_metrics(request):
             'data': {
                 'api': {
                     'total_requests': api_metrics['total_requests'],
-                    'avg_response_time': round(avg_response_time, 3),
-                    'concurrent_requests': concurrent_requests,
+                    'avg_response_time': round(api_metrics['avg_response_time'], 3),
+                    'concurrent_requests': api_metrics['concurrent_requests'],
                     'status_codes': api_metrics['status_codes'],
                     'top_endpoints': get_top_endpoints(api_metrics['endpoints']),
                     'last_updated': api_metrics['last_updated'],
@@ -145,7 +127,7 @@ def health_metrics(request):
             overall_status = 'degraded'
         
         # Check for critical issues
-        if (system_health.get('cpu_percent', 0) > 90 or 
+        if ((system_health.get('cpu_percent') or 0) > 90 or 
             system_health.get('memory_percent', 0) > 90 or
             not db_health['healthy']):
             overall_status = 'unhealthy'
@@ -212,16 +194,8 @@ def performance_trends(request):
         # Get time range from query parameters
         hours = int(request.GET.get('hours', 24))
         
-        # Get performance data from cache/storage
-        # In production, this would come from a time-series database
-        trends = cache.get(f'performance_trends_{hours}h', {
-            'response_times': [],
-            'request_rates': [],
-            'error_rates': [],
-            'cpu_usage': [],
-            'memory_usage': [],
-            'timestamps': [],
-        })
+        # Per-minute points with 5-minute/hourly rollups (backend/timeseries.py)
+        trends = timeseries.performance_trends(hours)
         
         return JsonResponse({
             'status': 'success',
@@ -236,6 +210,65 @@ def performance_trends(request):
         }, status=500)
 
 
+def has_metrics_access(request):
+    """
+    True for the METRICS_BEARER_TOKEN bearer token or a staff user (session
+    or JWT); METRICS_AUTH_DISABLED opens the endpoints explicitly
+    """
+    if getattr(settings, 'METRICS_AUTH_DISABLED', False):
+        return True
+    
+    token = getattr(settings, 'METRICS_BEARER_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+        return True
+    
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user = (JWTAuthentication().authenticate(request) or (None, None))[0]
+        except AuthenticationFailed:
+            user = None
+    return bool(user and user.is_active and user.is_staff)
+
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """Metrics of all worker processes in the Prometheus text format"""
+    if not has_metrics_access(request):
+        return HttpResponse(status=401)
+    
+    return HttpResponse(
+        metrics.render_prometheus(metrics.registry.collect()),
+        content_type=metrics.CONTENT_TYPE
+    )
+
+
+@require_http_methods(["GET"])
+def query_profile(request):
+    """Per-route database query profile of the sampled requests"""
+    if not has_metrics_access(request):
+        return HttpResponse(status=401)
+    
+    try:
+        top = int(request.GET.get('top', 5))
+        report = query_profiler.report(top=top)
+        if request.GET.get('flagged') in ('1', 'true'):
+            report['routes'] = [route for route in report['routes'] if route['grows_with_result_size']]
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': report
+        })
+        
+    except Exception as e:
+        performance_logger.error(f"Failed to build query profile: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=500)
+
+
 @require_http_methods(["POST"])
 @csrf_exempt
 def alert_webhook(request):
@@ -334,22 +367,20 @@ def get_process_metrics():
 def check_system_health():
     """Check overall system health"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        snapshot = latest_snapshot()
         
-        # Health thresholds
-        cpu_healthy = cpu_percent < 80
-        memory_healthy = memory.percent < 85
-        disk_healthy = disk.percent < 90
+        # Health thresholds (CPU is None until the sampler's first reading)
+        cpu_healthy = snapshot.cpu_percent is None or snapshot.cpu_percent < 80
+        memory_healthy = snapshot.memory_percent < 85
+        disk_healthy = snapshot.disk_percent < 90
         
         return {
             'healthy': cpu_healthy and memory_healthy and disk_healthy,
-            'cpu_percent': cpu_percent,
+            'cpu_percent': snapshot.cpu_percent,
             'cpu_healthy': cpu_healthy,
-            'memory_percent': memory.percent,
+            'memory_percent': snapshot.memory_percent,
             'memory_healthy': memory_healthy,
-            'disk_percent': disk.percent,
+            'disk_percent': snapshot.disk_percent,
             'disk_healthy': disk_healthy,
         }
         
@@ -386,8 +417,7 @@ def check_application_health():
     """Check application-specific health"""
     try:
         # Check if critical services are running
-        api_metrics = cache.get('api_metrics', {})
-        last_request = api_metrics.get('last_updated', 0)
+        last_request = metrics.api_summary()['last_updated']
         
         # Consider app healthy if it received requests in the last 5 minutes
         app_active = (time.time() - last_request) < 300
@@ -0,0 +1,252 @@
+"""
+Sampled per-request database query profiler.
+
+MetricsMiddleware profiles a random ``QUERY_PROFILER_SAMPLE_RATE`` share
+of requests. An execute wrapper on the default connection (so it works
+with DEBUG off, unlike ``connection.queries``) records each query's
+fingerprint -- the SQL with literals, placeholders and IN lists collapsed
+-- and its time. Every process keeps per-route aggregates: sampled
+requests, query count and DB time, the most repeated fingerprints, and
+recent ``(result size, query count)`` pairs. They are written next to the
+metrics snapshots in ``METRICS_DIR`` and merged by ``report()``, which
+flags routes whose query count grows with the number of items returned
+(the N+1 signature).
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 0.05
+
+# Per route: distinct fingerprints kept and (result size, queries) pairs
+MAX_FINGERPRINTS = 200
+MAX_SAMPLES = 500
+
+# Routes adding at least this many queries per returned item are flagged
+GROWTH_THRESHOLD = 0.5
+MIN_GROWTH_SAMPLES = 5
+
+OTHER_FINGERPRINT = '<other>'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_request_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+def fingerprint(sql):
+    """SQL with literal values replaced by ``?`` and IN lists collapsed"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def result_size(response):
+    """Number of items a DRF response returned (paginated or not), else None"""
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    if isinstance(data, list):
+        return len(data)
+    return None
+
+
+def _profile_query(execute, sql, params, many, context):
+    profile = _request_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        entry = profile.setdefault(fingerprint(sql), [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - started
+
+
+def sample_rate():
+    return getattr(settings, 'QUERY_PROFILER_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+
+
+def growth(samples):
+    """Least-squares extra queries per returned item, or None if undetermined"""
+    if len(samples) < MIN_GROWTH_SAMPLES:
+        return None
+    n = len(samples)
+    mean_size = sum(size for size, _ in samples) / n
+    mean_queries = sum(queries for _, queries in samples) / n
+    variance = sum((size - mean_size) ** 2 for size, _ in samples)
+    if not variance:
+        return None
+    covariance = sum((size - mean_size) * (queries - mean_queries) for size, queries in samples)
+    return covariance / variance
+
+
+class QueryProfiler:
+    """Per-route query aggregates of the sampled requests in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._timer = None
+
+    def start(self, rate=None):
+        """Profile the current request with probability ``rate``; returns whether it is"""
+        rate = sample_rate() if rate is None else rate
+        if rate <= 0 or random.random() >= rate:
+            _request_profile.set(None)
+            return False
+        if _profile_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_profile_query)
+        _request_profile.set({})
+        return True
+
+    def finish(self, route, response=None):
+        """Fold the current request's queries into ``route``; stops profiling"""
+        profile = _request_profile.get()
+        _request_profile.set(None)
+        if profile is None:
+            return None
+        count = sum(entry[0] for entry in profile.values())
+        seconds = sum(entry[1] for entry in profile.values())
+        size = result_size(response) if response is not None else None
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'requests': 0, 'queries': 0, 'seconds': 0.0, 'max_queries': 0,
+                    'fingerprints': {}, 'samples': deque(maxlen=MAX_SAMPLES),
+                }
+            stats['requests'] += 1
+            stats['queries'] += count
+            stats['seconds'] += seconds
+            stats['max_queries'] = max(stats['max_queries'], count)
+            if size is not None:
+                stats['samples'].append((size, count))
+            fingerprints = stats['fingerprints']
+            for sql, (executions, elapsed) in profile.items():
+                if sql not in fingerprints and len(fingerprints) >= MAX_FINGERPRINTS:
+                    sql = OTHER_FINGERPRINT
+                entry = fingerprints.setdefault(sql, [0, 0.0, 0])
+                entry[0] += executions
+                entry[1] += elapsed
+                entry[2] = max(entry[2], executions)
+        self._schedule()
+        return count, seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'updated': time.time(),
+                'routes': {
+                    route: dict(stats, samples=[list(sample) for sample in stats['samples']])
+                    for route, stats in self._routes.items()
+                },
+            }
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        with self._lock:
+            if self._timer is None:
+                interval = getattr(settings, 'METRICS_FLUSH_SECONDS', metrics.DEFAULT_FLUSH_SECONDS)
+                self._timer = threading.Timer(interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write this process's aggregates to ``METRICS_DIR``"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._routes:
+                return None
+        return metrics.write_snapshot('queries', self.snapshot())
+
+    def collect(self):
+        """Snapshots of every worker, with this process read live"""
+        snapshots = {snapshot['pid']: snapshot for snapshot in metrics.read_snapshots('queries')}
+        snapshots[os.getpid()] = self.snapshot()
+        return list(snapshots.values())
+
+
+def report(snapshots=None, top=5):
+    """
+    Merge per-worker aggregates into one entry per route, most queries per
+    request first, with ``grows_with_result_size`` set on N+1 suspects
+    """
+    snapshots = profiler.collect() if snapshots is None else snapshots
+    merged = {}
+    for snapshot in snapshots:
+        for route, stats in snapshot['routes'].items():
+            total = merged.setdefault(route, {
+                'requests': 0, 'queries': 0, 'seconds': 0.0, 'max_queries': 0,
+                'fingerprints': {}, 'samples': [],
+            })
+            total['requests'] += stats['requests']
+            total['queries'] += stats['queries']
+            total['seconds'] += stats['seconds']
+            total['max_queries'] = max(total['max_queries'], stats['max_queries'])
+            total['samples'].extend(tuple(sample) for sample in stats['samples'])
+            for sql, (executions, elapsed, peak) in stats['fingerprints'].items():
+                entry = total['fingerprints'].setdefault(sql, [0, 0.0, 0])
+                entry[0] += executions
+                entry[1] += elapsed
+                entry[2] = max(entry[2], peak)
+
+    routes = []
+    for route, total in merged.items():
+        requests = total['requests']
+        per_item = growth(total['samples'])
+        fingerprints = sorted(total['fingerprints'].items(), key=lambda item: (-item[1][0], item[0]))
+        routes.append({
+            'route': route,
+            'sampled_requests': requests,
+            'avg_queries': total['queries'] / requests,
+            'max_queries': total['max_queries'],
+            'avg_db_time': total['seconds'] / requests,
+            'queries_per_item': per_item,
+            'grows_with_result_size': per_item is not None and per_item >= GROWTH_THRESHOLD,
+            'top_fingerprints': [
+                {
+                    'sql': sql,
+                    'executions': executions,
+                    'avg_per_request': executions / requests,
+                    'max_per_request': peak,
+                    'total_time': elapsed,
+                }
+                for sql, (executions, elapsed, peak) in fingerprints[:top]
+            ],
+        })
+    routes.sort(key=lambda entry: (-entry['avg_queries'], entry['route']))
+    return {
+        'sample_rate': sample_rate(),
+        'workers': len(snapshots),
+        'routes': routes,
+        'flagged': [entry['route'] for entry in routes if entry['grows_with_result_size']],
+    }
+
+
+profiler = QueryProfiler()
+atexit.register(profiler.flush)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/1.11/ref/settings/
 """
 
 import os
+import tempfile
 from decouple import config
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
     'crisis',
     'guide',
     'notifications',
+    'realtime',
+    'analytics',
 
     # Third-party apps
     'rest_framework',
@@ -99,7 +102,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'backend.middleware.HealthCheckMiddleware',
     # 'backend.middleware.MonitoringMiddleware',  # Temporarily disabled due to logging issues
-    # 'backend.middleware.MetricsMiddleware',     # Temporarily disabled due to logging issues
+    'backend.middleware.MetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -121,6 +124,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 
 # Database
@@ -390,4 +394,92 @@ ADMIN_EMAIL = config('ADMIN_EMAIL', default='57joel36@gmail.com')
 ADMIN_FIRST_NAME = config('ADMIN_FIRST_NAME', default='Joel')
 ADMIN_LAST_NAME = config('ADMIN_LAST_NAME', default='Minani')
 ADMIN_PASSWORD = config('ADMIN_PASSWORD', default='admin123')
-ADMIN_ROLE = config('ADMIN_ROLE', default='admin')
\ No newline at end of file
+ADMIN_ROLE = config('ADMIN_ROLE', default='admin')
+# Notification fan-out (content publish notifications are written in bulk
+# batches after commit, on a background worker unless disabled)
+NOTIFICATION_FANOUT_ASYNC = config('NOTIFICATION_FANOUT_ASYNC', default=True, cast=bool)
+NOTIFICATION_FANOUT_BATCH_SIZE = config('NOTIFICATION_FANOUT_BATCH_SIZE', default=1000, cast=int)
+
+# Realtime push (Server-Sent Events). The stream is off by default: it
+# needs an ASGI server, and LocalBroker is in-process only, so publishers
+# and streams must share one worker, e.g.
+#   gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker --workers 1
+# unless a shared broker implementing realtime.broker.BaseBroker is
+# configured. While disabled the endpoint answers 503 and clients poll.
+PUSH_STREAM_ENABLED = config('PUSH_STREAM_ENABLED', default=False, cast=bool)
+PUSH_BROKER = config('PUSH_BROKER', default='realtime.broker.LocalBroker')
+PUSH_HISTORY_SIZE = config('PUSH_HISTORY_SIZE', default=1000, cast=int)
+PUSH_HEARTBEAT_SECONDS = config('PUSH_HEARTBEAT_SECONDS', default=15, cast=int)
+
+# Content view/play counters are buffered in memory and flushed as F()
+# updates (view rows via bulk_create) every few seconds or once this many
+# writes are pending; disable buffering to write on every request. Writes
+# that keep failing are dropped after CONTENT_COUNTER_MAX_ATTEMPTS flushes.
+CONTENT_COUNTER_BUFFERED = config('CONTENT_COUNTER_BUFFERED', default=True, cast=bool)
+CONTENT_COUNTER_FLUSH_SECONDS = config('CONTENT_COUNTER_FLUSH_SECONDS', default=5, cast=float)
+CONTENT_COUNTER_MAX_PENDING = config('CONTENT_COUNTER_MAX_PENDING', default=1000, cast=int)
+CONTENT_COUNTER_MAX_ATTEMPTS = config('CONTENT_COUNTER_MAX_ATTEMPTS', default=3, cast=int)
+
+# Emotion analysis runs on a background worker pool; results are cached by
+# image hash. LocalAnalyzer gives deterministic results without network.
+MOOD_ANALYZER = config('MOOD_ANALYZER', default='mood.analysis.AzureFaceAnalyzer')
+MOOD_ANALYSIS_ASYNC = config('MOOD_ANALYSIS_ASYNC', default=True, cast=bool)
+MOOD_ANALYSIS_WORKERS = config('MOOD_ANALYSIS_WORKERS', default=4, cast=int)
+MOOD_ANALYSIS_CACHE_SECONDS = config('MOOD_ANALYSIS_CACHE_SECONDS', default=86400, cast=int)
+
+# Request metrics are aggregated in memory per worker process and flushed
+# to one JSON file per worker in METRICS_DIR (clear it on deploy), a
+# runtime directory under the system temp dir outside the source tree.
+METRICS_DIR = config('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'edumind-metrics'))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=10, cast=float)
+METRICS_STALE_SECONDS = config('METRICS_STALE_SECONDS', default=60, cast=float)
+
+# /metrics (Prometheus text format) and /monitoring/queries/ require this
+# bearer token or a staff user; METRICS_AUTH_DISABLED opens them, e.g. for
+# a scraper on a private network
+METRICS_BEARER_TOKEN = config('METRICS_BEARER_TOKEN', default='')
+METRICS_AUTH_DISABLED = config('METRICS_AUTH_DISABLED', default=False, cast=bool)
+
+# Local-memory cache that counts hits and misses for /metrics
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='backend.metrics.InstrumentedLocMemCache'),
+    }
+}
+
+# Host CPU/memory/disk/network are sampled by one background thread per
+# process; monitoring views read the latest sample or the ring buffer
+# (SYSTEM_SAMPLE_HISTORY samples, one hour by default).
+SYSTEM_SAMPLE_SECONDS = config('SYSTEM_SAMPLE_SECONDS', default=5, cast=float)
+SYSTEM_SAMPLE_HISTORY = config('SYSTEM_SAMPLE_HISTORY', default=720, cast=int)
+
+# Performance trends are recorded once a minute (by one process per host)
+# into an SQLite file and rolled up into 5-minute and hourly points.
+TIMESERIES_ENABLED = config('TIMESERIES_ENABLED', default=True, cast=bool)
+TIMESERIES_PATH = config('TIMESERIES_PATH', default=os.path.join(BASE_DIR, 'logs', 'timeseries.sqlite3'))
+
+# Alert rules are evaluated over the recorded series by one process per
+# host (whichever holds logs/alerting.lock): a thread in the web process
+# when ENABLE_ALERTING, or `manage.py run_alerts`. The lock is per host, so
+# every host alerts on its own series; run `run_alerts` on one host (with
+# ENABLE_ALERTING=False) to alert once. Notifications are sent by a worker
+# pool and retried with exponential backoff.
+ENABLE_ALERTING = config('ENABLE_ALERTING', default=True, cast=bool)
+ALERT_EVALUATION_SECONDS = config('ALERT_EVALUATION_SECONDS', default=30, cast=float)
+ALERT_REPEAT_SECONDS = config('ALERT_REPEAT_SECONDS', default=3600, cast=float)
+ALERT_NOTIFY_RETRIES = config('ALERT_NOTIFY_RETRIES', default=3, cast=int)
+ALERT_NOTIFY_BACKOFF_SECONDS = config('ALERT_NOTIFY_BACKOFF_SECONDS', default=5, cast=float)
+
+# Share of requests whose queries are fingerprinted per route for
+# /monitoring/queries/ and `manage.py query_report` (0 disables)
+QUERY_PROFILER_SAMPLE_RATE = config('QUERY_PROFILER_SAMPLE_RATE', default=0.05, cast=float)
+
+# Dashboard aggregates are served from stored snapshots, recomputed every
+# ANALYTICS_SNAPSHOT_SECONDS by one process per host (whichever holds
+# ANALYTICS_LOCK_PATH): a thread in the web process when
+# ENABLE_ANALYTICS_REFRESHER, or `manage.py refresh_analytics`; a snapshot
+# older than ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS is recomputed on request.
+ENABLE_ANALYTICS_REFRESHER = config('ENABLE_ANALYTICS_REFRESHER', default=True, cast=bool)
+ANALYTICS_SNAPSHOT_SECONDS = config('ANALYTICS_SNAPSHOT_SECONDS', default=300, cast=float)
+ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS = config('ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS', default=900, cast=float)
+ANALYTICS_LOCK_PATH = config('ANALYTICS_LOCK_PATH', default=os.path.join(BASE_DIR, 'logs', 'analytics.lock'))
@@ -0,0 +1,164 @@
+"""
+Background sampling of host CPU, memory, disk and network usage.
+
+One daemon thread per process takes a psutil snapshot every
+``SYSTEM_SAMPLE_SECONDS`` and keeps the last ``SYSTEM_SAMPLE_HISTORY`` of
+them in a ring buffer. Views, middleware and the alert collector read the
+latest snapshot instead of calling ``psutil.cpu_percent(interval=1)``,
+which blocked the calling worker for a second; ``history`` gives the
+recent series used by the performance trends endpoint.
+
+CPU percentages are measured between consecutive samples, so only the
+thread calls ``psutil.cpu_percent``; until it has recorded a sample,
+``latest`` returns a snapshot whose ``cpu_percent`` is None. The thread is
+started by the WSGI/ASGI entry points and restarted lazily in forked
+workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import psutil
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SECONDS = 5
+DEFAULT_HISTORY = 720
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """Host resource usage at ``timestamp``"""
+
+    timestamp: float
+    cpu_percent: Optional[float]
+    cpu_count: int
+    memory_percent: float
+    memory_total: int
+    memory_available: int
+    memory_used: int
+    disk_percent: float
+    disk_total: int
+    disk_free: int
+    disk_used: int
+    network_bytes_sent: int = 0
+    network_bytes_recv: int = 0
+    network_packets_sent: int = 0
+    network_packets_recv: int = 0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def take_snapshot(cpu=True):
+    """
+    Read current usage; CPU is the percentage since the previous call, or
+    None without ``cpu`` (which leaves the sampler's baseline untouched)
+    """
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    try:
+        network = psutil.net_io_counters()
+    except (OSError, RuntimeError):
+        network = None
+    return SystemSnapshot(
+        timestamp=time.time(),
+        cpu_percent=psutil.cpu_percent(interval=None) if cpu else None,
+        cpu_count=psutil.cpu_count(),
+        memory_percent=memory.percent,
+        memory_total=memory.total,
+        memory_available=memory.available,
+        memory_used=memory.used,
+        disk_percent=disk.percent,
+        disk_total=disk.total,
+        disk_free=disk.free,
+        disk_used=disk.used,
+        network_bytes_sent=network.bytes_sent if network else 0,
+        network_bytes_recv=network.bytes_recv if network else 0,
+        network_packets_sent=network.packets_sent if network else 0,
+        network_packets_recv=network.packets_recv if network else 0,
+    )
+
+
+class SystemSampler:
+    """Ring buffer of SystemSnapshots filled by a daemon thread"""
+
+    def __init__(self, interval=None, history=None):
+        self.interval = interval or getattr(settings, 'SYSTEM_SAMPLE_SECONDS', DEFAULT_SAMPLE_SECONDS)
+        self._samples = deque(maxlen=history or getattr(settings, 'SYSTEM_SAMPLE_HISTORY', DEFAULT_HISTORY))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Start sampling in this process (no-op if already running here)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            # A forked worker inherits the buffer but not the thread
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='system-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def record(self):
+        """Take one snapshot and append it to the buffer"""
+        snapshot = take_snapshot()
+        with self._lock:
+            self._samples.append(snapshot)
+        return snapshot
+
+    def _run(self):
+        # The first cpu_percent call only sets the baseline
+        psutil.cpu_percent(interval=None)
+        while not self._stop.wait(self.interval):
+            try:
+                self.record()
+            except Exception:
+                logger.exception("System sampling failed")
+
+    def latest(self):
+        """
+        Most recent snapshot; before the thread's first sample, current
+        usage without CPU (never blocks or moves the CPU baseline)
+        """
+        self.start()
+        with self._lock:
+            if self._samples:
+                return self._samples[-1]
+        return take_snapshot(cpu=False)
+
+    def history(self, seconds=None):
+        """Buffered snapshots, oldest first, optionally only the last ``seconds``"""
+        self.start()
+        with self._lock:
+            samples = list(self._samples)
+        if seconds is not None:
+            since = time.time() - seconds
+            samples = [sample for sample in samples if sample.timestamp >= since]
+        return samples
+
+
+_sampler = SystemSampler()
+
+
+def get_sampler():
+    return _sampler
+
+
+def start_sampler():
+    _sampler.start()
+
+
+def latest_snapshot():
+    return _sampler.latest()
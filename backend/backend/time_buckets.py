@@ -0,0 +1,120 @@
+"""
+Calendar bucketing for analytics time series.
+
+``bucketed`` groups a queryset by day, ISO week or month with a single
+``Trunc``-grouped query and returns one row per bucket in the requested
+range, filling buckets that have no rows. Dashboards use it instead of
+issuing one COUNT per day or month; ``in_buckets`` is the underlying
+range filter and annotation for series that need extra group-by columns.
+``current_streak`` counts consecutive active days from one query of
+distinct dates instead of one EXISTS per day.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import DateField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+PERIODS = ('day', 'week', 'month')
+
+
+def bucket_start(value, period):
+    """Start date of the bucket containing ``value``"""
+    if period == 'day':
+        return value
+    if period == 'week':
+        return value - timedelta(days=value.weekday())
+    if period == 'month':
+        return value.replace(day=1)
+    raise ValueError(f"Unknown period '{period}', expected one of {PERIODS}")
+
+
+def shift(value, period, count):
+    """Move a bucket start ``count`` buckets forward (or back when negative)"""
+    if period == 'day':
+        return value + timedelta(days=count)
+    if period == 'week':
+        return value + timedelta(weeks=count)
+    if period == 'month':
+        month = value.year * 12 + value.month - 1 + count
+        return date(month // 12, month % 12 + 1, 1)
+    raise ValueError(f"Unknown period '{period}', expected one of {PERIODS}")
+
+
+def bucket_range(period, buckets, end=None):
+    """Start dates of the last ``buckets`` buckets ending with the one containing ``end``"""
+    last = bucket_start(end or timezone.localdate(), period)
+    return [shift(last, period, offset) for offset in range(1 - buckets, 1)]
+
+
+def in_buckets(queryset, field, period, buckets, end=None):
+    """
+    Restrict ``queryset`` to the last ``buckets`` buckets and annotate each
+    row with its ``bucket`` start date.
+
+    Returns ``(starts, queryset)`` so callers can group by ``bucket`` plus
+    their own columns and zero-fill against ``starts``.
+    """
+    starts = bucket_range(period, buckets, end)
+    lower, upper = starts[0], shift(starts[-1], period, 1)
+    if _is_datetime(queryset.model, field):
+        # Compare against local midnights so the range stays index-friendly
+        lower, upper = _local_midnight(lower), _local_midnight(upper)
+    queryset = (
+        queryset.filter(**{f'{field}__gte': lower, f'{field}__lt': upper})
+        .order_by()
+        .annotate(bucket=Trunc(field, period, output_field=DateField()))
+    )
+    return starts, queryset
+
+
+def bucketed(queryset, field, period, buckets, end=None, fill=0, **aggregates):
+    """
+    Aggregate ``queryset`` per calendar bucket of ``field``.
+
+    Returns ``buckets`` dicts, oldest first, each holding ``bucket`` (the
+    start date) and one key per aggregate. Buckets without rows get
+    ``fill`` for every aggregate.
+    """
+    starts, queryset = in_buckets(queryset, field, period, buckets, end)
+    rows = queryset.values('bucket').annotate(**aggregates)
+    found = {row.pop('bucket'): row for row in rows}
+    return [
+        {'bucket': start, **found.get(start, dict.fromkeys(aggregates, fill))}
+        for start in starts
+    ]
+
+
+def active_dates(queryset, field, days, end=None):
+    """Set of dates among the last ``days`` days that have at least one row"""
+    _, queryset = in_buckets(queryset, field, 'day', days, end)
+    return set(queryset.values_list('bucket', flat=True).distinct())
+
+
+def current_streak(queryset, field, limit=365, end=None):
+    """
+    Number of consecutive days, ending with ``end`` (default today), that
+    have at least one row; capped at ``limit``. One query.
+    """
+    end = end or timezone.localdate()
+    dates = active_dates(queryset, field, limit, end)
+    streak = 0
+    while streak < limit and shift(end, 'day', -streak) in dates:
+        streak += 1
+    return streak
+
+
+def series(rows, key):
+    """Pull one aggregate out of ``bucketed`` rows as a plain list"""
+    return [row[key] for row in rows]
+
+
+def _local_midnight(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def _is_datetime(model, field):
+    for part in field.split('__')[:-1]:
+        model = model._meta.get_field(part).related_model
+    return model._meta.get_field(field.split('__')[-1]).get_internal_type() == 'DateTimeField'
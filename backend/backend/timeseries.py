@@ -0,0 +1,350 @@
+"""
+Embedded time-series store for the performance trends endpoint.
+
+Once a minute the recorder turns the merged request metrics (see
+backend/metrics.py) and the system sampler's history into one point:
+request and 5xx counts, latency sum and histogram, CPU and memory. Points
+live in a small SQLite file (``TIMESERIES_PATH``) with a fixed schema,
+keyed by ``(resolution, bucket)``. Every write also refreshes the 5-minute
+and hourly rollups containing it; histograms are summed so rolled-up
+percentiles stay exact to the bucket layout. Each resolution keeps a
+bounded retention, so the file stays small and ``query`` reads at most a
+few thousand rows.
+
+Only one process per host writes: recorders compete for an exclusive
+lock file and the others skip their tick.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from . import metrics
+from .system_sampler import get_sampler
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# (bucket seconds, retention seconds), finest first
+RESOLUTIONS = (
+    (MINUTE, 2 * DAY),
+    (5 * MINUTE, 14 * DAY),
+    (HOUR, 90 * DAY),
+)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    histogram TEXT NOT NULL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    cpu_percent REAL,
+    memory_percent REAL,
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID
+"""
+
+
+def store_path():
+    return getattr(settings, 'TIMESERIES_PATH', None) or os.path.join(settings.BASE_DIR, 'logs', 'timeseries.sqlite3')
+
+
+def percentile(buckets, counts, q):
+    """Estimate the ``q`` quantile from histogram counts (last count is +Inf)"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    lower = 0.0
+    for bound, count in zip(buckets, counts):
+        if count and seen + count >= rank:
+            # Linear interpolation inside the bucket, as histogram_quantile does
+            return lower + (bound - lower) * (rank - seen) / count
+        seen += count
+        lower = bound
+    return buckets[-1]
+
+
+@dataclass
+class Point:
+    """Aggregated metrics for one bucket"""
+
+    requests: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    histogram: list = field(default_factory=lambda: [0] * (len(metrics.LATENCY_BUCKETS) + 1))
+    cpu_percent: float = None
+    memory_percent: float = None
+
+    def percentiles(self):
+        return [percentile(metrics.LATENCY_BUCKETS, self.histogram, q) for q in PERCENTILES]
+
+
+class LeaderLock:
+    """Non-blocking exclusive lock file; held until released or the process exits"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        if fcntl is None:
+            return True
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            lock_file = open(self.path, 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def resolution_for(hours):
+    """Finest resolution whose retention covers the last ``hours``"""
+    window = hours * HOUR
+    for seconds, retention in RESOLUTIONS:
+        if window <= retention:
+            return seconds
+    return RESOLUTIONS[-1][0]
+
+
+class TimeSeriesStore:
+    """SQLite-backed points at minute, 5-minute and hourly resolution"""
+
+    def __init__(self, path=None):
+        self.path = path or store_path()
+        self._schema_ready = False
+
+    def connect(self):
+        if not self._schema_ready:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._schema_ready:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(SCHEMA)
+            self._schema_ready = True
+        return connection
+
+    def write(self, bucket, point, now=None):
+        """Store a minute point, refresh its rollups and apply retention"""
+        with closing(self.connect()) as connection, connection:
+            self._upsert(connection, MINUTE, bucket, point)
+            for resolution, _ in RESOLUTIONS[1:]:
+                start = bucket - bucket % resolution
+                rollup = self._combine(connection.execute(
+                    'SELECT requests, errors, latency_sum, histogram, cpu_percent, memory_percent '
+                    'FROM points WHERE resolution = ? AND bucket >= ? AND bucket < ?',
+                    (MINUTE, start, start + resolution)
+                ))
+                self._upsert(connection, resolution, start, rollup)
+            self._prune(connection, now or time.time())
+
+    def _upsert(self, connection, resolution, bucket, point):
+        p50, p95, p99 = point.percentiles()
+        connection.execute(
+            'INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (resolution, bucket, point.requests, point.errors, point.latency_sum,
+             json.dumps(point.histogram), p50, p95, p99, point.cpu_percent, point.memory_percent)
+        )
+
+    @staticmethod
+    def _combine(rows):
+        combined = Point()
+        cpu, memory = [], []
+        for requests, errors, latency_sum, histogram, cpu_percent, memory_percent in rows:
+            combined.requests += requests
+            combined.errors += errors
+            combined.latency_sum += latency_sum
+            combined.histogram = [a + b for a, b in zip(combined.histogram, json.loads(histogram))]
+            if cpu_percent is not None:
+                cpu.append(cpu_percent)
+            if memory_percent is not None:
+                memory.append(memory_percent)
+        combined.cpu_percent = sum(cpu) / len(cpu) if cpu else None
+        combined.memory_percent = sum(memory) / len(memory) if memory else None
+        return combined
+
+    @staticmethod
+    def _prune(connection, now):
+        for resolution, retention in RESOLUTIONS:
+            connection.execute(
+                'DELETE FROM points WHERE resolution = ? AND bucket < ?',
+                (resolution, int(now - retention))
+            )
+
+    def window(self, seconds, now=None):
+        """Minute points of the last ``seconds`` combined into one Point"""
+        now = now or time.time()
+        with closing(self.connect()) as connection:
+            return self._combine(connection.execute(
+                'SELECT requests, errors, latency_sum, histogram, cpu_percent, memory_percent '
+                'FROM points WHERE resolution = ? AND bucket >= ?',
+                (MINUTE, int(now - seconds))
+            ))
+
+    def query(self, hours, now=None):
+        """Series for the last ``hours`` at the resolution chosen for that window"""
+        now = now or time.time()
+        resolution = resolution_for(hours)
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                'SELECT bucket, requests, errors, latency_sum, p50, p95, p99, cpu_percent, memory_percent '
+                'FROM points WHERE resolution = ? AND bucket >= ? ORDER BY bucket',
+                (resolution, int(now - hours * HOUR))
+            ).fetchall()
+
+        trends = {
+            'resolution': resolution,
+            'timestamps': [],
+            'response_times': [],
+            'response_time_percentiles': {'p50': [], 'p95': [], 'p99': []},
+            'request_rates': [],
+            'error_rates': [],
+            'cpu_usage': [],
+            'memory_usage': [],
+        }
+        for bucket, requests, errors, latency_sum, p50, p95, p99, cpu_percent, memory_percent in rows:
+            trends['timestamps'].append(bucket)
+            trends['response_times'].append(latency_sum / requests if requests else None)
+            trends['response_time_percentiles']['p50'].append(p50)
+            trends['response_time_percentiles']['p95'].append(p95)
+            trends['response_time_percentiles']['p99'].append(p99)
+            trends['request_rates'].append(requests / resolution)
+            trends['error_rates'].append(errors / requests if requests else 0)
+            trends['cpu_usage'].append(cpu_percent)
+            trends['memory_usage'].append(memory_percent)
+        return trends
+
+
+def request_totals(collected):
+    """Cumulative ``(requests, errors, latency_sum, histogram)`` across all routes"""
+    requests = errors = 0
+    for (name, labels), value in collected['counters'].items():
+        if name == metrics.REQUESTS_TOTAL:
+            requests += int(value)
+            if dict(labels).get('status', '').startswith('5'):
+                errors += int(value)
+    latency_sum = 0.0
+    histogram = [0] * (len(metrics.LATENCY_BUCKETS) + 1)
+    for (name, _), (buckets, counts, total) in collected['histograms'].items():
+        if name == metrics.REQUEST_DURATION and tuple(buckets) == metrics.LATENCY_BUCKETS:
+            latency_sum += total
+            histogram = [a + b for a, b in zip(histogram, counts)]
+    return requests, errors, latency_sum, histogram
+
+
+class Recorder:
+    """Writes one point per minute from the difference of merged totals"""
+
+    def __init__(self, store=None):
+        self.store = store or TimeSeriesStore()
+        self._previous = None
+        self._lock = LeaderLock(self.store.path + '.lock')
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def is_leader(self):
+        return self._lock.acquire()
+
+    def tick(self, now=None, collected=None):
+        """Record the minute that just ended; returns the Point written, if any"""
+        now = now or time.time()
+        totals = request_totals(collected or metrics.registry.collect())
+        previous, self._previous = self._previous, totals
+        if previous is None:
+            return None
+
+        point = Point()
+        deltas = [current - before for current, before in zip(totals[:3], previous[:3])]
+        if deltas[0] < 0:
+            # Counters were reset (METRICS_DIR cleared); count from zero
+            deltas = list(totals[:3])
+            previous = (0, 0, 0.0, [0] * len(totals[3]))
+        point.requests, point.errors, point.latency_sum = deltas
+        point.histogram = [max(0, a - b) for a, b in zip(totals[3], previous[3])]
+
+        bucket = int(now) - int(now) % MINUTE - MINUTE
+        samples = [s for s in get_sampler().history(seconds=now - bucket) if s.timestamp < bucket + MINUTE]
+        if samples:
+            point.cpu_percent = sum(s.cpu_percent for s in samples) / len(samples)
+            point.memory_percent = sum(s.memory_percent for s in samples) / len(samples)
+
+        self.store.write(bucket, point, now=now)
+        return point
+
+    def start(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._lock = LeaderLock(self._lock.path)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='timeseries-recorder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(MINUTE - time.time() % MINUTE):
+            try:
+                if self.is_leader():
+                    self.tick()
+            except Exception:
+                logger.exception("Recording performance trends failed")
+
+
+_store = None
+_recorder = None
+
+
+def get_store():
+    global _store
+    if _store is None or _store.path != store_path():
+        _store = TimeSeriesStore()
+    return _store
+
+
+def start_recorder():
+    """Start the per-minute recorder in this process, if enabled"""
+    global _recorder
+    if not getattr(settings, 'TIMESERIES_ENABLED', True):
+        return
+    if _recorder is None:
+        _recorder = Recorder(get_store())
+    _recorder.start()
+
+
+def performance_trends(hours):
+    return get_store().query(hours)
@@ -16,7 +16,8 @@ def api_root(request):
     })
 from .monitoring_views import (
     system_metrics, application_metrics, health_metrics,
-    security_metrics, performance_trends, alert_webhook
+    security_metrics, performance_trends, alert_webhook, prometheus_metrics,
+    query_profile
 )
 
 from .health_check import health_check, detailed_health_check
@@ -37,7 +38,9 @@ urlpatterns = [
     path('monitoring/health/', health_metrics, name='health-metrics'),
     path('monitoring/security/', security_metrics, name='security-metrics'),
     path('monitoring/trends/', performance_trends, name='performance-trends'),
+    path('monitoring/queries/', query_profile, name='query-profile'),
     path('monitoring/alerts/webhook/', alert_webhook, name='alert-webhook'),
+    path('metrics', prometheus_metrics, name='prometheus-metrics'),
 
     # API endpoints
     path('api/accounts/', include('accounts.urls')),
@@ -50,6 +53,7 @@ urlpatterns = [
     path('api/crisis/', include('crisis.urls')),
     path('api/guide/', include('guide.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/realtime/', include('realtime.urls')),
     
     # Admin system stats
     path('api/admin/system/stats/', SystemStatsView.as_view(), name='admin-system-stats'),
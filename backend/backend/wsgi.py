@@ -14,3 +14,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 application = get_wsgi_application()
+
+# Sample host CPU/memory/disk, record per-minute performance trends,
+# evaluate alert rules and refresh the dashboard snapshots (one process per
+# host) in the background
+from analytics.snapshots import start_refresher  # noqa: E402
+from backend.alerting import start_alerting  # noqa: E402
+from backend.system_sampler import start_sampler  # noqa: E402
+from backend.timeseries import start_recorder  # noqa: E402
+
+start_sampler()
+start_recorder()
+start_alerting()
+start_refresher()
@@ -17,6 +17,38 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+def call_status_payload(call):
+    """
+    Build the call status body shared by get_call_status and the realtime
+    stream; ``call`` is the room's active call or None.
+    """
+    if call is None or call.status != 'active':
+        return {
+            'has_active_call': False,
+            'call_id': None,
+            'type': None,
+            'status': None,
+            'participants': [],
+            'started_at': None,
+            'initiator': None
+        }
+    
+    # Get participant list
+    participants = []
+    for participant in call.callparticipant_set.filter(left_at__isnull=True).select_related('user'):
+        participants.append(participant.user.display_name)
+    
+    return {
+        'has_active_call': True,
+        'call_id': call.id,
+        'type': call.call_type,
+        'status': call.status,
+        'participants': participants,
+        'started_at': call.started_at.isoformat(),
+        'initiator': call.initiator.display_name
+    }
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_call_status(request, room_id):
@@ -39,31 +71,7 @@ def get_call_status(request, room_id):
             status='active'
         ).first()
         
-        if active_call:
-            # Get participant list
-            participants = []
-            for participant in active_call.callparticipant_set.filter(left_at__isnull=True):
-                participants.append(participant.user.display_name)
-            
-            return Response({
-                'has_active_call': True,
-                'call_id': active_call.id,
-                'type': active_call.call_type,
-                'status': active_call.status,
-                'participants': participants,
-                'started_at': active_call.started_at.isoformat(),
-                'initiator': active_call.initiator.display_name
-            })
-        else:
-            return Response({
-                'has_active_call': False,
-                'call_id': None,
-                'type': None,
-                'status': None,
-                'participants': [],
-                'started_at': None,
-                'initiator': None
-            })
+        return Response(call_status_payload(active_call))
             
     except Exception as e:
         logger.error(f"Error getting call status: {str(e)}")
@@ -16,6 +16,7 @@ import logging
 from .models import ChatRoom, ChatMessage, ChatRoomParticipant
 from .serializers import ChatMessageSerializer, ChatRoomSerializer
 from .media_utils import process_media_file
+from . import pagination
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -185,7 +186,17 @@ def send_message(request, room_id):
 @permission_classes([permissions.IsAuthenticated])
 def get_messages(request, room_id):
     """
-    Get messages for a chat room with pagination
+    Get messages for a chat room with cursor pagination
+    
+    Query parameters:
+    - before=<cursor>: page of messages older than the cursor
+      (omit for the latest page); use ``next_cursor`` to keep scrolling back
+    - since=<cursor>: only messages newer than the cursor, e.g. the
+      ``latest_cursor`` from the previous response
+    - page=<n>: legacy offset paging, kept for older clients
+    - page_size: number of messages (default 50)
+    
+    Messages are always returned oldest first.
     """
     try:
         room = get_object_or_404(ChatRoom, id=room_id)
@@ -197,23 +208,48 @@ def get_messages(request, room_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get pagination parameters
-        page = int(request.GET.get('page', 1))
         page_size = int(request.GET.get('page_size', 50))
-        offset = (page - 1) * page_size
+        since = request.GET.get('since')
+        before = request.GET.get('before')
+        messages = ChatMessage.objects.filter(room=room).select_related('author')
         
-        # Get messages
-        messages = ChatMessage.objects.filter(room=room).order_by('-created_at')[offset:offset + page_size]
-        messages = list(reversed(messages))  # Reverse to show oldest first
+        # Fetch one extra row to learn whether more messages exist
+        try:
+            if since:
+                messages = list(
+                    messages.filter(pagination.after(since)).order_by('created_at', 'id')[:page_size + 1]
+                )
+                has_more = len(messages) > page_size
+                messages = messages[:page_size]
+            else:
+                if before:
+                    messages = messages.filter(pagination.before(before))
+                offset = 0
+                if 'page' in request.GET and not before:
+                    offset = (int(request.GET['page']) - 1) * page_size
+                messages = list(
+                    messages.order_by('-created_at', '-id')[offset:offset + page_size + 1]
+                )
+                has_more = len(messages) > page_size
+                messages = list(reversed(messages[:page_size]))  # Reverse to show oldest first
+        except pagination.InvalidCursor:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         serializer = ChatMessageSerializer(messages, many=True)
         
-        return Response({
+        response_data = {
             'messages': serializer.data,
-            'page': page,
             'page_size': page_size,
-            'has_more': ChatMessage.objects.filter(room=room).count() > offset + page_size
-        })
+            'has_more': has_more,
+            'next_cursor': pagination.encode_cursor(messages[0]) if messages and not since else None,
+            'latest_cursor': pagination.encode_cursor(messages[-1]) if messages else since,
+        }
+        if 'page' in request.GET:
+            response_data['page'] = int(request.GET['page'])
+        return Response(response_data)
         
     except Exception as e:
         logger.error(f"Error getting messages: {str(e)}")
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from community.models import ForumCategory, ForumComment, ForumPost
+
+
+def approved_count(model, fk):
+    """Correlated subquery counting approved ``model`` rows that point at the outer row"""
+    counts = (
+        model.objects.filter(**{fk: OuterRef('pk')}, is_approved=True)
+        .order_by()
+        .values(fk)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def reconcile_forum_counters():
+    """Recompute the forum counters from source rows; returns rows fixed per counter"""
+    targets = [
+        (ForumCategory, 'post_count', approved_count(ForumPost, 'category')),
+        (ForumPost, 'comment_count', approved_count(ForumComment, 'post')),
+        (ForumComment, 'reply_count', approved_count(ForumComment, 'parent')),
+    ]
+    fixed = {}
+    for model, field, expected in targets:
+        # Only rewrite rows that drifted
+        fixed[f'{model.__name__}.{field}'] = (
+            model.objects.annotate(expected=expected)
+            .exclude(expected=F(field))
+            .update(**{field: expected})
+        )
+    return fixed
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized forum post/comment/reply counters'
+
+    def handle(self, *args, **options):
+        for counter, rows in reconcile_forum_counters().items():
+            self.stdout.write(f'{counter}: {rows} row(s) corrected')
+        self.stdout.write(self.style.SUCCESS('Forum counters reconciled'))
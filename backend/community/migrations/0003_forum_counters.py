@@ -0,0 +1,43 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:11
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    ForumCategory = apps.get_model('community', 'ForumCategory')
+    ForumPost = apps.get_model('community', 'ForumPost')
+    ForumComment = apps.get_model('community', 'ForumComment')
+
+    def approved_count(model, fk):
+        counts = (
+            model.objects.filter(**{fk: OuterRef('pk')}, is_approved=True)
+            .order_by().values(fk).annotate(total=Count('pk')).values('total')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    ForumCategory.objects.update(post_count=approved_count(ForumPost, 'category'))
+    ForumPost.objects.update(comment_count=approved_count(ForumComment, 'post'))
+    ForumComment.objects.update(reply_count=approved_count(ForumComment, 'parent'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_chat_message_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumcategory',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='forumpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
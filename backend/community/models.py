@@ -1,16 +1,23 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.core.validators import MinLengthValidator, MinValueValidator, MaxValueValidator
 
-class ForumCategory(models.Model):
+from backend.counters import CounterFieldsMixin, adjust_counter
+
+
+class ForumCategory(CounterFieldsMixin, models.Model):
     """Categories for organizing forum discussions"""
+    counter_fields = ('post_count',)
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField()
     icon = models.CharField(max_length=50, blank=True, help_text="Icon class name")
     color = models.CharField(max_length=7, default="#3B82F6", help_text="Hex color code")
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    # Approved posts in this category, maintained by ForumPost.save and the
+    # post_delete handler in signals.py
+    post_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -22,8 +29,9 @@ class ForumCategory(models.Model):
     def __str__(self):
         return self.name
 
-class ForumPost(models.Model):
+class ForumPost(CounterFieldsMixin, models.Model):
     """Main forum posts/topics"""
+    counter_fields = ('view_count', 'like_count', 'comment_count')
     MOOD_CHOICES = [
         ('struggling', 'Struggling'),
         ('neutral', 'Neutral'),
@@ -45,6 +53,9 @@ class ForumPost(models.Model):
     # Engagement tracking
     view_count = models.PositiveIntegerField(default=0)
     like_count = models.PositiveIntegerField(default=0)
+    # Approved comments (including replies), maintained by ForumComment.save
+    # and the post_delete handler in signals.py
+    comment_count = models.PositiveIntegerField(default=0)
 
     # Mood context
     author_mood = models.CharField(max_length=20, choices=MOOD_CHOICES, blank=True)
@@ -61,14 +72,38 @@ class ForumPost(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'is_approved', 'category'} & set(update_fields):
+            # e.g. view_count/last_activity bumps cannot change the counters
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = ForumPost.objects.filter(pk=self.pk).values(
+                    'is_approved', 'category_id'
+                ).first()
+            super().save(*args, **kwargs)
+
+            # Move this post's contribution to the category post_count
+            was_counted = previous['category_id'] if previous and previous['is_approved'] else None
+            now_counted = self.category_id if self.is_approved else None
+            if was_counted != now_counted:
+                if was_counted:
+                    adjust_counter(ForumCategory, was_counted, 'post_count', -1)
+                if now_counted:
+                    adjust_counter(ForumCategory, now_counted, 'post_count', 1)
+
     @property
     def author_display_name(self):
         if self.is_anonymous:
             return f"Anonymous User {self.author.id}"
         return self.author.display_name
 
-class ForumComment(models.Model):
+class ForumComment(CounterFieldsMixin, models.Model):
     """Comments on forum posts with nested reply support"""
+    counter_fields = ('like_count', 'reply_count')
     post = models.ForeignKey(ForumPost, on_delete=models.CASCADE, related_name='comments')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -88,6 +123,34 @@ class ForumComment(models.Model):
     def __str__(self):
         return f"Comment by {self.author.username}: {self.content[:50]}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'is_approved', 'post', 'parent'} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = ForumComment.objects.filter(pk=self.pk).values(
+                    'is_approved', 'post_id', 'parent_id'
+                ).first()
+            super().save(*args, **kwargs)
+
+            # Move this comment's contribution to post.comment_count and
+            # parent.reply_count when it is created, (un)approved or moved
+            was_approved = bool(previous and previous['is_approved'])
+            for model, field, old_id, new_id in (
+                (ForumPost, 'comment_count', previous and previous['post_id'], self.post_id),
+                (ForumComment, 'reply_count', previous and previous['parent_id'], self.parent_id),
+            ):
+                was_counted = old_id if was_approved else None
+                now_counted = new_id if self.is_approved else None
+                if was_counted != now_counted:
+                    if was_counted:
+                        adjust_counter(model, was_counted, field, -1)
+                    if now_counted:
+                        adjust_counter(model, now_counted, field, 1)
+
     @property
     def author_display_name(self):
         if self.is_anonymous:
@@ -380,6 +443,10 @@ class ChatMessage(models.Model):
     class Meta:
         db_table = 'community_chat_message'
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination over a room's timeline (see pagination.py)
+            models.Index(fields=['room', 'created_at', 'id'], name='chat_msg_room_created_id'),
+        ]
 
     def __str__(self):
         if self.message_type == 'text':
@@ -0,0 +1,48 @@
+"""
+Keyset (cursor) pagination helpers for chat history.
+
+Messages are ordered by ``(created_at, id)`` and cursors encode that pair,
+so each page is an index range scan on (room, created_at, id) no matter
+how deep into the history the client has scrolled.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor we did not issue"""
+
+
+def encode_cursor(message):
+    """Opaque cursor for a message's position in the room timeline"""
+    raw = json.dumps([message.created_at.isoformat(), message.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """Return (created_at, id) for a cursor produced by encode_cursor"""
+    try:
+        created_at, message_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+        created_at = parse_datetime(created_at)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise InvalidCursor(value)
+    if created_at is None or not isinstance(message_id, int):
+        raise InvalidCursor(value)
+    return created_at, message_id
+
+
+def before(cursor):
+    """Filter for messages strictly older than ``cursor``"""
+    created_at, message_id = decode_cursor(cursor)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id)
+
+
+def after(cursor):
+    """Filter for messages strictly newer than ``cursor``"""
+    created_at, message_id = decode_cursor(cursor)
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
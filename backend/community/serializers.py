@@ -7,16 +7,11 @@ from accounts.models import User
 
 
 class ForumCategorySerializer(serializers.ModelSerializer):
-    post_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = ForumCategory
         fields = ['id', 'name', 'description', 'icon', 'color', 'is_active', 'order', 'post_count', 'created_at']
         read_only_fields = ['id', 'post_count', 'created_at']
     
-    def get_post_count(self, obj):
-        return obj.posts.filter(is_approved=True).count()
-    
     def validate_name(self, value):
         """Validate category name"""
         if len(value.strip()) < 2:
@@ -65,7 +60,6 @@ class ForumCategorySerializer(serializers.ModelSerializer):
 
 class ForumPostSerializer(serializers.ModelSerializer):
     author_display_name = serializers.ReadOnlyField()
-    comment_count = serializers.SerializerMethodField()
     category_name = serializers.CharField(source='category.name', read_only=True)
     
     class Meta:
@@ -76,10 +70,10 @@ class ForumPostSerializer(serializers.ModelSerializer):
             'is_locked', 'is_approved', 'view_count', 'like_count', 'author_mood',
             'created_at', 'updated_at', 'last_activity', 'comment_count'
         ]
-        read_only_fields = ['author', 'view_count', 'like_count', 'created_at', 'updated_at', 'last_activity']
-    
-    def get_comment_count(self, obj):
-        return obj.comments.filter(is_approved=True).count()
+        read_only_fields = [
+            'author', 'view_count', 'like_count', 'comment_count',
+            'created_at', 'updated_at', 'last_activity'
+        ]
     
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
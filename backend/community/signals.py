@@ -0,0 +1,29 @@
+"""
+Keep the denormalized forum counters in step with deletes.
+
+Creates, approvals and moves are handled in ForumPost.save and
+ForumComment.save; post_delete also fires for cascaded rows, which
+``QuerySet.delete()`` and admin bulk deletes go through.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from backend.counters import adjust_counter
+
+from .models import ForumCategory, ForumComment, ForumPost
+
+
+@receiver(post_delete, sender=ForumPost)
+def release_post_count(sender, instance, **kwargs):
+    if instance.is_approved:
+        adjust_counter(ForumCategory, instance.category_id, 'post_count', -1)
+
+
+@receiver(post_delete, sender=ForumComment)
+def release_comment_counts(sender, instance, **kwargs):
+    if not instance.is_approved:
+        return
+    adjust_counter(ForumPost, instance.post_id, 'comment_count', -1)
+    if instance.parent_id:
+        adjust_counter(ForumComment, instance.parent_id, 'reply_count', -1)
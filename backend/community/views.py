@@ -58,6 +58,7 @@ class ForumPostListView(generics.ListCreateAPIView):
             queryset = ForumPost.objects.all()
         else:
             queryset = ForumPost.objects.filter(is_approved=True)
+        queryset = queryset.select_related('category', 'author')
         
         category = self.request.query_params.get('category', None)
         if category:
@@ -85,9 +86,10 @@ class ForumPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         # Show all posts for admins/guides, only approved for regular users
         if hasattr(self.request.user, 'role') and self.request.user.role in ['admin', 'guide']:
-            return ForumPost.objects.all()
+            queryset = ForumPost.objects.all()
         else:
-            return ForumPost.objects.filter(is_approved=True)
+            queryset = ForumPost.objects.filter(is_approved=True)
+        return queryset.select_related('category', 'author')
 
     def get_object(self):
         obj = super().get_object()
@@ -124,11 +126,8 @@ class ForumCommentListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         comment = serializer.save(author=self.request.user)
         
-        # Update reply count if this is a reply
-        if comment.parent:
-            comment.parent.reply_count = comment.parent.replies.filter(is_approved=True).count()
-            comment.parent.save(update_fields=['reply_count'])
-        
+        # Post comment_count and parent reply_count are maintained by
+        # ForumComment.save
         # Update post last_activity when a new comment is added
         comment.post.last_activity = timezone.now()
         comment.post.save(update_fields=['last_activity'])
@@ -156,10 +155,6 @@ class ForumCommentReplyView(APIView):
                 is_anonymous=is_anonymous
             )
             
-            # Update parent comment reply count
-            parent_comment.reply_count = parent_comment.replies.filter(is_approved=True).count()
-            parent_comment.save(update_fields=['reply_count'])
-            
             # Serialize and return the reply
             serializer = ForumCommentSerializer(reply)
             return Response({
@@ -450,7 +445,7 @@ class AdminForumPostView(generics.ListCreateAPIView):
     def get_queryset(self):
         if self.request.user.role not in ['admin', 'guide']:
             raise permissions.PermissionDenied("Admin or Guide access required")
-        return ForumPost.objects.all()
+        return ForumPost.objects.select_related('category', 'author')
 
 class AdminForumPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Admin can update/delete forum posts"""
@@ -460,7 +455,7 @@ class AdminForumPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         if not hasattr(self.request.user, 'role') or self.request.user.role not in ['admin', 'guide']:
             raise permissions.PermissionDenied("Admin or Guide access required")
-        return ForumPost.objects.all()
+        return ForumPost.objects.select_related('category', 'author')
     
     def destroy(self, request, *args, **kwargs):
         """Override destroy to provide better error handling"""
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from .models import AudioContent, AudioLike, AudioView, AudioShare
+from .counters import record_view
 
 
 class AudioLikeView(APIView):
@@ -69,18 +70,13 @@ class AudioViewView(APIView):
             ip_address = self.get_client_ip(request)
             user_agent = request.META.get('HTTP_USER_AGENT', '')
             
-            with transaction.atomic():
-                # Create view record
-                AudioView.objects.create(
-                    user=user,
-                    audio=audio,
-                    ip_address=ip_address,
-                    user_agent=user_agent
-                )
-                
-                # Increase play count
-                audio.play_count += 1
-                audio.save(update_fields=['play_count'])
+            # Buffer the play record and count; both are written on the next flush
+            record_view(audio, 'play_count', AudioView(
+                user=user,
+                audio=audio,
+                ip_address=ip_address,
+                user_agent=user_agent
+            ))
             
             return Response({
                 'message': 'Audio view recorded successfully',
@@ -0,0 +1,228 @@
+"""Write-behind buffer for content view/play counters.
+
+Detail endpoints and the ``/view/`` tracking endpoints used to do a
+read-modify-write ``view_count += 1; save()`` plus one INSERT per view on
+the request path. Increments are now coalesced in memory per
+``(model, field, pk)`` and flushed periodically as ``F()`` updates (one
+UPDATE per distinct delta), and view rows are written with
+``bulk_create``.
+
+The buffer is per process, so on shutdown the pending increments are
+flushed via ``atexit``; a hard crash loses at most one flush interval of
+views. The increments and the rows of each model are written in separate
+transactions; whatever fails is put back into the buffer and retried by the
+flush timer (never inline on a request), and is dropped with an error log
+after ``CONTENT_COUNTER_MAX_ATTEMPTS`` failed flushes, so one bad row (e.g.
+a view of deleted content) cannot hold back the rest. View rows get their
+``created_at`` when they are flushed, so they can be up to
+``CONTENT_COUNTER_FLUSH_SECONDS`` late. With ``CONTENT_COUNTER_BUFFERED``
+disabled every call flushes immediately.
+"""
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SECONDS = 5
+DEFAULT_MAX_PENDING = 1000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class FlushResult:
+    """Outcome of a single buffer flush"""
+
+    updates: int
+    increments: int
+    rows_written: int
+
+
+class CounterBuffer:
+    """Thread-safe, in-process buffer of counter increments and view rows"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._increments = defaultdict(int)
+        self._rows = defaultdict(list)
+        self._pending = 0
+        self._attempts = {}
+        self._retrying = False
+        self._timer = None
+
+    def increment(self, model, pk, field, amount=1):
+        """Buffer ``amount`` for ``model.field`` and return the pending total for ``pk``"""
+        with self._lock:
+            self._increments[(model, field, pk)] += amount
+            self._pending += 1
+            return self._increments[(model, field, pk)]
+
+    def add_row(self, instance):
+        """Buffer an unsaved model instance for a later ``bulk_create``"""
+        with self._lock:
+            self._rows[type(instance)].append(instance)
+            self._pending += 1
+
+    def schedule(self):
+        """Flush now if unbuffered or over the limit, otherwise arm the flush timer"""
+        if not getattr(settings, 'CONTENT_COUNTER_BUFFERED', True):
+            self.flush()
+            return
+
+        max_pending = getattr(settings, 'CONTENT_COUNTER_MAX_PENDING', DEFAULT_MAX_PENDING)
+        with self._lock:
+            # While a failed flush is being retried, leave it to the timer
+            over_limit = self._pending >= max_pending and not self._retrying
+            if not over_limit:
+                self._arm_timer()
+        if over_limit:
+            self.flush()
+
+    def _arm_timer(self):
+        # Called with the lock held
+        if self._timer is None:
+            interval = getattr(settings, 'CONTENT_COUNTER_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+            self._timer = threading.Timer(interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Write all buffered increments and rows; returns a FlushResult"""
+        with self._lock:
+            increments, self._increments = self._increments, defaultdict(int)
+            rows, self._rows = self._rows, defaultdict(list)
+            self._pending = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        # Group primary keys sharing the same delta into a single UPDATE
+        grouped = defaultdict(list)
+        for (model, field, pk), amount in increments.items():
+            grouped[(model, field, amount)].append(pk)
+
+        updates = rows_written = 0
+        failed_increments, failed_rows = {}, {}
+        if grouped:
+            try:
+                with transaction.atomic():
+                    for (model, field, amount), pks in grouped.items():
+                        model.objects.filter(pk__in=pks).update(**{field: F(field) + amount})
+                        updates += 1
+            except Exception:
+                logger.exception("Content counter flush failed for %d increments", sum(increments.values()))
+                failed_increments, updates = increments, 0
+
+        batch_size = getattr(settings, 'CONTENT_COUNTER_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        for model, instances in rows.items():
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(instances, batch_size=batch_size)
+            except Exception:
+                logger.exception("Content counter flush failed for %d %s rows", len(instances), model.__name__)
+                failed_rows[model] = instances
+            else:
+                rows_written += len(instances)
+
+        if not failed_increments:
+            with self._lock:
+                for key in increments:
+                    self._attempts.pop(key, None)
+        if failed_increments or failed_rows:
+            self._requeue(failed_increments, failed_rows)
+        else:
+            self._retrying = False
+
+        result = FlushResult(
+            updates=updates,
+            increments=sum(increments.values()) - sum(failed_increments.values()),
+            rows_written=rows_written,
+        )
+        if result.increments or result.rows_written:
+            logger.debug(
+                "Flushed %d counter increments in %d updates and %d view rows",
+                result.increments, result.updates, result.rows_written,
+            )
+        return result
+
+    def _requeue(self, increments, rows):
+        """
+        Merge the increments and rows of a failed flush back into the buffer,
+        dropping those that have failed ``CONTENT_COUNTER_MAX_ATTEMPTS`` times,
+        and leave the retry to the flush timer
+        """
+        max_attempts = getattr(settings, 'CONTENT_COUNTER_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        dropped_increments = dropped_rows = 0
+        with self._lock:
+            for key, amount in increments.items():
+                attempts = self._attempts.get(key, 0) + 1
+                if attempts >= max_attempts:
+                    dropped_increments += amount
+                    continue
+                self._attempts[key] = attempts
+                self._increments[key] += amount
+                self._pending += 1
+            for model, instances in rows.items():
+                kept = []
+                for instance in instances:
+                    instance._counter_attempts = getattr(instance, '_counter_attempts', 0) + 1
+                    if instance._counter_attempts >= max_attempts:
+                        dropped_rows += 1
+                        continue
+                    # bulk_create may have assigned keys that were rolled back
+                    instance.pk = None
+                    instance._state.adding = True
+                    kept.append(instance)
+                self._rows[model][:0] = kept
+                self._pending += len(kept)
+            self._retrying = True
+            self._arm_timer()
+        if dropped_increments or dropped_rows:
+            logger.error(
+                "Dropped %d counter increments and %d view rows after %d failed flushes",
+                dropped_increments, dropped_rows, max_attempts,
+            )
+
+
+_buffer = CounterBuffer()
+atexit.register(_buffer.flush)
+
+
+def increment_counter(instance, field, amount=1):
+    """
+    Buffer an increment of ``instance.<field>``.
+
+    The in-memory instance is bumped by everything still pending for it, so
+    responses show the count the database will hold after the next flush.
+    """
+    model = type(instance)
+    pending = _buffer.increment(model, instance.pk, field, amount)
+    setattr(instance, field, getattr(instance, field) + pending)
+    _buffer.schedule()
+    return getattr(instance, field)
+
+
+def record_view(instance, counter_field, view):
+    """Buffer a view/play row for ``instance`` and increment ``counter_field``"""
+    _buffer.add_row(view)
+    return increment_counter(instance, counter_field)
+
+
+def flush_counters():
+    """Write everything buffered in this process now"""
+    return _buffer.flush()
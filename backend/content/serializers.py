@@ -2,16 +2,64 @@ from rest_framework import serializers
 import json
 from .models import (
     Article, Video, AudioContent, MentalHealthResource, 
-    ArticleLike, VideoLike
+    ArticleLike, VideoLike, AudioLike
 )
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class LikedListSerializer(serializers.ListSerializer):
+    """Resolve the current user's likes for a whole page in one query"""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self.context[self.child.liked_ids_key()] = self.child.get_liked_ids(items)
+        return super().to_representation(items)
+
+
+class LikedByUserMixin:
+    """
+    ``is liked`` support for content serializers.
+
+    Subclasses set ``like_model`` and ``like_field``. When serialized with
+    ``many=True`` the liked IDs are looked up once with ``IN (...)`` by
+    LikedListSerializer; a single object falls back to an EXISTS query.
+    """
+    like_model = None
+    like_field = None
+
+    @classmethod
+    def liked_ids_key(cls):
+        return f'liked_{cls.like_field}_ids'
+
+    def get_liked_ids(self, items):
+        request = self.context.get('request')
+        if not items or not (request and request.user.is_authenticated):
+            return set()
+        return set(
+            self.like_model.objects.filter(
+                user=request.user, **{f'{self.like_field}__in': [item.pk for item in items]}
+            ).values_list(f'{self.like_field}_id', flat=True)
+        )
+
+    def is_liked_by_user(self, obj):
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return False
+        liked_ids = self.context.get(self.liked_ids_key())
+        if liked_ids is not None:
+            return obj.pk in liked_ids
+        return self.like_model.objects.filter(user=request.user, **{self.like_field: obj}).exists()
+
+
+class ArticleSerializer(LikedByUserMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.display_name', read_only=True)
     isLiked = serializers.SerializerMethodField()
     
+    like_model = ArticleLike
+    like_field = 'article'
+
     class Meta:
         model = Article
+        list_serializer_class = LikedListSerializer
         fields = [
             'id', 'title', 'slug', 'excerpt', 'content',
             'tags', 'difficulty_level', 'author', 'author_name', 'featured_image',
@@ -22,18 +70,19 @@ class ArticleSerializer(serializers.ModelSerializer):
     
     def get_isLiked(self, obj):
         """Check if the current user has liked this article"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return ArticleLike.objects.filter(user=request.user, article=obj).exists()
-        return False
+        return self.is_liked_by_user(obj)
 
 
-class VideoSerializer(serializers.ModelSerializer):
+class VideoSerializer(LikedByUserMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.display_name', read_only=True)
     isLiked = serializers.SerializerMethodField()
     
+    like_model = VideoLike
+    like_field = 'video'
+
     class Meta:
         model = Video
+        list_serializer_class = LikedListSerializer
         fields = [
             'id', 'title', 'description', 'video_url', 'thumbnail_image',
             'duration_seconds', 'tags',
@@ -45,21 +94,19 @@ class VideoSerializer(serializers.ModelSerializer):
     
     def get_isLiked(self, obj):
         """Check if the current user has liked this video"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                return VideoLike.objects.filter(user=request.user, video=obj).exists()
-            except Exception:
-                return False
-        return False
+        return self.is_liked_by_user(obj)
 
 
-class AudioContentSerializer(serializers.ModelSerializer):
+class AudioContentSerializer(LikedByUserMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.display_name', read_only=True)
     is_liked = serializers.SerializerMethodField()
     
+    like_model = AudioLike
+    like_field = 'audio'
+
     class Meta:
         model = AudioContent
+        list_serializer_class = LikedListSerializer
         fields = [
             'id', 'title', 'description', 'audio_type', 'audio_file',
             'audio_url', 'duration_seconds',
@@ -71,11 +118,7 @@ class AudioContentSerializer(serializers.ModelSerializer):
     
     def get_is_liked(self, obj):
         """Check if current user has liked this audio"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            from .models import AudioLike
-            return AudioLike.objects.filter(user=request.user, audio=obj).exists()
-        return False
+        return self.is_liked_by_user(obj)
 
 
 class MentalHealthResourceSerializer(serializers.ModelSerializer):
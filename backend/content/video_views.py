@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction
 from .models import Video, VideoLike, VideoView, VideoShare
 from .serializers import VideoSerializer
+from .counters import record_view
 
 
 class VideoLikeView(APIView):
@@ -69,17 +70,13 @@ class VideoViewView(APIView):
             ip_address = self.get_client_ip(request)
             user_agent = request.META.get('HTTP_USER_AGENT', '')
             
-            # Create view record
-            VideoView.objects.create(
+            # Buffer the view record and count; both are written on the next flush
+            record_view(video, 'view_count', VideoView(
                 user=user,
                 video=video,
                 ip_address=ip_address,
                 user_agent=user_agent
-            )
-            
-            # Update view count
-            video.view_count += 1
-            video.save(update_fields=['view_count'])
+            ))
             
             return Response({
                 'message': 'View tracked successfully',
@@ -16,11 +16,12 @@ from .serializers import (
     ArticleSerializer, VideoSerializer,
     AudioContentSerializer, MentalHealthResourceSerializer
 )
+from .counters import increment_counter, record_view
 
 
 class ArticleListView(generics.ListCreateAPIView):
     """List and create articles"""
-    queryset = Article.objects.filter(is_published=True)
+    queryset = Article.objects.filter(is_published=True).select_related('author')
     serializer_class = ArticleSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
@@ -62,8 +63,7 @@ class ArticleDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj = super().get_object()
         # Increment view count for GET requests
         if self.request.method == 'GET':
-            obj.view_count += 1
-            obj.save(update_fields=['view_count'])
+            increment_counter(obj, 'view_count')
         return obj
     
     def perform_update(self, serializer):
@@ -117,7 +117,7 @@ class ArticleDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class VideoListView(generics.ListCreateAPIView):
     """List and create videos"""
-    queryset = Video.objects.filter(is_published=True)
+    queryset = Video.objects.filter(is_published=True).select_related('author')
     serializer_class = VideoSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -156,8 +156,7 @@ class VideoDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj = super().get_object()
         # Increment view count for GET requests
         if self.request.method == 'GET':
-            obj.view_count += 1
-            obj.save(update_fields=['view_count'])
+            increment_counter(obj, 'view_count')
         return obj
     
     def perform_update(self, serializer):
@@ -211,7 +210,7 @@ class VideoDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class AudioContentListView(generics.ListCreateAPIView):
     """List and create audio content"""
-    queryset = AudioContent.objects.filter(is_published=True)
+    queryset = AudioContent.objects.filter(is_published=True).select_related('author')
     serializer_class = AudioContentSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
@@ -261,8 +260,7 @@ class AudioContentDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj = super().get_object()
         # Increment play count for GET requests
         if self.request.method == 'GET':
-            obj.play_count += 1
-            obj.save(update_fields=['play_count'])
+            increment_counter(obj, 'play_count')
         return obj
     
     def perform_update(self, serializer):
@@ -513,17 +511,13 @@ class ArticleViewView(APIView):
         ip_address = self.get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Create view record
-        ArticleView.objects.create(
+        # Buffer the view record and count; both are written on the next flush
+        record_view(article, 'view_count', ArticleView(
             user=user,
             article=article,
             ip_address=ip_address,
             user_agent=user_agent
-        )
-        
-        # Update view count
-        article.view_count += 1
-        article.save(update_fields=['view_count'])
+        ))
         
         return Response({
             'message': 'View tracked successfully',
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CrisisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crisis'
+
+    def ready(self):
+        from .sla import register_sqlite_functions
+        connection_created.connect(register_sqlite_functions)
@@ -74,6 +74,8 @@ class CrisisStatsSerializer(serializers.Serializer):
     users_with_safety_plans = serializers.IntegerField()
     alerts_this_week = serializers.IntegerField()
     response_time_avg = serializers.FloatField()
+    response_time_median = serializers.FloatField()
+    response_time_p90 = serializers.FloatField()
 
 class CrisisResponseSerializer(serializers.Serializer):
     """Serializer for crisis alert responses"""
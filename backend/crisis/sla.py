@@ -0,0 +1,106 @@
+"""
+Crisis alert response-time SLA metrics, computed in the database.
+
+Alert counts and the average, median and p90 time from ``created_at`` to
+acknowledgement or resolution come from a single aggregate query per
+scope. PostgreSQL computes the percentiles with ``percentile_cont``; on
+SQLite (development and tests) an equivalent aggregate is registered on
+every connection.
+"""
+
+import math
+
+from django.db.models import Aggregate, Avg, Count, DurationField, ExpressionWrapper, F, Q
+
+# Percentiles reported alongside the average
+RESPONSE_TIME_PERCENTILES = {'median': 0.5, 'p90': 0.9}
+
+
+class PercentileCont(Aggregate):
+    """Continuous percentile (interpolated between neighbouring values)"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        if not 0 <= fraction <= 1:
+            raise ValueError('fraction must be between 0 and 1')
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Same argument order as SQLite's own percentile extension
+        clone = self.copy()
+        clone.template = '%(function)s(%(expressions)s, %(fraction)s)'
+        return clone.as_sql(compiler, connection, **extra_context)
+
+
+def percentile_cont(values, fraction):
+    """``fraction`` percentile of ``values`` with linear interpolation, as PostgreSQL computes it"""
+    if not values:
+        return None
+    values = sorted(values)
+    position = fraction * (len(values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class SQLitePercentileCont:
+    """``percentile_cont(value, fraction)`` aggregate for SQLite connections"""
+
+    def __init__(self):
+        self.values = []
+        self.fraction = None
+
+    def step(self, value, fraction):
+        self.fraction = fraction
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return percentile_cont(self.values, self.fraction)
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    """connection_created receiver adding PERCENTILE_CONT to SQLite"""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_aggregate('PERCENTILE_CONT', 2, SQLitePercentileCont)
+
+
+def response_time_aggregates(responded_field, filter=None):
+    """
+    ``response_time_avg``, ``_median`` and ``_p90`` aggregates of
+    ``responded_field - created_at`` over alerts matching ``filter`` that
+    have been responded to
+    """
+    response_time = ExpressionWrapper(F(responded_field) - F('created_at'), output_field=DurationField())
+    responded = Q(**{f'{responded_field}__isnull': False})
+    if filter is not None:
+        responded &= filter
+    aggregates = {'response_time_avg': Avg(response_time, filter=responded)}
+    for name, fraction in RESPONSE_TIME_PERCENTILES.items():
+        aggregates[f'response_time_{name}'] = PercentileCont(response_time, fraction, filter=responded)
+    return aggregates
+
+
+def minutes(duration):
+    """Duration in minutes rounded for dashboards; 0 when there is none"""
+    return round(duration.total_seconds() / 60, 1) if duration is not None else 0
+
+
+def intervention_metrics(alerts):
+    """Dashboard intervention metrics of ``alerts`` (time to resolution) in one query"""
+    stats = alerts.aggregate(
+        total=Count('pk'),
+        resolved=Count('pk', filter=Q(status='resolved')),
+        escalations=Count('pk', filter=Q(severity_level='critical')),
+        **response_time_aggregates('resolved_at', Q(status='resolved'))
+    )
+    return {
+        'totalInterventions': stats['total'],
+        'successfulInterventions': stats['resolved'],
+        'escalations': stats['escalations'],
+        'averageResponseTime': minutes(stats['response_time_avg']),
+        'medianResponseTime': minutes(stats['response_time_median']),
+        'p90ResponseTime': minutes(stats['response_time_p90'])
+    }
@@ -6,7 +6,9 @@ from rest_framework.views import APIView
 from django.utils import timezone
 from django.db.models import Count, Q
 from datetime import timedelta
+from analytics.snapshots import SnapshotMixin
 from .models import CrisisHotline, CrisisResource, CrisisAlert, UserSafetyPlan
+from .sla import minutes, response_time_aggregates
 from .serializers import (
     CrisisHotlineSerializer, CrisisResourceSerializer, CrisisAlertSerializer,
     CreateCrisisAlertSerializer, UserSafetyPlanSerializer, CreateSafetyPlanSerializer,
@@ -219,9 +221,10 @@ class AdminCrisisResourceDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # STATISTICS AND DASHBOARD ENDPOINTS
 
-class CrisisStatsView(APIView):
+class CrisisStatsView(SnapshotMixin, APIView):
     """Crisis management statistics"""
     permission_classes = [IsAuthenticated]
+    metric_set = 'crisis_stats'
     
     def get(self, request):
         user_role = request.user.role
@@ -229,42 +232,36 @@ class CrisisStatsView(APIView):
         if user_role not in ['guide', 'admin']:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Calculate statistics
-        total_alerts = CrisisAlert.objects.count()
-        active_alerts = CrisisAlert.objects.filter(status='active').count()
-        high_risk_alerts = CrisisAlert.objects.filter(
-            severity_level__in=['high', 'imminent']
-        ).count()
-        resolved_alerts = CrisisAlert.objects.filter(status='resolved').count()
-        
-        users_with_safety_plans = UserSafetyPlan.objects.count()
-        
-        # Alerts this week
+        snapshot = self.get_snapshot()
+        return Response({**snapshot.data, 'snapshot': snapshot.freshness()})
+    
+    def compute(self, scope, time_range):
         week_ago = timezone.now() - timedelta(days=7)
-        alerts_this_week = CrisisAlert.objects.filter(
-            created_at__gte=week_ago
-        ).count()
         
-        # Calculate average response time from actual data
-        from django.db.models import Avg
-        response_time_avg = CrisisAlert.objects.filter(
-            created_at__gte=week_ago,
-            acknowledged_at__isnull=False
-        ).aggregate(
-            avg_response=Avg('acknowledged_at') - Avg('created_at')
-        )['avg_response'] or 0
+        # Alert counts and this week's time to acknowledgement in one query
+        alerts = CrisisAlert.objects.aggregate(
+            total_alerts=Count('pk'),
+            active_alerts=Count('pk', filter=Q(status='active')),
+            high_risk_alerts=Count('pk', filter=Q(severity_level__in=['high', 'imminent'])),
+            resolved_alerts=Count('pk', filter=Q(status='resolved')),
+            alerts_this_week=Count('pk', filter=Q(created_at__gte=week_ago)),
+            **response_time_aggregates('acknowledged_at', Q(created_at__gte=week_ago))
+        )
         
         stats = {
-            'total_alerts': total_alerts,
-            'active_alerts': active_alerts,
-            'high_risk_alerts': high_risk_alerts,
-            'resolved_alerts': resolved_alerts,
-            'users_with_safety_plans': users_with_safety_plans,
-            'alerts_this_week': alerts_this_week,
-            'response_time_avg': response_time_avg
+            'total_alerts': alerts['total_alerts'],
+            'active_alerts': alerts['active_alerts'],
+            'high_risk_alerts': alerts['high_risk_alerts'],
+            'resolved_alerts': alerts['resolved_alerts'],
+            'users_with_safety_plans': UserSafetyPlan.objects.count(),
+            'alerts_this_week': alerts['alerts_this_week'],
+            # Minutes from alert to acknowledgement
+            'response_time_avg': minutes(alerts['response_time_avg']),
+            'response_time_median': minutes(alerts['response_time_median']),
+            'response_time_p90': minutes(alerts['response_time_p90'])
         }
         
-        return Response(stats)
+        return stats
 
 class EmergencyProtocolView(APIView):
     """Emergency intervention protocols"""
@@ -0,0 +1,60 @@
+"""
+Guide client roster in one annotated query.
+
+Each client row carries its latest assessment time and risk level, its
+assessment count and (for guides) the date the guide assigned it, all as
+correlated subqueries served by the ``assess_user_latest`` index and the
+assignment unique key. Status and risk are computed in SQL too, so the
+roster can be filtered and paginated without touching other rows.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, CharField, Count, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Lower, NullIf
+
+from assessments.models import Assessment, ClientAssessmentAssignment
+from assessments.risk import latest_risk_level
+
+User = get_user_model()
+
+CLIENT_STATUSES = ('active', 'inactive', 'at_risk')
+
+# Clients whose latest assessment is older than this are inactive
+INACTIVE_AFTER_DAYS = 30
+
+
+def client_roster(now, guide=None):
+    """
+    Clients (``role='user'``) annotated with ``last_assessment_at``,
+    ``risk``, ``assessment_count``, ``client_status`` and, when ``guide``
+    is given, ``assigned_date``
+    """
+    latest = Assessment.objects.filter(user=OuterRef('pk')).order_by('-completed_at', '-pk')
+    counts = (
+        Assessment.objects.filter(user=OuterRef('pk'))
+        .order_by().values('user').annotate(total=Count('pk')).values('total')
+    )
+    # Inactive once the latest assessment is more than 30 calendar days old
+    inactive_before = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=INACTIVE_AFTER_DAYS)
+
+    clients = User.objects.filter(role='user').annotate(
+        last_assessment_at=Subquery(latest.values('completed_at')[:1]),
+        risk=Coalesce(NullIf(Lower(latest_risk_level()), Value('')), Value('low'), output_field=CharField()),
+        assessment_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+    ).annotate(
+        client_status=Case(
+            When(last_assessment_at__isnull=True, then=Value('inactive')),
+            When(last_assessment_at__lt=inactive_before, then=Value('inactive')),
+            When(risk__in=['high', 'critical'], then=Value('at_risk')),
+            default=Value('active'),
+            output_field=CharField(),
+        ),
+    )
+    if guide is not None:
+        clients = clients.annotate(assigned_date=Subquery(
+            ClientAssessmentAssignment.objects.filter(client=OuterRef('pk'), guide=guide)
+            .order_by('-assigned_date').values('assigned_date')[:1]
+        ))
+    return clients.order_by('date_joined', 'pk')
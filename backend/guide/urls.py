@@ -1,5 +1,9 @@
-# Guide URLs removed - guide functionality is integrated into assessments app per specification
+# Most guide functionality is integrated into the assessments app per
+# specification; the client roster is served from here
+from django.urls import path
+
+from . import views
 
 urlpatterns = [
-    # Guide functionality has been integrated into assessments app
+    path('clients/', views.get_clients, name='guide-clients'),
 ]
@@ -3,63 +3,66 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from assessments.models import ClientAssessmentAssignment, Assessment
 from crisis.models import CrisisAlert
 
+from .roster import CLIENT_STATUSES, client_roster
+
 User = get_user_model()
 
+class ClientRosterPagination(PageNumberPagination):
+    """Pagination for the guide client roster"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_clients(request):
-    """Get all users with role 'user' for guides and admins"""
+    """
+    Paginated clients (users with role 'user') for guides and admins
+
+    Optional filters: ``status`` (active, inactive, at_risk) and ``risk``
+    (risk level of the latest assessment; clients never assessed are low).
+    """
     if request.user.role not in ['guide', 'admin']:
         return Response({'error': 'Permission denied'}, status=403)
     
-    # Get all users with role 'user'
-    users = User.objects.filter(role='user').order_by('date_joined')
+    clients = client_roster(timezone.now(), guide=request.user if request.user.role == 'guide' else None)
+    
+    client_status = request.query_params.get('status')
+    if client_status:
+        if client_status not in CLIENT_STATUSES:
+            return Response({'error': f"status must be one of {', '.join(CLIENT_STATUSES)}"}, status=400)
+        clients = clients.filter(client_status=client_status)
+    risk = request.query_params.get('risk')
+    if risk:
+        clients = clients.filter(risk=risk.lower())
+    
+    paginator = ClientRosterPagination()
+    page = paginator.paginate_queryset(clients, request)
     
     clients_data = []
-    for user in users:
-        # Get latest assessment
-        latest_assessment = Assessment.objects.filter(
-            user=user
-        ).order_by('-completed_at').first()
-        
-        # Get assignment info if exists
-        assignment = ClientAssessmentAssignment.objects.filter(
-            client=user,
-            guide=request.user
-        ).first() if request.user.role == 'guide' else None
-        
-        # Determine status based on recent activity
-        status = 'active'
-        if latest_assessment:
-            days_since_assessment = (timezone.now().date() - latest_assessment.completed_at.date()).days
-            if days_since_assessment > 30:
-                status = 'inactive'
-            elif latest_assessment.risk_level in ['high', 'critical']:
-                status = 'at_risk'
-        else:
-            status = 'inactive'
-        
-        client_data = {
+    for user in page:
+        assigned_date = getattr(user, 'assigned_date', None) or user.date_joined
+        clients_data.append({
             'id': user.id,
             'name': user.display_name or f"{user.first_name} {user.last_name}".strip() or user.username,
             'email': user.email if not getattr(user, 'is_anonymous_preferred', False) else 'Anonymous User',
             'age': getattr(user, 'age', 0) or 0,
-            'status': status,
-            'lastAssessment': latest_assessment.completed_at.isoformat() if latest_assessment else None,
-            'riskLevel': latest_assessment.risk_level.lower() if latest_assessment and latest_assessment.risk_level else 'low',
+            'status': user.client_status,
+            'lastAssessment': user.last_assessment_at.isoformat() if user.last_assessment_at else None,
+            'riskLevel': user.risk,
             'lastContact': user.last_login.isoformat() if user.last_login else user.date_joined.isoformat(),
-            'assignedDate': assignment.assigned_date.isoformat() if assignment else user.date_joined.isoformat(),
-            'assessmentCount': Assessment.objects.filter(user=user).count(),
-        }
-        
-        clients_data.append(client_data)
+            'assignedDate': assigned_date.isoformat(),
+            'assessmentCount': user.assessment_count,
+        })
     
-    return Response(clients_data)
+    return paginator.get_paginated_response(clients_data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -6,7 +6,7 @@ class MoodEntryAdmin(admin.ModelAdmin):
     list_display = ['user', 'emotion', 'confidence', 'timestamp', 'created_at']
     list_filter = ['emotion', 'timestamp', 'created_at']
     search_fields = ['user__username', 'user__email', 'emotion', 'notes']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['image_ref', 'image_size', 'created_at', 'updated_at']
     ordering = ['-timestamp']
     
     fieldsets = (
@@ -18,7 +18,7 @@ class MoodEntryAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Additional Information', {
-            'fields': ('notes', 'image_data'),
+            'fields': ('notes', 'image_ref', 'image_size'),
             'classes': ('collapse',)
         }),
         ('Metadata', {
@@ -0,0 +1,308 @@
+"""
+Emotion-analysis job queue.
+
+``POST /api/mood/analyze/`` no longer runs the analyzer inside the request
+worker. ``submit_analysis`` records an EmotionAnalysisJob and hands the
+decoded image to a small thread pool; clients poll the job or receive a
+``mood.analysis`` event on their realtime stream (``analysis_completed``).
+
+Results are cached by image content hash, so a repeated snapshot is
+answered immediately, and identical images already being analysed share a
+single analyzer call. The analyzer itself is pluggable through
+``MOOD_ANALYZER``; LocalAnalyzer is a deterministic, offline stand-in.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from backend import metrics
+
+from .blobs import decode_image
+from .models import EmotionAnalysisJob, MoodAnalysisSession, MoodEntry
+
+logger = logging.getLogger(__name__)
+
+EMOTIONS = [choice[0] for choice in MoodEntry.EMOTION_CHOICES]
+
+DEFAULT_ANALYZER = 'mood.analysis.AzureFaceAnalyzer'
+DEFAULT_WORKERS = 4
+DEFAULT_CACHE_SECONDS = 24 * 60 * 60
+
+# Sent from the worker once a job finishes; receivers get ``job``
+analysis_completed = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class BaseAnalyzer:
+    """Turns image bytes into ``{'emotion', 'confidence', 'emotions'}``"""
+
+    def analyze(self, content, include_breakdown=True):
+        raise NotImplementedError
+
+
+class MockAnalyzer(BaseAnalyzer):
+    """Random but plausible scores; used when no real service is configured"""
+
+    def analyze(self, content, include_breakdown=True):
+        rng = random.Random()
+        primary_emotion = rng.choice(EMOTIONS)
+        emotion_scores = {primary_emotion: rng.uniform(0.4, 0.8)}
+        remaining_probability = 1.0 - emotion_scores[primary_emotion]
+
+        # Distribute remaining probability among other emotions
+        other_emotions = [e for e in EMOTIONS if e != primary_emotion]
+        rng.shuffle(other_emotions)
+        for i, emotion in enumerate(other_emotions):
+            if i == len(other_emotions) - 1:
+                emotion_scores[emotion] = max(0, remaining_probability)
+            else:
+                score = rng.uniform(0, remaining_probability * 0.3)
+                emotion_scores[emotion] = score
+                remaining_probability -= score
+
+        total = sum(emotion_scores.values())
+        if total > 0:
+            emotion_scores = {k: v / total for k, v in emotion_scores.items()}
+        return {
+            'emotion': primary_emotion,
+            'confidence': emotion_scores[primary_emotion],
+            'emotions': emotion_scores if include_breakdown else {}
+        }
+
+
+class LocalAnalyzer(BaseAnalyzer):
+    """Deterministic scores derived from the image digest (tests, offline dev)"""
+
+    def analyze(self, content, include_breakdown=True):
+        digest = hashlib.sha256(content).digest()
+        weights = [digest[i] + 1 for i in range(len(EMOTIONS))]
+        total = sum(weights)
+        emotion_scores = {emotion: weight / total for emotion, weight in zip(EMOTIONS, weights)}
+        emotion = max(emotion_scores, key=emotion_scores.get)
+        return {
+            'emotion': emotion,
+            'confidence': emotion_scores[emotion],
+            'emotions': emotion_scores if include_breakdown else {}
+        }
+
+
+class AzureFaceAnalyzer(BaseAnalyzer):
+    """Azure Face API emotion detection, falling back to MockAnalyzer"""
+
+    emotion_mapping = {
+        'happiness': 'happy',
+        'sadness': 'sad',
+        'anger': 'angry',
+        'surprise': 'surprised',
+        'neutral': 'neutral',
+        'fear': 'fear',
+        'disgust': 'disgust'
+    }
+
+    def __init__(self):
+        self.key = getattr(settings, 'AZURE_FACE_KEY', os.environ.get('AZURE_FACE_KEY'))
+        self.endpoint = getattr(settings, 'AZURE_FACE_ENDPOINT', os.environ.get('AZURE_FACE_ENDPOINT'))
+        self.fallback = MockAnalyzer()
+
+    def analyze(self, content, include_breakdown=True):
+        if not self.key or not self.endpoint:
+            return self.fallback.analyze(content, include_breakdown)
+
+        import requests
+
+        try:
+            response = requests.post(
+                f"{self.endpoint}/face/v1.0/detect",
+                headers={
+                    'Ocp-Apim-Subscription-Key': self.key,
+                    'Content-Type': 'application/octet-stream'
+                },
+                params={
+                    'returnFaceAttributes': 'emotion',
+                    'detectionModel': 'detection_03',
+                    'recognitionModel': 'recognition_04'
+                },
+                data=content,
+                timeout=10
+            )
+        except requests.RequestException:
+            logger.exception("Azure Face API request failed, using mock analysis")
+            return self.fallback.analyze(content, include_breakdown)
+
+        if response.status_code != 200:
+            logger.warning("Azure Face API error %s: %s", response.status_code, response.text)
+            return self.fallback.analyze(content, include_breakdown)
+
+        faces = response.json()
+        if not faces:
+            logger.info("No faces detected in image, using mock analysis")
+            return self.fallback.analyze(content, include_breakdown)
+
+        # Emotions of the first detected face, mapped to our names
+        emotions_data = faces[0]['faceAttributes']['emotion']
+        dominant_emotion = max(emotions_data, key=emotions_data.get)
+        our_emotions = dict.fromkeys(EMOTIONS, 0.0)
+        for azure_emotion, score in emotions_data.items():
+            our_emotions[self.emotion_mapping.get(azure_emotion, azure_emotion)] = score
+
+        return {
+            'emotion': self.emotion_mapping.get(dominant_emotion, dominant_emotion),
+            'confidence': emotions_data[dominant_emotion],
+            'emotions': our_emotions if include_breakdown else {}
+        }
+
+
+def get_analyzer():
+    return import_string(getattr(settings, 'MOOD_ANALYZER', DEFAULT_ANALYZER))()
+
+
+def _cache_key(content_hash, include_breakdown):
+    return f'mood-analysis:{content_hash}:{int(include_breakdown)}'
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'MOOD_ANALYSIS_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='mood-analysis'
+            )
+        return _executor
+
+
+def _analyze_shared(key, content, include_breakdown):
+    """Run the analyzer once per in-flight image; concurrent duplicates wait on it"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+
+    if owner:
+        try:
+            future.set_result(get_analyzer().analyze(content, include_breakdown))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    return future.result()
+
+
+def run_job(job_id, content):
+    """Analyse ``content`` for a pending job and record the outcome"""
+    job = EmotionAnalysisJob.objects.select_related('session').get(pk=job_id)
+    EmotionAnalysisJob.objects.filter(pk=job_id).update(status='running')
+    key = _cache_key(job.content_hash, job.include_breakdown)
+
+    started = time.monotonic()
+    try:
+        result = _analyze_shared(key, content, job.include_breakdown)
+    except Exception as exc:
+        logger.exception("Emotion analysis job %s failed", job_id)
+        job.status = 'failed'
+        job.error = str(exc)
+    else:
+        job.status = 'completed'
+        job.result = result
+        cache.set(key, result, getattr(settings, 'MOOD_ANALYSIS_CACHE_SECONDS', DEFAULT_CACHE_SECONDS))
+    job.processing_time = time.monotonic() - started
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'processing_time', 'completed_at'])
+    _record_session(job)
+    analysis_completed.send(sender=EmotionAnalysisJob, job=job)
+    return job
+
+
+def _run_job_in_worker(job_id, content):
+    metrics.registry.gauge_add(metrics.QUEUE_DEPTH, -1, queue='mood_analysis')
+    close_old_connections()
+    try:
+        run_job(job_id, content)
+    except Exception:
+        logger.exception("Emotion analysis worker failed for job %s", job_id)
+    finally:
+        close_old_connections()
+
+
+def _record_session(job):
+    if job.session_id is None:
+        return
+    succeeded = int(job.status == 'completed')
+    MoodAnalysisSession.objects.filter(pk=job.session_id).update(
+        processing_time=job.processing_time,
+        analysis_method=job.analysis_method,
+        total_captures=F('total_captures') + 1,
+        successful_analyses=F('successful_analyses') + succeeded,
+        ended_at=job.completed_at,
+    )
+
+
+def submit_analysis(user, image_data, include_breakdown=True, analysis_method='mock', session_id=None):
+    """
+    Queue an analysis of a base64 image for ``user`` and return its job.
+
+    A cached result for the same image completes the job immediately;
+    otherwise the job is analysed on the worker pool after the current
+    transaction commits (inline when ``MOOD_ANALYSIS_ASYNC`` is off).
+    Raises MoodAnalysisSession.DoesNotExist if ``session_id`` belongs to
+    another user.
+    """
+    content, _ = decode_image(image_data)
+    content_hash = hashlib.sha256(content).hexdigest()
+    if session_id and MoodAnalysisSession.objects.filter(session_id=session_id).exclude(user=user).exists():
+        # Session IDs come from the client; never attach jobs to another user's session
+        raise MoodAnalysisSession.DoesNotExist(f"Analysis session {session_id!r} not found")
+    session, _ = MoodAnalysisSession.objects.get_or_create(
+        session_id=session_id or f'analysis-{user.id}-{content_hash[:12]}-{time.time_ns()}',
+        user=user,
+        defaults={'analysis_method': analysis_method}
+    )
+    job = EmotionAnalysisJob(
+        user=user,
+        session=session,
+        content_hash=content_hash,
+        include_breakdown=include_breakdown,
+        analysis_method=analysis_method,
+    )
+
+    cached = cache.get(_cache_key(content_hash, include_breakdown))
+    if cached is not None:
+        job.status = 'completed'
+        job.result = cached
+        job.cached = True
+        job.processing_time = 0.0
+        job.completed_at = timezone.now()
+        job.save()
+        _record_session(job)
+        return job
+
+    job.save()
+
+    def dispatch():
+        if getattr(settings, 'MOOD_ANALYSIS_ASYNC', True):
+            metrics.registry.gauge_add(metrics.QUEUE_DEPTH, 1, queue='mood_analysis')
+            _get_executor().submit(_run_job_in_worker, job.pk, content)
+        else:
+            run_job(job.pk, content)
+
+    transaction.on_commit(dispatch)
+    return job
@@ -0,0 +1,56 @@
+"""
+Content-addressed storage for camera mood snapshots.
+
+Images arrive as base64 (optionally a ``data:image/...`` URL). They are
+decoded once and written to the default file storage under their SHA-256
+digest, so identical snapshots share one blob and the MoodEntry row only
+keeps the storage path and byte size.
+"""
+
+import base64
+import binascii
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+IMAGE_PREFIX = 'mood_images'
+
+EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+}
+
+
+def decode_image(value):
+    """Return ``(bytes, content_type)`` for a base64 string or data URL"""
+    content_type = 'image/jpeg'
+    if value.startswith('data:'):
+        header, _, value = value.partition(',')
+        content_type = header[len('data:'):].split(';')[0] or content_type
+    try:
+        return base64.b64decode(value), content_type
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid base64 image data")
+
+
+def store_blob(content, content_type='image/jpeg'):
+    """Write ``content`` under its digest (once) and return ``(ref, size)``"""
+    digest = hashlib.sha256(content).hexdigest()
+    extension = EXTENSIONS.get(content_type, 'bin')
+    ref = f'{IMAGE_PREFIX}/{digest[:2]}/{digest}.{extension}'
+    if not default_storage.exists(ref):
+        ref = default_storage.save(ref, ContentFile(content))
+    return ref, len(content)
+
+
+def store_image(value):
+    """Decode and store a base64 image; returns ``(ref, size)``"""
+    content, content_type = decode_image(value)
+    return store_blob(content, content_type)
+
+
+def blob_url(ref):
+    return default_storage.url(ref) if ref else None
@@ -0,0 +1,136 @@
+"""
+Per-user mood profiles for the admin dashboard.
+
+Users are walked in primary-key order in chunks, and each chunk is built
+from a fixed set of grouped queries (users with their latest entry id,
+per-user aggregates, latest entries, emotion counts, 30-day history), so
+the query count grows with the number of chunks rather than the number of
+users.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import MoodEntry
+
+User = get_user_model()
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+def _timestamp_ms(value):
+    return int(value.timestamp() * 1000)
+
+
+def _users_after(cursor, limit):
+    has_entries = MoodEntry.objects.filter(user=OuterRef('pk'))
+    latest_entry = MoodEntry.objects.filter(user=OuterRef('pk')).order_by('-timestamp', '-id')
+    queryset = (
+        User.objects.filter(Exists(has_entries))
+        .annotate(latest_entry_id=Subquery(latest_entry.values('id')[:1]))
+        .only('id', 'first_name', 'last_name', 'username', 'email', 'last_login')
+        .order_by('id')
+    )
+    if cursor is not None:
+        queryset = queryset.filter(id__gt=cursor)
+    return list(queryset[:limit])
+
+
+def build_profiles(users, now=None):
+    """Dashboard profiles for ``users`` (annotated with ``latest_entry_id``)"""
+    now = now or timezone.now()
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+    user_ids = [user.id for user in users]
+    entries = MoodEntry.objects.filter(user_id__in=user_ids).order_by()
+
+    stats = {
+        row['user_id']: row
+        for row in entries.values('user_id').annotate(
+            total=Count('id'),
+            current_avg=Avg('confidence', filter=Q(timestamp__gte=week_ago)),
+            prev_avg=Avg('confidence', filter=Q(
+                timestamp__gte=now - timedelta(days=14), timestamp__lt=week_ago
+            )),
+        )
+    }
+    latest = MoodEntry.objects.in_bulk([user.latest_entry_id for user in users])
+
+    # Most frequent emotion per user; ties resolve alphabetically
+    dominant = {}
+    emotion_counts = (
+        entries.values('user_id', 'emotion')
+        .annotate(count=Count('id'))
+        .order_by('user_id', '-count', 'emotion')
+    )
+    for row in emotion_counts:
+        dominant.setdefault(row['user_id'], row['emotion'])
+
+    history = {user_id: [] for user_id in user_ids}
+    recent = (
+        entries.filter(timestamp__gte=month_ago)
+        .order_by('user_id', 'timestamp')
+        .values_list('user_id', 'emotion', 'confidence', 'timestamp')
+    )
+    for user_id, emotion, confidence, timestamp in recent:
+        history[user_id].append({
+            'emotion': emotion,
+            'confidence': confidence,
+            'timestamp': _timestamp_ms(timestamp)
+        })
+
+    profiles = []
+    for user in users:
+        user_stats = stats.get(user.id, {})
+        current_avg = user_stats.get('current_avg') or 0
+        prev_avg = user_stats.get('prev_avg') or 0
+        if current_avg > prev_avg + 0.1:
+            trend = 'improving'
+        elif current_avg < prev_avg - 0.1:
+            trend = 'declining'
+        else:
+            trend = 'stable'
+
+        latest_entry = latest.get(user.latest_entry_id)
+        profiles.append({
+            'id': str(user.id),
+            'name': f"{user.first_name} {user.last_name}".strip() or user.username,
+            'email': user.email,
+            'lastActive': user.last_login.isoformat() if user.last_login else now.isoformat(),
+            'currentMood': {
+                'emotion': latest_entry.emotion,
+                'confidence': latest_entry.confidence,
+                'timestamp': _timestamp_ms(latest_entry.timestamp)
+            } if latest_entry else None,
+            'moodHistory': history[user.id],
+            'totalSessions': user_stats.get('total', 0),
+            'averageMood': dominant.get(user.id, 'neutral'),
+            'moodTrend': trend
+        })
+    return profiles
+
+
+def profile_page(cursor=None, limit=DEFAULT_CHUNK_SIZE, now=None):
+    """One page of profiles after user id ``cursor``; returns (profiles, next_cursor)"""
+    users = _users_after(cursor, limit + 1)
+    has_more = len(users) > limit
+    users = users[:limit]
+    next_cursor = users[-1].id if has_more else None
+    return build_profiles(users, now=now), next_cursor
+
+
+def iter_profiles(chunk_size=DEFAULT_CHUNK_SIZE, now=None):
+    """Yield every profile, one chunk of users at a time"""
+    now = now or timezone.now()
+    cursor = None
+    while True:
+        users = _users_after(cursor, chunk_size)
+        if not users:
+            return
+        yield from build_profiles(users, now=now)
+        if len(users) < chunk_size:
+            return
+        cursor = users[-1].id
@@ -0,0 +1,53 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from mood.blobs import store_image
+from mood.models import MoodEntry
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Move inline base64 mood images into blob storage, in primary-key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Rows loaded and updated per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # The default manager defers image_data, which only() would not undo
+        pending = MoodEntry._base_manager.exclude(Q(image_data__isnull=True) | Q(image_data=''))
+        last_pk = 0
+        moved = skipped = 0
+
+        while True:
+            # Keyset batches: only one batch of payloads is ever in memory
+            batch = list(
+                pending.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'image_data')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            updated = []
+            for entry in batch:
+                try:
+                    entry.attach_image(entry.image_data)
+                except ValueError:
+                    logger.warning("Mood entry %s has undecodable image data; left inline", entry.pk)
+                    skipped += 1
+                    continue
+                updated.append(entry)
+
+            MoodEntry.objects.bulk_update(updated, ['image_ref', 'image_size', 'image_data'])
+            moved += len(updated)
+            self.stdout.write(f'Moved {moved} image(s) so far (last id {last_pk})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} mood image(s) to blob storage; {skipped} left inline'
+        ))
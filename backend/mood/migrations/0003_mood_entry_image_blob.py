@@ -0,0 +1,23 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mood', '0002_mood_entry_user_latest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moodentry',
+            name='image_ref',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='moodentry',
+            name='image_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mood', '0003_mood_entry_image_blob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmotionAnalysisJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('include_breakdown', models.BooleanField(default=True)),
+                ('analysis_method', models.CharField(default='mock', max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('cached', models.BooleanField(default=False, help_text='Answered from the result cache')),
+                ('processing_time', models.FloatField(blank=True, help_text='Time in seconds', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='mood.moodanalysissession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emotion_analysis_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'mood_analysis_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
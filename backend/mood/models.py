@@ -3,9 +3,20 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 import json
+import uuid
+
+from .blobs import store_image
 
 User = get_user_model()
 
+
+class MoodEntryManager(models.Manager):
+    """Never load the legacy inline image payload unless asked for"""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('image_data')
+
+
 class MoodEntry(models.Model):
     """Model to store user mood entries with emotion analysis"""
     
@@ -38,22 +49,39 @@ class MoodEntry(models.Model):
     # Optional user notes
     notes = models.TextField(blank=True, null=True)
     
-    # Optional image data (base64 encoded)
+    # Optional camera snapshot, stored as a content-addressed blob
+    # (see mood/blobs.py); only the storage path and size live on the row
+    image_ref = models.CharField(max_length=255, blank=True, default='')
+    image_size = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Legacy inline base64 payload, moved to blob storage by
+    # ``manage.py migrate_mood_images``; deferred by the default manager
     image_data = models.TextField(blank=True, null=True)
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MoodEntryManager()
+    
     class Meta:
         db_table = 'mood_entries'
         ordering = ['-timestamp']
+        indexes = [
+            # Per-user latest entry and time-range scans
+            models.Index(fields=['user', '-timestamp'], name='mood_entry_user_latest'),
+        ]
         verbose_name = 'Mood Entry'
         verbose_name_plural = 'Mood Entries'
     
     def __str__(self):
         return f"{self.user.username} - {self.emotion} ({self.timestamp.date()})"
     
+    def attach_image(self, value):
+        """Store a base64 image/data URL as a blob and reference it"""
+        self.image_ref, self.image_size = store_image(value)
+        self.image_data = None
+    
     def get_emotion_percentage(self):
         """Get confidence as percentage"""
         return round(self.confidence * 100, 1)
@@ -174,3 +202,45 @@ class MoodInsight(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
+
+
+class EmotionAnalysisJob(models.Model):
+    """An emotion analysis queued by ``POST /mood/analyze/`` (see mood/analysis.py)"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='emotion_analysis_jobs')
+    session = models.ForeignKey(
+        MoodAnalysisSession, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs'
+    )
+    
+    # SHA-256 of the decoded image; results are cached under it
+    content_hash = models.CharField(max_length=64, db_index=True)
+    include_breakdown = models.BooleanField(default=True)
+    analysis_method = models.CharField(max_length=50, default='mock')
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    cached = models.BooleanField(default=False, help_text="Answered from the result cache")
+    processing_time = models.FloatField(null=True, blank=True, help_text="Time in seconds")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'mood_analysis_jobs'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Analysis {self.id} - {self.status}"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import MoodEntry, MoodAnalysisSession, MoodTrend, MoodInsight
+from .blobs import blob_url, decode_image
+from .models import EmotionAnalysisJob, MoodEntry, MoodAnalysisSession, MoodTrend, MoodInsight
 import base64
 import json
 from datetime import datetime, timedelta
@@ -13,15 +14,27 @@ class MoodEntrySerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     emotion_percentage = serializers.ReadOnlyField(source='get_emotion_percentage')
     emotions_breakdown_formatted = serializers.ReadOnlyField(source='get_emotions_breakdown_formatted')
+    # Accepted on write and stored as a blob; responses carry image_url instead
+    image_data = serializers.CharField(write_only=True, required=False, allow_blank=True, allow_null=True)
+    image_url = serializers.SerializerMethodField()
     
     class Meta:
         model = MoodEntry
         fields = [
             'id', 'user', 'user_name', 'timestamp', 'emotion', 'confidence', 
             'emotion_percentage', 'emotions_breakdown', 'emotions_breakdown_formatted',
-            'notes', 'image_data', 'created_at', 'updated_at'
+            'notes', 'image_data', 'image_url', 'image_size', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'timestamp', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'timestamp', 'image_size', 'created_at', 'updated_at']
+    
+    def get_image_url(self, obj):
+        return blob_url(obj.image_ref)
+    
+    def update(self, instance, validated_data):
+        image_data = validated_data.pop('image_data', None)
+        if image_data:
+            instance.attach_image(image_data)
+        return super().update(instance, validated_data)
     
     def validate_emotions_breakdown(self, value):
         """Validate emotions breakdown structure"""
@@ -43,12 +56,8 @@ class MoodEntrySerializer(serializers.ModelSerializer):
         """Validate base64 image data"""
         if value:
             try:
-                # Check if it's valid base64
-                if value.startswith('data:image'):
-                    # Remove data URL prefix
-                    value = value.split(',')[1]
-                base64.b64decode(value)
-            except Exception:
+                decode_image(value)
+            except ValueError:
                 raise serializers.ValidationError("Invalid base64 image data")
         
         return value
@@ -57,16 +66,32 @@ class MoodEntrySerializer(serializers.ModelSerializer):
 class MoodEntryCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating mood entries"""
     
+    image_data = serializers.CharField(write_only=True, required=False, allow_blank=True, allow_null=True)
+    
     class Meta:
         model = MoodEntry
         fields = [
             'emotion', 'confidence', 'emotions_breakdown', 'notes', 'image_data'
         ]
     
+    def validate_image_data(self, value):
+        """Validate base64 image data"""
+        if value:
+            try:
+                decode_image(value)
+            except ValueError:
+                raise serializers.ValidationError("Invalid base64 image data")
+        return value
+    
     def create(self, validated_data):
         """Create mood entry with current user"""
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        image_data = validated_data.pop('image_data', None)
+        entry = MoodEntry(**validated_data)
+        if image_data:
+            entry.attach_image(image_data)
+        entry.save()
+        return entry
 
 
 class EmotionAnalysisRequestSerializer(serializers.Serializer):
@@ -78,6 +103,7 @@ class EmotionAnalysisRequestSerializer(serializers.Serializer):
         choices=['mock', 'azure', 'aws', 'google'],
         default='mock'
     )
+    session_id = serializers.CharField(max_length=100, required=False)
     
     def validate_image_data(self, value):
         """Validate base64 image data"""
@@ -102,6 +128,26 @@ class EmotionAnalysisResponseSerializer(serializers.Serializer):
     analysis_method = serializers.CharField()
 
 
+class EmotionAnalysisJobSerializer(serializers.ModelSerializer):
+    """Serializer for queued emotion analyses; completed jobs carry the result fields"""
+    
+    job_id = serializers.UUIDField(source='id', read_only=True)
+    
+    class Meta:
+        model = EmotionAnalysisJob
+        fields = [
+            'job_id', 'status', 'cached', 'analysis_method', 'processing_time',
+            'error', 'created_at', 'completed_at'
+        ]
+        read_only_fields = fields
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.status == 'completed' and instance.result:
+            data.update(instance.result)
+        return data
+
+
 class MoodStatsSerializer(serializers.Serializer):
     """Serializer for mood statistics"""
     
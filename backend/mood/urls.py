@@ -10,6 +10,7 @@ urlpatterns = [
     
     # Emotion analysis
     path('analyze/', views.analyze_emotion, name='analyze-emotion'),
+    path('analyze/<uuid:job_id>/', views.emotion_analysis_job, name='emotion-analysis-job'),
     
     # Statistics and analytics
     path('stats/', views.mood_stats, name='mood-stats'),
@@ -4,12 +4,11 @@ from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Avg, Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
 import json
-import time
-import random
-import base64
 try:
     from PIL import Image
 except ImportError:
@@ -18,10 +17,13 @@ from io import BytesIO
 
 User = get_user_model()
 
-from .models import MoodEntry, MoodAnalysisSession, MoodTrend, MoodInsight
+from backend.time_buckets import bucketed, current_streak, in_buckets
+from .analysis import submit_analysis
+from .dashboard import DEFAULT_CHUNK_SIZE, iter_profiles, profile_page
+from .models import EmotionAnalysisJob, MoodEntry, MoodAnalysisSession, MoodTrend, MoodInsight
 from .serializers import (
     MoodEntrySerializer, MoodEntryCreateSerializer, EmotionAnalysisRequestSerializer,
-    EmotionAnalysisResponseSerializer, MoodStatsSerializer, MoodTrendSerializer,
+    EmotionAnalysisResponseSerializer, EmotionAnalysisJobSerializer, MoodStatsSerializer, MoodTrendSerializer,
     MoodAnalysisSessionSerializer, MoodInsightSerializer, MoodHistorySerializer,
     MoodDashboardSerializer
 )
@@ -83,179 +85,43 @@ class MoodEntryDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def analyze_emotion(request):
-    """Analyze emotion from image data"""
+    """
+    Queue emotion analysis of image data.
+    
+    Returns 202 with a job handle to poll (or wait for the ``mood.analysis``
+    realtime event); an image analysed recently is answered from the cache
+    with 200 and the result inline.
+    """
     
     serializer = EmotionAnalysisRequestSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    image_data = serializer.validated_data['image_data']
-    include_breakdown = serializer.validated_data['include_breakdown']
-    analysis_method = serializer.validated_data['analysis_method']
-    
-    start_time = time.time()
-    
     try:
-        # Use real Azure emotion analysis (with fallback to mock)
-        if analysis_method == 'azure':
-            analysis_result = perform_azure_emotion_analysis(image_data, include_breakdown)
-        else:
-            # Default to Azure, fallback to mock if credentials not available
-            analysis_result = perform_azure_emotion_analysis(image_data, include_breakdown)
-        
-        processing_time = time.time() - start_time
-        analysis_result['processing_time'] = processing_time
-        analysis_result['analysis_method'] = analysis_method
-        
-        response_serializer = EmotionAnalysisResponseSerializer(data=analysis_result)
-        if response_serializer.is_valid():
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
-        else:
-            return Response(response_serializer.errors, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    except Exception as e:
-        return Response(
-            {'error': f'Emotion analysis failed: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        job = submit_analysis(request.user, **serializer.validated_data)
+    except MoodAnalysisSession.DoesNotExist:
+        return Response({'error': 'Analysis session not found'}, status=status.HTTP_404_NOT_FOUND)
+    return _job_response(request, job, status.HTTP_200_OK if job.is_finished else status.HTTP_202_ACCEPTED)
 
 
-def perform_azure_emotion_analysis(image_data, include_breakdown=True):
-    """Real emotion analysis using Azure Cognitive Services"""
-    import requests
-    import os
-    from django.conf import settings
-    
-    # Azure Face API configuration
-    AZURE_FACE_KEY = getattr(settings, 'AZURE_FACE_KEY', os.environ.get('AZURE_FACE_KEY'))
-    AZURE_FACE_ENDPOINT = getattr(settings, 'AZURE_FACE_ENDPOINT', os.environ.get('AZURE_FACE_ENDPOINT'))
-    
-    if not AZURE_FACE_KEY or not AZURE_FACE_ENDPOINT:
-        print("Azure credentials not found, falling back to mock analysis")
-        return perform_mock_emotion_analysis(image_data, include_breakdown)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def emotion_analysis_job(request, job_id):
+    """Poll a queued emotion analysis"""
     
     try:
-        # Convert base64 to binary
-        if image_data.startswith('data:image'):
-            image_data = image_data.split(',')[1]
-        
-        image_binary = base64.b64decode(image_data)
-        
-        # Azure Face API endpoint for emotion detection
-        face_api_url = f"{AZURE_FACE_ENDPOINT}/face/v1.0/detect"
-        
-        headers = {
-            'Ocp-Apim-Subscription-Key': AZURE_FACE_KEY,
-            'Content-Type': 'application/octet-stream'
-        }
-        
-        params = {
-            'returnFaceAttributes': 'emotion',
-            'detectionModel': 'detection_03',
-            'recognitionModel': 'recognition_04'
-        }
-        
-        # Make API request
-        response = requests.post(face_api_url, headers=headers, params=params, data=image_binary, timeout=10)
-        
-        if response.status_code == 200:
-            faces = response.json()
-            
-            if faces and len(faces) > 0:
-                # Get emotions from first detected face
-                emotions_data = faces[0]['faceAttributes']['emotion']
-                
-                # Find dominant emotion
-                dominant_emotion = max(emotions_data, key=emotions_data.get)
-                confidence = emotions_data[dominant_emotion]
-                
-                # Map Azure emotions to our format
-                emotion_mapping = {
-                    'happiness': 'happy',
-                    'sadness': 'sad',
-                    'anger': 'angry',
-                    'surprise': 'surprised',
-                    'neutral': 'neutral',
-                    'fear': 'fear',
-                    'disgust': 'disgust'
-                }
-                
-                # Convert to our emotion format
-                our_emotions = {}
-                for azure_emotion, score in emotions_data.items():
-                    our_emotion = emotion_mapping.get(azure_emotion, azure_emotion)
-                    our_emotions[our_emotion] = score
-                
-                # Ensure all emotions are present
-                for emotion in ['happy', 'sad', 'angry', 'surprised', 'neutral', 'fear', 'disgust']:
-                    if emotion not in our_emotions:
-                        our_emotions[emotion] = 0.0
-                
-                mapped_dominant = emotion_mapping.get(dominant_emotion, dominant_emotion)
-                
-                return {
-                    'emotion': mapped_dominant,
-                    'confidence': confidence,
-                    'emotions': our_emotions if include_breakdown else {}
-                }
-            else:
-                print("No faces detected in image")
-                return perform_mock_emotion_analysis(image_data, include_breakdown)
-                
-        else:
-            print(f"Azure API error: {response.status_code} - {response.text}")
-            return perform_mock_emotion_analysis(image_data, include_breakdown)
-            
-    except Exception as e:
-        print(f"Error calling Azure Face API: {str(e)}")
-        return perform_mock_emotion_analysis(image_data, include_breakdown)
+        job = EmotionAnalysisJob.objects.get(id=job_id, user=request.user)
+    except EmotionAnalysisJob.DoesNotExist:
+        return Response({'error': 'Analysis job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return _job_response(request, job)
 
 
-def perform_mock_emotion_analysis(image_data, include_breakdown=True):
-    """Fallback mock emotion analysis"""
-    
-    # Simulate processing time
-    time.sleep(random.uniform(0.5, 1.5))
-    
-    # Mock emotions with realistic distributions
-    emotions = ['happy', 'sad', 'neutral', 'surprised', 'angry', 'fear', 'disgust']
-    
-    # Generate primary emotion
-    primary_emotion = random.choice(emotions)
-    
-    # Generate emotion scores
-    emotion_scores = {}
-    remaining_probability = 1.0
-    
-    # Give primary emotion a high score
-    primary_score = random.uniform(0.4, 0.8)
-    emotion_scores[primary_emotion] = primary_score
-    remaining_probability -= primary_score
-    
-    # Distribute remaining probability among other emotions
-    other_emotions = [e for e in emotions if e != primary_emotion]
-    random.shuffle(other_emotions)
-    
-    for i, emotion in enumerate(other_emotions):
-        if i == len(other_emotions) - 1:
-            # Last emotion gets remaining probability
-            emotion_scores[emotion] = max(0, remaining_probability)
-        else:
-            # Random portion of remaining probability
-            score = random.uniform(0, remaining_probability * 0.3)
-            emotion_scores[emotion] = score
-            remaining_probability -= score
-    
-    # Normalize to ensure sum is 1.0
-    total = sum(emotion_scores.values())
-    if total > 0:
-        emotion_scores = {k: v/total for k, v in emotion_scores.items()}
-    
-    return {
-        'emotion': primary_emotion,
-        'confidence': emotion_scores[primary_emotion],
-        'emotions': emotion_scores if include_breakdown else {}
-    }
+def _job_response(request, job, response_status=status.HTTP_200_OK):
+    data = EmotionAnalysisJobSerializer(job).data
+    data['poll_url'] = request.build_absolute_uri(
+        reverse('mood:emotion-analysis-job', kwargs={'job_id': job.id})
+    )
+    return Response(data, status=response_status)
 
 
 @api_view(['GET'])
@@ -344,63 +210,39 @@ def mood_stats(request):
 
 def calculate_mood_streak(user):
     """Calculate consecutive days with mood entries"""
-    
-    today = timezone.now().date()
-    streak = 0
-    current_date = today
-    
-    while True:
-        # Check if user has entry for current_date
-        has_entry = MoodEntry.objects.filter(
-            user=user,
-            timestamp__date=current_date
-        ).exists()
-        
-        if has_entry:
-            streak += 1
-            current_date -= timedelta(days=1)
-        else:
-            break
-        
-        # Prevent infinite loop
-        if streak > 365:
-            break
-    
-    return streak
+    # Capped at 366 days, as the previous day-by-day loop was
+    return current_streak(MoodEntry.objects.filter(user=user), 'timestamp', limit=366)
 
 
 def get_mood_trend_data(user, days):
     """Get mood trend data for specified number of days"""
     
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days-1)
+    entries = MoodEntry.objects.filter(user=user)
+    daily = bucketed(
+        entries, 'timestamp', 'day', days, fill=None,
+        avg_confidence=Avg('confidence'), entry_count=Count('id')
+    )
+    
+    # Most frequent emotion per day, from one grouped query over the range
+    _, by_day = in_buckets(entries, 'timestamp', 'day', days)
+    dominant = {}
+    emotion_counts = (
+        by_day.values('bucket', 'emotion')
+        .annotate(count=Count('id'))
+        .order_by('bucket', '-count', 'emotion')
+    )
+    for row in emotion_counts:
+        dominant.setdefault(row['bucket'], row['emotion'])
     
     trend_data = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        day_entries = MoodEntry.objects.filter(
-            user=user,
-            timestamp__date=current_date
-        )
-        
-        if day_entries.exists():
-            avg_confidence = day_entries.aggregate(avg=Avg('confidence'))['avg']
-            dominant_emotion = day_entries.values('emotion').annotate(
-                count=Count('emotion')
-            ).order_by('-count').first()['emotion']
-        else:
-            avg_confidence = None
-            dominant_emotion = None
-        
+    for row in daily:
+        avg_confidence = row['avg_confidence']
         trend_data.append({
-            'date': current_date.isoformat(),
+            'date': row['bucket'].isoformat(),
             'average_confidence': round(avg_confidence, 3) if avg_confidence else None,
-            'dominant_emotion': dominant_emotion,
-            'entry_count': day_entries.count()
+            'dominant_emotion': dominant.get(row['bucket']),
+            'entry_count': row['entry_count'] or 0
         })
-        
-        current_date += timedelta(days=1)
     
     return trend_data
 
@@ -427,75 +269,39 @@ def mood_trends(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def admin_mood_dashboard(request):
-    """Get admin mood dashboard with all users data"""
-    
-    now = timezone.now()
-    today = now.date()
-    week_ago = now - timedelta(days=7)
-    month_ago = now - timedelta(days=30)
-    
-    # Get all users with mood entries
-    users_with_moods = User.objects.filter(camera_mood_entries__isnull=False).distinct()
-    
-    user_profiles = []
-    for user in users_with_moods:
-        # Get user's mood entries
-        all_entries = MoodEntry.objects.filter(user=user)
-        recent_entries = all_entries.filter(timestamp__gte=month_ago)
-        
-        if not all_entries.exists():
-            continue
-            
-        # Latest mood
-        latest_entry = all_entries.first()
-        
-        # Calculate mood trend
-        week_entries = all_entries.filter(timestamp__gte=week_ago)
-        prev_week_entries = all_entries.filter(
-            timestamp__gte=now - timedelta(days=14),
-            timestamp__lt=week_ago
-        )
-        
-        current_avg = week_entries.aggregate(avg_conf=Avg('confidence'))['avg_conf'] or 0
-        prev_avg = prev_week_entries.aggregate(avg_conf=Avg('confidence'))['avg_conf'] or 0
-        
-        if current_avg > prev_avg + 0.1:
-            trend = 'improving'
-        elif current_avg < prev_avg - 0.1:
-            trend = 'declining'
-        else:
-            trend = 'stable'
-        
-        # Mood history for last 30 days
-        mood_history = []
-        for entry in recent_entries.order_by('timestamp'):
-            mood_history.append({
-                'emotion': entry.emotion,
-                'confidence': entry.confidence,
-                'timestamp': int(entry.timestamp.timestamp() * 1000)
-            })
+    """
+    Get admin mood dashboard with all users data
+
+    ``?limit=N[&cursor=<id>]`` returns one page of users with a
+    ``next_cursor``; ``?stream=true`` streams the full list as a JSON array.
+    Without either the full list is returned as before.
+    """
+    
+    if request.query_params.get('limit') or request.query_params.get('cursor'):
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_CHUNK_SIZE)), 1), 500)
+            cursor = request.query_params.get('cursor')
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return Response({'error': 'limit and cursor must be integers'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate average mood
-        emotion_counts = all_entries.values('emotion').annotate(count=Count('emotion')).order_by('-count')
-        avg_mood = emotion_counts.first()['emotion'] if emotion_counts else 'neutral'
+        profiles, next_cursor = profile_page(cursor=cursor, limit=limit)
+        return Response({
+            'results': profiles,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }, status=status.HTTP_200_OK)
+    
+    if request.query_params.get('stream') in ('1', 'true'):
+        def stream():
+            yield '['
+            for index, profile in enumerate(iter_profiles()):
+                yield (',' if index else '') + json.dumps(profile)
+            yield ']'
         
-        user_profiles.append({
-            'id': str(user.id),
-            'name': f"{user.first_name} {user.last_name}".strip() or user.username,
-            'email': user.email,
-            'lastActive': user.last_login.isoformat() if user.last_login else now.isoformat(),
-            'currentMood': {
-                'emotion': latest_entry.emotion,
-                'confidence': latest_entry.confidence,
-                'timestamp': int(latest_entry.timestamp.timestamp() * 1000)
-            } if latest_entry else None,
-            'moodHistory': mood_history,
-            'totalSessions': all_entries.count(),
-            'averageMood': avg_mood,
-            'moodTrend': trend
-        })
+        return StreamingHttpResponse(stream(), content_type='application/json')
     
-    return Response(user_profiles, status=status.HTTP_200_OK)
+    return Response(list(iter_profiles()), status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
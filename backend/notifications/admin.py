@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationPreference
+from .models import Notification, NotificationPreference, BroadcastNotification, BroadcastReceipt
 
 
 @admin.register(Notification)
@@ -43,3 +43,19 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
     ]
     search_fields = ['user__email', 'user__username']
     readonly_fields = ['updated_at']
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'notification_type', 'title', 'priority', 'created_at']
+    list_filter = ['notification_type', 'priority', 'created_at']
+    search_fields = ['title', 'message']
+    date_hierarchy = 'created_at'
+
+
+@admin.register(BroadcastReceipt)
+class BroadcastReceiptAdmin(admin.ModelAdmin):
+    list_display = ['broadcast', 'user', 'is_read', 'read_at', 'is_dismissed']
+    list_filter = ['is_read', 'is_dismissed']
+    search_fields = ['user__email', 'broadcast__title']
+    raw_id_fields = ['broadcast', 'user']
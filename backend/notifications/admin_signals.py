@@ -1,17 +1,11 @@
 from django.contrib.admin.models import LogEntry, ADDITION, CHANGE, DELETION
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from .utils import create_notification
-
-User = get_user_model()
+from .models import BroadcastNotification
 
 @receiver(post_save, sender=LogEntry)
 def notify_admin_actions(sender, instance, created, **kwargs):
     if created:
-        # Get all users to notify about admin actions
-        users = User.objects.filter(is_active=True)
-        
         action_map = {
             ADDITION: 'created',
             CHANGE: 'updated', 
@@ -46,14 +40,12 @@ def notify_admin_actions(sender, instance, created, **kwargs):
             message = f'System content has been {action} by admin.'
             action_url = '/dashboard'
         
-        # Notify all users about admin actions
-        for user in users:
-            create_notification(
-                user=user,
-                notification_type='system_update',
-                title=title,
-                message=message,
-                priority='low',
-                action_url=action_url,
-                action_text='View Changes'
-            )
\ No newline at end of file
+        # Notify all users about admin actions with one shared broadcast row
+        BroadcastNotification.objects.create(
+            notification_type='system_update',
+            title=title,
+            message=message,
+            priority='low',
+            action_url=action_url,
+            action_text='View Changes'
+        )
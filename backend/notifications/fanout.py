@@ -0,0 +1,155 @@
+"""Bulk fan-out of notifications to large recipient sets.
+
+Publishing content notifies every active user. Instead of one INSERT per
+recipient inside the publishing request, recipients are streamed as plain
+IDs and written in chunked ``bulk_create`` batches once the surrounding
+transaction has committed.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from backend import metrics
+
+from .models import Notification, NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Sent once per completed fan-out, since bulk_create bypasses post_save.
+# Receivers get ``result`` and ``notification`` (the shared field values).
+notification_fanned_out = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FanOutResult:
+    """Outcome of a single fan-out run"""
+
+    rows_written: int
+    batches: int
+    duration: float
+
+
+def iter_user_ids(queryset=None, chunk_size=DEFAULT_BATCH_SIZE):
+    """Stream recipient IDs without materialising User instances"""
+    if queryset is None:
+        queryset = User.objects.filter(is_active=True)
+    return queryset.order_by().values_list('id', flat=True).iterator(chunk_size=chunk_size)
+
+
+def fan_out_notification(user_ids, notification_type, title, message, priority='medium',
+                         action_url='', action_text='', metadata=None, expires_at=None,
+                         batch_size=None):
+    """Write one notification per recipient ID in bulk batches"""
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_FANOUT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    created_at = timezone.now()
+    metadata = metadata or {}
+
+    started = time.monotonic()
+    rows_written = 0
+    batches = 0
+    batch = []
+
+    def flush():
+        nonlocal rows_written, batches
+        Notification.objects.bulk_create(batch, batch_size=batch_size)
+        # bulk_create skips post_save, so bump unread counters per batch
+        if expires_at is None or expires_at >= created_at:
+            NotificationCounter.adjust([notification.user_id for notification in batch], 1, expires_at=expires_at)
+        rows_written += len(batch)
+        batches += 1
+        batch.clear()
+
+    for user_id in user_ids:
+        batch.append(Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            priority=priority,
+            action_url=action_url,
+            action_text=action_text,
+            metadata=dict(metadata),
+            created_at=created_at,
+            expires_at=expires_at,
+        ))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    result = FanOutResult(
+        rows_written=rows_written,
+        batches=batches,
+        duration=time.monotonic() - started,
+    )
+    logger.info(
+        "Notification fan-out '%s' wrote %d rows in %d batches (%.3fs)",
+        title, result.rows_written, result.batches, result.duration,
+    )
+    notification_fanned_out.send(
+        sender=Notification,
+        result=result,
+        notification={
+            'notification_type': notification_type,
+            'title': title,
+            'message': message,
+            'priority': priority,
+            'action_url': action_url,
+            'action_text': action_text,
+            'created_at': created_at.isoformat(),
+        },
+    )
+    return result
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-fanout')
+        return _executor
+
+
+def _run_fan_out(queryset, kwargs):
+    metrics.registry.gauge_add(metrics.QUEUE_DEPTH, -1, queue='notification_fanout')
+    close_old_connections()
+    try:
+        return fan_out_notification(iter_user_ids(queryset), **kwargs)
+    except Exception:
+        logger.exception("Notification fan-out '%s' failed", kwargs.get('title'))
+    finally:
+        close_old_connections()
+
+
+def schedule_fan_out(queryset=None, **kwargs):
+    """
+    Fan a notification out to ``queryset`` (default: all active users)
+    after the current transaction commits.
+
+    With ``NOTIFICATION_FANOUT_ASYNC`` enabled the batches are written on a
+    background worker so the publishing request returns immediately.
+    """
+    def dispatch():
+        if getattr(settings, 'NOTIFICATION_FANOUT_ASYNC', True):
+            metrics.registry.gauge_add(metrics.QUEUE_DEPTH, 1, queue='notification_fanout')
+            _get_executor().submit(_run_fan_out, queryset, kwargs)
+        else:
+            fan_out_notification(iter_user_ids(queryset), **kwargs)
+
+    transaction.on_commit(dispatch)
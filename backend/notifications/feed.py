@@ -0,0 +1,139 @@
+"""
+Merged notification feed.
+
+A user's feed is their personal Notification rows plus every
+BroadcastNotification published since they joined, combined with
+UNION ALL into a single ordered query so it can be paginated like a
+regular queryset. Broadcast read/dismissed state is resolved from
+BroadcastReceipt through correlated subqueries on its (user, broadcast)
+unique index.
+"""
+
+from django.db.models import BooleanField, CharField, Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BroadcastNotification, BroadcastReceipt, Notification
+
+PERSONAL = 'personal'
+BROADCAST = 'broadcast'
+BROADCAST_ID_PREFIX = 'b-'
+
+FEED_FIELDS = (
+    'id', 'notification_type', 'priority', 'title', 'message',
+    'action_url', 'action_text', 'metadata', 'created_at', 'expires_at',
+)
+
+
+def _not_expired(now):
+    return Q(expires_at__isnull=True) | Q(expires_at__gte=now)
+
+
+def visible_broadcasts(user, now=None):
+    """Broadcasts the user can see, ignoring read/dismissed state"""
+    now = now or timezone.now()
+    return BroadcastNotification.objects.filter(
+        _not_expired(now),
+        created_at__gte=user.date_joined,
+    )
+
+
+def _group_columns():
+    # Aggregates over a UNION can only reference annotation aliases, not the
+    # positional model columns, so expose the grouping fields under names.
+    return {'feed_type': F('notification_type'), 'feed_priority': F('priority')}
+
+
+def personal_feed(user, unread_only=False, now=None):
+    now = now or timezone.now()
+    queryset = Notification.objects.filter(_not_expired(now), user=user)
+    if unread_only:
+        queryset = queryset.filter(is_read=False)
+    return queryset.order_by().values(
+        *FEED_FIELDS,
+        feed_is_read=F('is_read'),
+        feed_read_at=F('read_at'),
+        source=Value(PERSONAL, output_field=CharField()),
+        **_group_columns(),
+    )
+
+
+def broadcast_feed(user, unread_only=False, now=None):
+    receipts = BroadcastReceipt.objects.filter(user=user, broadcast=OuterRef('pk'))
+    queryset = visible_broadcasts(user, now).exclude(
+        Exists(receipts.filter(is_dismissed=True))
+    )
+    if unread_only:
+        queryset = queryset.exclude(Exists(receipts.filter(is_read=True)))
+    return queryset.order_by().values(
+        *FEED_FIELDS,
+        feed_is_read=Coalesce(
+            Subquery(receipts.values('is_read')[:1]),
+            Value(False),
+            output_field=BooleanField(),
+        ),
+        feed_read_at=Subquery(receipts.values('read_at')[:1]),
+        source=Value(BROADCAST, output_field=CharField()),
+        **_group_columns(),
+    )
+
+
+def notification_feed(user, unread_only=False):
+    """Personal and broadcast notifications for ``user``, newest first"""
+    now = timezone.now()
+    return personal_feed(user, unread_only, now).union(
+        broadcast_feed(user, unread_only, now),
+        all=True,
+    ).order_by('-created_at', '-id')
+
+
+def parse_feed_id(pk):
+    """Split a feed item ID into (source, database id)"""
+    pk = str(pk)
+    if pk.startswith(BROADCAST_ID_PREFIX):
+        return BROADCAST, pk[len(BROADCAST_ID_PREFIX):]
+    return PERSONAL, pk
+
+
+def broadcast_feed_item(broadcast, receipt=None):
+    """Build a feed row for a single broadcast, matching notification_feed()"""
+    item = {field: getattr(broadcast, field) for field in FEED_FIELDS}
+    item.update(
+        feed_is_read=bool(receipt and receipt.is_read),
+        feed_read_at=receipt.read_at if receipt else None,
+        source=BROADCAST,
+    )
+    return item
+
+
+def feed_stats(user, breakdown=True):
+    """
+    Total, unread and per-type/per-priority counts for the merged feed,
+    computed with conditional aggregation in a single query.
+    """
+    aggregates = {
+        'total': Count('source'),
+        'unread': Count('source', filter=Q(feed_is_read=False)),
+    }
+    if breakdown:
+        for notification_type, _ in Notification.NOTIFICATION_TYPES:
+            aggregates[f'type__{notification_type}'] = Count(
+                'source', filter=Q(feed_type=notification_type)
+            )
+        for priority, _ in Notification.PRIORITY_LEVELS:
+            aggregates[f'priority__{priority}'] = Count('source', filter=Q(feed_priority=priority))
+
+    row = notification_feed(user).order_by().aggregate(**aggregates)
+    stats = {'total': row['total'], 'unread': row['unread']}
+    if breakdown:
+        stats['by_type'] = {
+            notification_type: row[f'type__{notification_type}']
+            for notification_type, _ in Notification.NOTIFICATION_TYPES
+            if row[f'type__{notification_type}']
+        }
+        stats['by_priority'] = {
+            priority: row[f'priority__{priority}']
+            for priority, _ in Notification.PRIORITY_LEVELS
+            if row[f'priority__{priority}']
+        }
+    return stats
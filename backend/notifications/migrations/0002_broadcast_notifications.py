@@ -0,0 +1,52 @@
+# Generated by Django 5.1.13 on 2026-10-17 03:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('community_reply', 'Community Reply'), ('community_like', 'Community Like'), ('assessment_reminder', 'Assessment Reminder'), ('crisis_alert', 'Crisis Alert'), ('peer_match', 'Peer Match'), ('guide_message', 'Guide Message'), ('system_update', 'System Update'), ('achievement', 'Achievement'), ('mood_checkin', 'Mood Check-in'), ('content_recommendation', 'Content Recommendation'), ('user_registration', 'User Registration'), ('user_approved', 'User Approved'), ('account_activated', 'Account Activated')], help_text='Type of notification', max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], default='medium', help_text='Priority level of notification', max_length=10)),
+                ('title', models.CharField(help_text='Notification title/headline', max_length=200)),
+                ('message', models.TextField(help_text='Notification message body')),
+                ('action_url', models.CharField(blank=True, help_text='Optional URL for notification action', max_length=500)),
+                ('action_text', models.CharField(blank=True, help_text='Optional text for action button', max_length=100)),
+                ('metadata', models.JSONField(blank=True, default=dict, help_text='Additional notification metadata')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When notification was created')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Optional expiration time for notification', null=True)),
+            ],
+            options={
+                'db_table': 'notifications_broadcast',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='notificatio_created_5e6984_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('is_dismissed', models.BooleanField(default=False)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notifications.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notifications_broadcast_receipt',
+                'constraints': [models.UniqueConstraint(fields=('user', 'broadcast'), name='unique_broadcast_receipt')],
+            },
+        ),
+    ]
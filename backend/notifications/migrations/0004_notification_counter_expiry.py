@@ -0,0 +1,33 @@
+# Generated by Django 5.1.13 on 2026-10-17 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='broadcast_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='broadcast_unread_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='broadcasts_synced',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='next_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, F, Min, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 from accounts.models import User
 
@@ -113,7 +115,13 @@ class Notification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            # Conditional update so concurrent calls only decrement once
+            updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=self.read_at
+            )
+            # Expired notifications already dropped out of the counter
+            if updated and not self.is_expired():
+                NotificationCounter.adjust(self.user_id, -1)
     
     def is_expired(self):
         """Check if notification has expired"""
@@ -122,6 +130,97 @@ class Notification(models.Model):
         return False
 
 
+class NotificationCounter(models.Model):
+    """
+    Denormalized header badge count of a user's unread notifications.
+
+    Rows are created lazily on first read and then kept current with
+    relative F() updates, so the badge is a single read of this row.
+    Expiry is handled without writes to the notifications: the row keeps
+    the earliest expiry among the notifications it counts and is recounted
+    once that time has passed. Unread broadcasts are counted separately and
+    recounted after broadcasts or the user's receipts change.
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_counter',
+        primary_key=True
+    )
+    unread_count = models.IntegerField(default=0)
+    next_expires_at = models.DateTimeField(null=True, blank=True)
+    broadcast_unread_count = models.IntegerField(default=0)
+    broadcast_expires_at = models.DateTimeField(null=True, blank=True)
+    broadcasts_synced = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'notifications_counter'
+    
+    def __str__(self):
+        return f"{self.unread_count} unread for {self.user_id}"
+    
+    @classmethod
+    def adjust(cls, user_ids, delta, expires_at=None):
+        """
+        Apply ``delta`` to the counters of one or many users; new
+        notifications pass their ``expires_at`` so the count drops with them
+        """
+        if not isinstance(user_ids, (list, tuple, set)):
+            user_ids = [user_ids]
+        updates = {'unread_count': Greatest(F('unread_count') + delta, 0)}
+        if expires_at is not None:
+            updates['next_expires_at'] = Least(Coalesce(F('next_expires_at'), Value(expires_at)), Value(expires_at))
+        cls.objects.filter(user_id__in=user_ids).update(updated_at=timezone.now(), **updates)
+    
+    @classmethod
+    def invalidate_broadcasts(cls, user_ids=None):
+        """Recount unread broadcasts of ``user_ids`` (default: everyone) on next read"""
+        counters = cls.objects.filter(broadcasts_synced=True)
+        if user_ids is not None:
+            counters = counters.filter(user_id__in=user_ids if isinstance(user_ids, (list, tuple, set)) else [user_ids])
+        counters.update(broadcasts_synced=False)
+    
+    @classmethod
+    def recalculate(cls, user):
+        """Recount from the notification tables and store the result"""
+        from .feed import broadcast_feed
+        
+        now = timezone.now()
+        personal = Notification.objects.filter(user=user, is_read=False).exclude(
+            expires_at__lt=now
+        ).aggregate(count=Count('id'), next_expires_at=Min('expires_at'))
+        broadcasts = broadcast_feed(user, unread_only=True, now=now).aggregate(
+            count=Count('id'), next_expires_at=Min('expires_at')
+        )
+        counter, _ = cls.objects.update_or_create(user=user, defaults={
+            'unread_count': personal['count'],
+            'next_expires_at': personal['next_expires_at'],
+            'broadcast_unread_count': broadcasts['count'],
+            'broadcast_expires_at': broadcasts['next_expires_at'],
+            'broadcasts_synced': True,
+        })
+        return counter
+    
+    def is_stale(self, now=None):
+        """True once a counted notification has expired or broadcasts changed"""
+        now = now or timezone.now()
+        return (
+            not self.broadcasts_synced
+            or (self.next_expires_at is not None and self.next_expires_at < now)
+            or (self.broadcast_expires_at is not None and self.broadcast_expires_at < now)
+        )
+    
+    @classmethod
+    def get_unread_count(cls, user):
+        """Personal plus broadcast badge count, initialising the row on first use"""
+        counter = cls.objects.filter(user=user).first()
+        if counter is None or counter.is_stale():
+            counter = cls.recalculate(user)
+        return counter.unread_count + counter.broadcast_unread_count
+
+
 class NotificationPreference(models.Model):
     """Model for user notification preferences"""
     
@@ -158,3 +257,102 @@ class NotificationPreference(models.Model):
     
     def __str__(self):
         return f"Notification preferences for {self.user.email}"
+
+
+class BroadcastNotification(models.Model):
+    """
+    A notification shared by every active user.
+
+    One row is stored per message; per-user read/dismissed state lives in
+    BroadcastReceipt and is only created once a user interacts with it.
+    """
+
+    notification_type = models.CharField(
+        max_length=50,
+        choices=Notification.NOTIFICATION_TYPES,
+        help_text="Type of notification"
+    )
+    priority = models.CharField(
+        max_length=10,
+        choices=Notification.PRIORITY_LEVELS,
+        default='medium',
+        help_text="Priority level of notification"
+    )
+
+    # Content
+    title = models.CharField(
+        max_length=200,
+        help_text="Notification title/headline"
+    )
+    message = models.TextField(
+        help_text="Notification message body"
+    )
+    action_url = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Optional URL for notification action"
+    )
+    action_text = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Optional text for action button"
+    )
+    metadata = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Additional notification metadata"
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When notification was created"
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Optional expiration time for notification"
+    )
+
+    class Meta:
+        db_table = 'notifications_broadcast'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Broadcast {self.notification_type}: {self.title}"
+
+    def is_expired(self):
+        """Check if broadcast has expired"""
+        if self.expires_at:
+            return timezone.now() > self.expires_at
+        return False
+
+
+class BroadcastReceipt(models.Model):
+    """Per-user read/dismissed marker for a broadcast notification"""
+
+    broadcast = models.ForeignKey(
+        BroadcastNotification,
+        on_delete=models.CASCADE,
+        related_name='receipts'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='broadcast_receipts'
+    )
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    is_dismissed = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = 'notifications_broadcast_receipt'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'broadcast'], name='unique_broadcast_receipt'),
+        ]
+
+    def __str__(self):
+        return f"Receipt for {self.user.email}: {self.broadcast_id}"
@@ -1,7 +1,35 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+
+from .feed import BROADCAST, BROADCAST_ID_PREFIX
 from .models import Notification, NotificationPreference
 
 
+def format_time_ago(created_at):
+    """Get human-readable time ago string"""
+    now = timezone.now()
+    diff = now - created_at
+    
+    if diff < timedelta(minutes=1):
+        return "Just now"
+    elif diff < timedelta(hours=1):
+        minutes = int(diff.total_seconds() / 60)
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    elif diff < timedelta(days=1):
+        hours = int(diff.total_seconds() / 3600)
+        return f"{hours} hour{'s' if hours != 1 else ''} ago"
+    elif diff < timedelta(days=7):
+        days = diff.days
+        return f"{days} day{'s' if days != 1 else ''} ago"
+    elif diff < timedelta(days=30):
+        weeks = diff.days // 7
+        return f"{weeks} week{'s' if weeks != 1 else ''} ago"
+    else:
+        return created_at.strftime("%b %d, %Y")
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for Notification model"""
     
@@ -16,38 +44,51 @@ class NotificationSerializer(serializers.ModelSerializer):
             'is_read', 'read_at', 'created_at', 'expires_at',
             'time_ago', 'is_expired'
         ]
-        read_only_fields = ['created_at', 'read_at', 'time_ago', 'is_expired']
+        # Read state changes go through the mark_read actions, which keep
+        # the unread counter in step
+        read_only_fields = ['is_read', 'created_at', 'read_at', 'time_ago', 'is_expired']
     
     def get_time_ago(self, obj):
         """Get human-readable time ago string"""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        diff = now - obj.created_at
-        
-        if diff < timedelta(minutes=1):
-            return "Just now"
-        elif diff < timedelta(hours=1):
-            minutes = int(diff.total_seconds() / 60)
-            return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-        elif diff < timedelta(days=1):
-            hours = int(diff.total_seconds() / 3600)
-            return f"{hours} hour{'s' if hours != 1 else ''} ago"
-        elif diff < timedelta(days=7):
-            days = diff.days
-            return f"{days} day{'s' if days != 1 else ''} ago"
-        elif diff < timedelta(days=30):
-            weeks = diff.days // 7
-            return f"{weeks} week{'s' if weeks != 1 else ''} ago"
-        else:
-            return obj.created_at.strftime("%b %d, %Y")
+        return format_time_ago(obj.created_at)
     
     def get_is_expired(self, obj):
         """Check if notification is expired"""
         return obj.is_expired()
 
 
+class NotificationFeedSerializer(serializers.Serializer):
+    """Serializer for merged personal/broadcast feed rows (see feed.py)"""
+    
+    id = serializers.SerializerMethodField()
+    source = serializers.CharField()
+    notification_type = serializers.CharField()
+    priority = serializers.CharField()
+    title = serializers.CharField()
+    message = serializers.CharField()
+    action_url = serializers.CharField()
+    action_text = serializers.CharField()
+    metadata = serializers.JSONField()
+    is_read = serializers.BooleanField(source='feed_is_read')
+    read_at = serializers.DateTimeField(source='feed_read_at', allow_null=True)
+    created_at = serializers.DateTimeField()
+    expires_at = serializers.DateTimeField(allow_null=True)
+    time_ago = serializers.SerializerMethodField()
+    is_expired = serializers.SerializerMethodField()
+    
+    def get_id(self, obj):
+        """Broadcast IDs are prefixed so they never collide with personal ones"""
+        if obj['source'] == BROADCAST:
+            return f"{BROADCAST_ID_PREFIX}{obj['id']}"
+        return obj['id']
+    
+    def get_time_ago(self, obj):
+        return format_time_ago(obj['created_at'])
+    
+    def get_is_expired(self, obj):
+        return bool(obj['expires_at'] and timezone.now() > obj['expires_at'])
+
+
 class NotificationPreferenceSerializer(serializers.ModelSerializer):
     """Serializer for NotificationPreference model"""
     
@@ -2,12 +2,23 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .models import Notification, NotificationPreference
+from .feed import (
+    BROADCAST,
+    broadcast_feed_item,
+    feed_stats,
+    notification_feed,
+    parse_feed_id,
+    visible_broadcasts,
+)
+from .models import Notification, NotificationPreference, NotificationCounter, BroadcastReceipt
 from .serializers import (
     NotificationSerializer, 
+    NotificationFeedSerializer,
     NotificationPreferenceSerializer,
     NotificationCreateSerializer
 )
@@ -17,6 +28,10 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing user notifications.
     
+    Personal notifications and shared broadcasts are served as one feed;
+    broadcast items carry a "b-" prefixed ID and their read/dismissed state
+    is tracked per user in BroadcastReceipt.
+    
     Endpoints:
     - GET /api/notifications/ - List all notifications for current user
     - GET /api/notifications/unread/ - List unread notifications
@@ -25,6 +40,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     - POST /api/notifications/mark_all_read/ - Mark all notifications as read
     - DELETE /api/notifications/{id}/ - Delete notification
     - DELETE /api/notifications/clear_all/ - Clear all read notifications
+    - GET /api/notifications/stats/ - Counts by type and priority
+    - GET /api/notifications/unread_count/ - Header badge count
     """
     
     serializer_class = NotificationSerializer
@@ -42,39 +59,94 @@ class NotificationViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def get_feed_queryset(self, unread_only=False):
+        """Personal and broadcast notifications merged into one query"""
+        return notification_feed(self.request.user, unread_only=unread_only)
+    
+    def get_broadcast(self, pk):
+        """Get a broadcast visible to the current user, with their receipt"""
+        if not str(pk).isdigit():
+            raise Http404
+        broadcast = get_object_or_404(visible_broadcasts(self.request.user), pk=pk)
+        receipt = BroadcastReceipt.objects.filter(
+            broadcast=broadcast, user=self.request.user
+        ).first()
+        if receipt and receipt.is_dismissed:
+            raise Http404
+        return broadcast, receipt
+    
     def list(self, request, *args, **kwargs):
         """List all notifications with pagination"""
-        queryset = self.get_queryset()
+        queryset = self.get_feed_queryset()
         
         # Get unread count
-        unread_count = queryset.filter(is_read=False).count()
+        unread_count = feed_stats(request.user, breakdown=False)['unread']
         
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = NotificationFeedSerializer(page, many=True)
             response = self.get_paginated_response(serializer.data)
             response.data['unread_count'] = unread_count
             return response
         
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = NotificationFeedSerializer(queryset, many=True)
         return Response({
             'results': serializer.data,
             'unread_count': unread_count
         })
     
+    def retrieve(self, request, *args, **kwargs):
+        """Get a personal or broadcast notification"""
+        source, pk = parse_feed_id(kwargs[self.lookup_field])
+        if source == BROADCAST:
+            broadcast, receipt = self.get_broadcast(pk)
+            return Response(NotificationFeedSerializer(broadcast_feed_item(broadcast, receipt)).data)
+        return super().retrieve(request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        """Delete a personal notification or dismiss a broadcast"""
+        source, pk = parse_feed_id(kwargs[self.lookup_field])
+        if source == BROADCAST:
+            broadcast, _ = self.get_broadcast(pk)
+            BroadcastReceipt.objects.update_or_create(
+                broadcast=broadcast,
+                user=request.user,
+                defaults={'is_dismissed': True}
+            )
+            NotificationCounter.invalidate_broadcasts(request.user.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return super().destroy(request, *args, **kwargs)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        if not instance.is_read:
+            NotificationCounter.adjust(instance.user_id, -1)
+    
     @action(detail=False, methods=['get'])
     def unread(self, request):
         """Get only unread notifications"""
-        queryset = self.get_queryset().filter(is_read=False)
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = self.get_feed_queryset(unread_only=True)
+        serializer = NotificationFeedSerializer(queryset, many=True)
         return Response({
             'results': serializer.data,
-            'count': queryset.count()
+            'count': len(serializer.data)
         })
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Mark a specific notification as read"""
+        source, pk = parse_feed_id(pk)
+        if source == BROADCAST:
+            broadcast, receipt = self.get_broadcast(pk)
+            if receipt is None or not receipt.is_read:
+                receipt, _ = BroadcastReceipt.objects.update_or_create(
+                    broadcast=broadcast,
+                    user=request.user,
+                    defaults={'is_read': True, 'read_at': timezone.now()}
+                )
+                NotificationCounter.invalidate_broadcasts(request.user.id)
+            return Response(NotificationFeedSerializer(broadcast_feed_item(broadcast, receipt)).data)
+        
         notification = self.get_object()
         notification.mark_as_read()
         serializer = self.get_serializer(notification)
@@ -83,10 +155,34 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
+        now = timezone.now()
         updated_count = self.get_queryset().filter(is_read=False).update(
             is_read=True,
-            read_at=timezone.now()
+            read_at=now
         )
+        if updated_count:
+            NotificationCounter.adjust(request.user.id, -updated_count)
+        
+        # Broadcasts: flip existing receipts, then create the missing ones
+        unread_broadcasts = visible_broadcasts(request.user).exclude(
+            Exists(BroadcastReceipt.objects.filter(
+                Q(is_read=True) | Q(is_dismissed=True),
+                user=request.user,
+                broadcast=OuterRef('pk'),
+            ))
+        )
+        unread_ids = list(unread_broadcasts.values_list('id', flat=True))
+        if unread_ids:
+            receipts = BroadcastReceipt.objects.filter(user=request.user, broadcast_id__in=unread_ids)
+            existing_ids = set(receipts.values_list('broadcast_id', flat=True))
+            receipts.update(is_read=True, read_at=now)
+            BroadcastReceipt.objects.bulk_create([
+                BroadcastReceipt(broadcast_id=broadcast_id, user=request.user, is_read=True, read_at=now)
+                for broadcast_id in unread_ids if broadcast_id not in existing_ids
+            ], ignore_conflicts=True)
+            NotificationCounter.invalidate_broadcasts(request.user.id)
+            updated_count += len(unread_ids)
+        
         return Response({
             'message': f'{updated_count} notifications marked as read',
             'count': updated_count
@@ -95,7 +191,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
         """Clear all read notifications"""
+        # Only read rows are removed, so the unread counter is unchanged
         deleted_count, _ = self.get_queryset().filter(is_read=True).delete()
+        deleted_count += BroadcastReceipt.objects.filter(
+            user=request.user, is_read=True, is_dismissed=False
+        ).update(is_dismissed=True)
         return Response({
             'message': f'{deleted_count} notifications cleared',
             'count': deleted_count
@@ -104,28 +204,17 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get notification statistics"""
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total': queryset.count(),
-            'unread': queryset.filter(is_read=False).count(),
-            'by_type': {},
-            'by_priority': {}
-        }
-        
-        # Count by type
-        for notification_type, _ in Notification.NOTIFICATION_TYPES:
-            count = queryset.filter(notification_type=notification_type).count()
-            if count > 0:
-                stats['by_type'][notification_type] = count
-        
-        # Count by priority
-        for priority, _ in Notification.PRIORITY_LEVELS:
-            count = queryset.filter(priority=priority).count()
-            if count > 0:
-                stats['by_priority'][priority] = count
+        return Response(feed_stats(request.user))
+    
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """
+        Get the header badge count.
         
-        return Response(stats)
+        Personal and broadcast counts both come from the maintained
+        NotificationCounter row.
+        """
+        return Response({'unread_count': NotificationCounter.get_unread_count(request.user)})
 
 
 class NotificationPreferenceViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,165 @@
+"""
+Push brokers for the realtime event stream.
+
+A broker receives events from synchronous Django code (signal handlers,
+views) and delivers them to asyncio subscribers held open by the stream
+view. Every event gets a cursor so a reconnecting client can resume from
+the last event it saw; if that cursor is no longer in the replay buffer
+the subscriber is told to resynchronise through the REST endpoints.
+
+The broker class is selected with ``settings.PUSH_BROKER``. LocalBroker
+keeps everything in process memory, so publishers and subscribers must
+share a process (a single ASGI worker, or a shared broker implementation
+behind the same interface).
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_HISTORY_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Event:
+    """A single pushed event"""
+
+    seq: int
+    channel: str
+    type: str
+    data: dict
+    created_at: float = field(default_factory=time.time)
+
+
+class Subscription:
+    """Handle returned by a broker for one connected client"""
+
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.backlog = []
+        self.needs_reset = False
+
+    def deliver(self, event):
+        """Called by the broker from any thread"""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+    async def get(self, timeout=None):
+        """Wait for the next event, or return None on timeout"""
+        if self.backlog:
+            return self.backlog.pop(0)
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """Interface for push brokers"""
+
+    def publish(self, channel, event_type, data):
+        raise NotImplementedError
+
+    def subscribe(self, channels, cursor=None):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def format_cursor(self, event):
+        raise NotImplementedError
+
+
+class LocalBroker(BaseBroker):
+    """
+    In-process broker with a bounded replay buffer.
+
+    Cursors are ``<epoch>-<seq>``; the epoch changes whenever the process
+    restarts so stale cursors are detected rather than silently replayed
+    against a new sequence.
+    """
+
+    def __init__(self, history_size=None):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = itertools.count(1)
+        self._history = deque(maxlen=history_size or getattr(
+            settings, 'PUSH_HISTORY_SIZE', DEFAULT_HISTORY_SIZE
+        ))
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event_type, data):
+        with self._lock:
+            event = Event(seq=next(self._seq), channel=channel, type=event_type, data=data)
+            self._history.append(event)
+            subscribers = [s for s in self._subscribers if channel in s.channels]
+
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # Event loop already closed; the client went away
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, channels, cursor=None):
+        subscription = Subscription(self, channels, asyncio.get_running_loop())
+        last_seq = self.parse_cursor(cursor)
+
+        # Register and snapshot history under one lock so nothing published
+        # in between is missed or delivered twice
+        with self._lock:
+            self._subscribers.add(subscription)
+            if cursor is not None:
+                oldest = self._history[0].seq if self._history else None
+                newest = self._history[-1].seq if self._history else 0
+                if last_seq is None or last_seq > newest or (oldest and last_seq < oldest - 1):
+                    subscription.needs_reset = True
+                else:
+                    subscription.backlog = [
+                        event for event in self._history
+                        if event.seq > last_seq and event.channel in subscription.channels
+                    ]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def format_cursor(self, event):
+        return f"{self.epoch}-{event.seq}"
+
+    def parse_cursor(self, cursor):
+        """Return the sequence number for one of our cursors, else None"""
+        if not cursor:
+            return None
+        epoch, _, seq = str(cursor).partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured by PUSH_BROKER"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_class = import_string(getattr(settings, 'PUSH_BROKER', 'realtime.broker.LocalBroker'))
+            _broker = broker_class()
+        return _broker
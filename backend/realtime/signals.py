@@ -0,0 +1,129 @@
+"""
+Publish model changes to the realtime broker.
+
+Events are published after the surrounding transaction commits so a
+client never receives an event for data it cannot yet read back through
+the REST fallback endpoints.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from community.call_views import call_status_payload
+from community.models import Call, CallParticipant, ChatMessage
+from community.serializers import ChatMessageSerializer
+from mood.analysis import analysis_completed
+from mood.serializers import EmotionAnalysisJobSerializer
+from notifications.fanout import notification_fanned_out
+from notifications.feed import BROADCAST_ID_PREFIX
+from notifications.models import BroadcastNotification, Notification
+from notifications.serializers import NotificationSerializer
+
+from .broker import get_broker
+
+logger = logging.getLogger(__name__)
+
+# Channel every authenticated stream is subscribed to
+BROADCAST_CHANNEL = 'broadcast'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def chat_channel(room_id):
+    return f'chat:{room_id}'
+
+
+def call_channel(room_id):
+    return f'call:{room_id}'
+
+
+def publish_on_commit(channel, event_type, build_data):
+    """Publish once the current transaction commits; ``build_data`` is lazy"""
+    def publish():
+        try:
+            get_broker().publish(channel, event_type, build_data())
+        except Exception:
+            logger.exception("Failed to publish %s event on %s", event_type, channel)
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_save, sender=ChatMessage)
+def publish_chat_message(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit(
+            chat_channel(instance.room_id),
+            'chat.message',
+            lambda: ChatMessageSerializer(instance).data
+        )
+
+
+@receiver(post_save, sender=Call)
+def publish_call_status(sender, instance, **kwargs):
+    publish_on_commit(
+        call_channel(instance.room_id),
+        'call.status',
+        lambda: call_status_payload(instance)
+    )
+
+
+@receiver(post_save, sender=CallParticipant)
+def publish_call_participants(sender, instance, **kwargs):
+    call = instance.call
+    publish_on_commit(
+        call_channel(call.room_id),
+        'call.status',
+        lambda: call_status_payload(call)
+    )
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit(
+            user_channel(instance.user_id),
+            'notification.created',
+            lambda: NotificationSerializer(instance).data
+        )
+
+
+@receiver(post_save, sender=BroadcastNotification)
+def publish_broadcast(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit(
+            BROADCAST_CHANNEL,
+            'notification.created',
+            lambda: {
+                'id': f'{BROADCAST_ID_PREFIX}{instance.id}',
+                'source': 'broadcast',
+                'notification_type': instance.notification_type,
+                'priority': instance.priority,
+                'title': instance.title,
+                'message': instance.message,
+                'action_url': instance.action_url,
+                'action_text': instance.action_text,
+                'created_at': instance.created_at.isoformat(),
+            }
+        )
+
+
+@receiver(notification_fanned_out)
+def publish_fan_out(sender, result, notification, **kwargs):
+    # One event for the whole fan-out; clients refresh their feed
+    get_broker().publish(BROADCAST_CHANNEL, 'notification.fanout', dict(
+        notification, rows_written=result.rows_written
+    ))
+
+
+@receiver(analysis_completed)
+def publish_emotion_analysis(sender, job, **kwargs):
+    publish_on_commit(
+        user_channel(job.user_id),
+        'mood.analysis',
+        lambda: EmotionAnalysisJobSerializer(job).data
+    )
@@ -0,0 +1,132 @@
+"""
+Server-Sent Events stream for notifications, chat messages and call status.
+
+GET /api/realtime/stream/?channels=chat:12,call:12
+
+Every stream is subscribed to the caller's ``user:<id>`` channel and the
+shared ``broadcast`` channel; ``chat:<room_id>`` and ``call:<room_id>``
+may be added for rooms the caller participates in. Reconnecting clients
+send the standard ``Last-Event-ID`` header (or ``?cursor=``) to resume.
+A ``reset`` event means the cursor could not be honoured and the client
+should reload state from the REST endpoints, which remain available as
+the polling fallback.
+
+The stream needs an ASGI server and ``PUSH_STREAM_ENABLED`` (see the
+settings for the single-worker requirement of LocalBroker); otherwise the
+endpoint answers 503 so clients fall back to polling.
+"""
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from community.models import ChatRoomParticipant
+
+from .broker import get_broker
+from .signals import BROADCAST_CHANNEL, user_channel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_SECONDS = 15
+
+
+def _authenticate(request):
+    """Resolve the user from a Bearer header or ``?token=`` (EventSource)"""
+    authentication = JWTAuthentication()
+    raw_token = None
+    header = authentication.get_header(request)
+    if header is not None:
+        raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        validated = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def _resolve_channels(user, requested):
+    """Keep only room channels the user participates in"""
+    channels = {user_channel(user.id), BROADCAST_CHANNEL}
+    room_ids = {}
+    for channel in requested:
+        kind, _, room_id = channel.partition(':')
+        if kind in ('chat', 'call') and room_id.isdigit():
+            room_ids.setdefault(int(room_id), []).append(channel)
+
+    if room_ids:
+        allowed = ChatRoomParticipant.objects.filter(
+            user=user, room_id__in=room_ids.keys()
+        ).values_list('room_id', flat=True)
+        for room_id in allowed:
+            channels.update(room_ids[room_id])
+    return channels
+
+
+def _format_event(broker, event):
+    return (
+        f"id: {broker.format_cursor(event)}\n"
+        f"event: {event.type}\n"
+        f"data: {json.dumps({'channel': event.channel, 'data': event.data}, default=str)}\n\n"
+    )
+
+
+async def _event_stream(broker, channels, cursor):
+    heartbeat = getattr(settings, 'PUSH_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS)
+    # Subscribe only once the server starts consuming the stream so an
+    # abandoned response never leaves a subscription behind
+    subscription = broker.subscribe(channels, cursor=cursor)
+    try:
+        yield "retry: 3000\n\n"
+        if subscription.needs_reset:
+            yield "event: reset\ndata: {}\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _format_event(broker, event)
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """Open a Server-Sent Events stream for the authenticated user"""
+    if not getattr(settings, 'PUSH_STREAM_ENABLED', False):
+        return JsonResponse(
+            {'error': 'Realtime stream is disabled; use the REST endpoints'},
+            status=503
+        )
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Realtime stream requires an ASGI server; use the REST endpoints'},
+            status=503
+        )
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+
+    requested = [c.strip() for c in request.GET.get('channels', '').split(',') if c.strip()]
+    channels = await sync_to_async(_resolve_channels)(user, requested)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+
+    logger.info("Realtime stream opened for user %s on %s", user.id, sorted(channels))
+
+    response = StreamingHttpResponse(
+        _event_stream(get_broker(), channels, cursor),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,73 @@
+"""Tests for the chunked admin mood dashboard."""
+
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from mood.models import MoodEntry
+
+User = get_user_model()
+
+
+class AdminMoodDashboardTest(TestCase):
+    """Constant query count, cursor paging and streaming."""
+
+    url = '/api/mood/admin/dashboard/'
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', username='admin', role='admin', is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_user(self, index, entries):
+        user = User.objects.create_user(email=f'u{index}@example.com', username=f'u{index}')
+        now = timezone.now()
+        for days_ago, emotion, confidence in entries:
+            entry = MoodEntry.objects.create(user=user, emotion=emotion, confidence=confidence)
+            MoodEntry.objects.filter(pk=entry.pk).update(timestamp=now - timedelta(days=days_ago))
+        return user
+
+    def test_profile_fields(self):
+        user = self.add_user(0, [(10, 'sad', 0.2), (3, 'happy', 0.9), (1, 'happy', 0.7), (40, 'sad', 0.1)])
+        profile = self.client.get(self.url).data[0]
+
+        self.assertEqual(profile['id'], str(user.id))
+        self.assertEqual(profile['currentMood']['emotion'], 'happy')
+        self.assertEqual(profile['currentMood']['confidence'], 0.7)
+        self.assertEqual(profile['totalSessions'], 4)
+        self.assertEqual(profile['moodTrend'], 'improving')
+        self.assertEqual([h['emotion'] for h in profile['moodHistory']], ['sad', 'happy', 'happy'])
+
+    def test_query_count_independent_of_user_count(self):
+        self.add_user(0, [(1, 'happy', 0.5)])
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        for index in range(1, 8):
+            self.add_user(index, [(1, 'sad', 0.5), (2, 'happy', 0.4)])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 8)
+        self.assertEqual(len(few), len(many))
+
+    def test_cursor_pages_and_stream(self):
+        users = [self.add_user(index, [(1, 'happy', 0.5)]) for index in range(3)]
+
+        first = self.client.get(self.url, {'limit': 2}).data
+        self.assertEqual([p['id'] for p in first['results']], [str(u.id) for u in users[:2]])
+        self.assertTrue(first['has_more'])
+        second = self.client.get(self.url, {'limit': 2, 'cursor': first['next_cursor']}).data
+        self.assertEqual([p['id'] for p in second['results']], [str(users[2].id)])
+        self.assertIsNone(second['next_cursor'])
+
+        streamed = self.client.get(self.url, {'stream': 'true'})
+        body = json.loads(b''.join(streamed.streaming_content))
+        self.assertEqual([p['id'] for p in body], [str(u.id) for u in users])
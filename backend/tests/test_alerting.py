@@ -0,0 +1,162 @@
+"""Tests for the sliding-window alert engine and its notification queue."""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from backend import metrics
+from backend.alerting import AlertEngine, AlertRule, AlertRunner, NotificationQueue, start_alerting
+from backend.timeseries import MINUTE, Point, TimeSeriesStore
+
+NOW = 1_700_000_000 - 1_700_000_000 % MINUTE + 5
+
+
+class RecordingNotifier:
+
+    def __init__(self):
+        self.sent = []
+
+    def submit(self, alert):
+        self.sent.append(alert)
+
+
+class AlertEngineTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.directory = directory
+        self.store = TimeSeriesStore(os.path.join(directory, 'trends.sqlite3'))
+        self.notifier = RecordingNotifier()
+        rules = [
+            AlertRule('high_error_rate', 'High Error Rate', 'Too many 5xx', 'error_rate', 5.0,
+                      window=300, for_duration=120, severity='critical'),
+            AlertRule('slow_p95', 'Slow', 'p95 too high', 'p95_response_time', 1.0, window=300),
+        ]
+        self.engine = AlertEngine(rules, notifier=self.notifier, store=self.store, repeat_seconds=3600)
+
+    def write_minute(self, at, requests, errors, slow=0):
+        counts = [0] * (len(metrics.LATENCY_BUCKETS) + 1)
+        counts[metrics.LATENCY_BUCKETS.index(0.05)] = requests - slow
+        counts[metrics.LATENCY_BUCKETS.index(2.5)] = slow
+        point = Point(requests=requests, errors=errors, latency_sum=requests * 0.05, histogram=counts)
+        self.store.write(at - at % MINUTE - MINUTE, point, now=at)
+
+    def test_fires_after_for_duration_then_deduplicates_and_resolves(self):
+        self.write_minute(NOW, 100, 10)
+        self.assertEqual(self.engine.evaluate(now=NOW), [])
+        self.assertEqual(self.engine.evaluate(now=NOW + 60), [])
+
+        fired = self.engine.evaluate(now=NOW + 120)
+        self.assertEqual([(a['rule_id'], a['status']) for a in fired], [('high_error_rate', 'active')])
+        self.assertEqual(fired[0]['current_value'], 10.0)
+        self.assertEqual(len(self.engine.get_active_alerts()), 1)
+
+        # Still firing: no repeat notification inside ALERT_REPEAT_SECONDS
+        self.assertEqual(self.engine.evaluate(now=NOW + 150), [])
+
+        # The bad minute slides out of the five-minute window
+        self.write_minute(NOW + 360, 100, 0)
+        resolved = self.engine.evaluate(now=NOW + 360)
+        self.assertEqual([(a['rule_id'], a['status']) for a in resolved], [('high_error_rate', 'resolved')])
+        self.assertEqual(self.engine.get_active_alerts(), [])
+        self.assertEqual([a['status'] for a in self.notifier.sent], ['active', 'resolved'])
+
+    def test_condition_clearing_before_for_duration_never_fires(self):
+        self.write_minute(NOW, 100, 10)
+        self.engine.evaluate(now=NOW)
+        self.write_minute(NOW + 360, 100, 0)
+        self.assertEqual(self.engine.evaluate(now=NOW + 360), [])
+        self.write_minute(NOW + 420, 100, 10)
+        # Pending restarts from scratch
+        self.assertEqual(self.engine.evaluate(now=NOW + 480), [])
+        self.assertEqual(self.notifier.sent, [])
+
+    def test_percentile_rule_over_window(self):
+        self.write_minute(NOW, 100, 0, slow=3)
+        self.write_minute(NOW + 60, 100, 0, slow=5)
+        self.assertEqual(self.engine.evaluate(now=NOW + 60), [])
+        self.write_minute(NOW + 120, 100, 0, slow=10)
+        fired = self.engine.evaluate(now=NOW + 120)
+        self.assertEqual([a['rule_id'] for a in fired], ['slow_p95'])
+        self.assertGreater(fired[0]['current_value'], 1.0)
+
+    def test_too_few_requests_are_ignored(self):
+        self.write_minute(NOW, 4, 4)
+        self.engine.evaluate(now=NOW)
+        self.assertEqual(self.engine.evaluate(now=NOW + 200), [])
+
+    @patch('backend.alerting.close_old_connections')
+    def test_only_the_lock_holder_evaluates(self, close_old_connections):
+        lock_path = os.path.join(self.directory, 'alerting.lock')
+        leader = AlertRunner(self.engine, lock_path=lock_path)
+        follower = AlertRunner(self.engine, lock_path=lock_path)
+        self.assertEqual(leader.run_once(now=NOW), [])
+        self.assertIsNone(follower.run_once(now=NOW))
+        leader.lock.release()
+        self.assertEqual(follower.run_once(now=NOW), [])
+        follower.lock.release()
+        self.assertEqual(close_old_connections.call_count, 4)
+
+    @override_settings(ENABLE_ALERTING=False)
+    def test_disabled_alerting_starts_no_thread(self):
+        with patch.object(AlertRunner, 'start') as start:
+            start_alerting()
+        start.assert_not_called()
+
+    def test_run_alerts_command_once(self):
+        out = StringIO()
+        with patch('backend.alerting.timeseries.store_path',
+                   return_value=os.path.join(self.directory, 'trends.sqlite3')), \
+                patch('backend.alerting.timeseries.get_store', return_value=self.store), \
+                patch('accounts.management.commands.run_alerts.start_sampler'), \
+                patch('backend.alerting.close_old_connections'), \
+                patch('backend.alerting.default_rules', return_value=[]):
+            call_command('run_alerts', '--once', stdout=out)
+        self.assertIn('Evaluated alert rules: 0 notification(s)', out.getvalue())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class NotificationQueueTest(SimpleTestCase):
+
+    alert = {
+        'rule_id': 'r', 'name': 'Rule', 'description': 'd', 'severity': 'critical', 'status': 'active',
+        'current_value': 1, 'threshold': 0, 'window': 60, 'timestamp': NOW,
+    }
+
+    def queue(self, **kwargs):
+        channels = {'email': {'enabled': True, 'recipients': ['ops@example.com'], 'severity_filter': ['critical']}}
+        return NotificationQueue(channels=channels, backoff=0, **kwargs)
+
+    def test_failed_delivery_is_retried(self):
+        queue = self.queue(retries=2)
+        real_send = queue._send_email_notification
+        attempts = []
+
+        def flaky(alert, config):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError('smtp down')
+            real_send(alert, config)
+
+        with patch.object(queue, '_send_email_notification', flaky):
+            futures = queue.submit(self.alert)
+            queue.drain()
+        self.assertTrue(futures[0].result())
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(mail.outbox[-1].subject, '[CRITICAL] Rule')
+
+    def test_gives_up_after_retries_and_filters_severity(self):
+        queue = self.queue(retries=1)
+        with patch.object(queue, '_send_email_notification', side_effect=ConnectionError) as send:
+            futures = queue.submit(self.alert)
+            queue.drain()
+            self.assertEqual(queue.submit(dict(self.alert, severity='warning')), [])
+        self.assertFalse(futures[0].result())
+        self.assertEqual(send.call_count, 2)
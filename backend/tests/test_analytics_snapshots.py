@@ -0,0 +1,135 @@
+"""Tests for the materialized dashboard analytics snapshots."""
+
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.views import AdminStatsView
+from analytics import snapshots
+from analytics.models import AnalyticsSnapshot
+from assessments.models import AssessmentType, ClientAssessmentAssignment
+
+User = get_user_model()
+
+
+class AnalyticsSnapshotTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', role='admin')
+        self.guide = User.objects.create_user(email='guide@example.com', username='guide', role='guide')
+        self.member = User.objects.create_user(email='member@example.com', username='member', role='user')
+        assessment_type = AssessmentType.objects.create(
+            name='GAD7', display_name='GAD-7', description='d', instructions='i'
+        )
+        ClientAssessmentAssignment.objects.create(
+            guide=self.guide, client=self.member, assessment_type=assessment_type
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_views_serve_the_stored_snapshot_until_fresh_is_requested(self):
+        first = self.client.get('/api/accounts/admin/stats/').json()
+        self.assertEqual(first['total_users'], 3)
+        self.assertIn('computed_at', first['snapshot'])
+
+        User.objects.create_user(email='late@example.com', username='late')
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/accounts/admin/stats/').json()
+        self.assertEqual(cached['total_users'], 3)
+        self.assertEqual(cached['snapshot']['computed_at'], first['snapshot']['computed_at'])
+
+        self.assertEqual(self.client.get('/api/accounts/admin/stats/', {'fresh': 1}).json()['total_users'], 4)
+
+    def test_stale_snapshots_are_recomputed_on_request(self):
+        self.client.get('/api/accounts/admin/stats/')
+        AnalyticsSnapshot.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        User.objects.create_user(email='late@example.com', username='late')
+        with override_settings(ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS=60):
+            response = self.client.get('/api/accounts/admin/stats/').json()
+        self.assertEqual(response['total_users'], 4)
+        self.assertLess(response['snapshot']['age_seconds'], 60)
+
+    def test_time_ranges_and_guides_are_keyed_separately(self):
+        self.assertEqual(self.client.get('/api/analytics/', {'timeRange': '7d'}).status_code, 200)
+        self.assertEqual(self.client.get('/api/analytics/', {'timeRange': 'bogus'}).json()['timeRange'], 'bogus')
+        guide_client = APIClient()
+        guide_client.force_authenticate(self.guide)
+        guide = guide_client.get('/api/guide/analytics/').json()
+        self.assertEqual(guide['clientEngagement']['totalClients'], 1)
+        self.assertEqual(
+            set(AnalyticsSnapshot.objects.values_list('metric_set', 'scope', 'time_range')),
+            {
+                ('system_analytics', 'global', '7d'),
+                ('system_analytics', 'global', '30d'),
+                ('guide_analytics', f'guide:{self.guide.pk}', '30d'),
+            },
+        )
+
+    def test_refresh_command_computes_every_scope_and_time_range(self):
+        out = StringIO()
+        call_command('refresh_analytics', '--once', stdout=out)
+        # Two dashboards over four time ranges (one guide has clients), plus four fixed sets
+        self.assertIn('Refreshed 12 analytics snapshot(s)', out.getvalue())
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 12)
+
+        call_command('refresh_analytics', '--once', '--set', 'assessment_stats', stdout=out)
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 12)
+        self.assertEqual(snapshots.get_snapshot('assessment_stats').data['total_assessments'], 0)
+
+    def test_failing_metric_set_does_not_stop_the_refresh(self):
+        with patch.object(AdminStatsView, 'compute', side_effect=RuntimeError('boom')):
+            with self.assertLogs('analytics.snapshots', 'ERROR'):
+                self.assertEqual(snapshots.refresh(['user_stats', 'assessment_stats']), (1, 1))
+
+    def test_only_the_lock_holder_refreshes_and_connections_are_recycled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        lock_path = os.path.join(directory, 'analytics.lock')
+        leader = snapshots.SnapshotRefresher(['assessment_stats'], lock_path=lock_path)
+        follower = snapshots.SnapshotRefresher(['assessment_stats'], lock_path=lock_path)
+        self.addCleanup(leader.lock.release)
+        self.addCleanup(follower.lock.release)
+
+        with patch('analytics.snapshots.close_old_connections') as close_old_connections:
+            self.assertEqual(leader.run_once(), (1, 0))
+            self.assertIsNone(follower.run_once())
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    @override_settings(ENABLE_ANALYTICS_REFRESHER=False)
+    def test_disabled_refresher_starts_no_thread(self):
+        with patch.object(snapshots.SnapshotRefresher, 'start') as start:
+            snapshots.start_refresher()
+        start.assert_not_called()
+
+    def test_misregistered_metric_sets_are_rejected(self):
+        registrations = {
+            'user_stats': 'accounts.views.AdminStatsView',
+            'renamed_stats': 'accounts.views.AdminStatsView',
+            'plain_view': 'rest_framework.views.APIView',
+        }
+        with patch.dict(snapshots.METRIC_SETS, registrations, clear=True):
+            self.assertIs(snapshots.metric_set_view('user_stats'), AdminStatsView)
+            for name in ('renamed_stats', 'plain_view'):
+                with self.assertRaises(ImproperlyConfigured):
+                    snapshots.metric_set_view(name)
+            with self.assertRaises(ImproperlyConfigured):
+                snapshots.check_metric_sets()
+
+    def test_view_without_compute_is_rejected(self):
+        class NoComputeView(snapshots.SnapshotMixin):
+            metric_set = 'no_compute'
+
+        with patch.dict(snapshots.METRIC_SETS, {'no_compute': 'NoComputeView'}, clear=True):
+            with patch('analytics.snapshots.import_string', return_value=NoComputeView):
+                with self.assertRaises(ImproperlyConfigured):
+                    snapshots.metric_set_view('no_compute')
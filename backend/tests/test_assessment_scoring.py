@@ -0,0 +1,101 @@
+"""Tests for compiled assessment scoring and the bulk submit path."""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from assessments import scoring
+from assessments.models import AssessmentQuestion, AssessmentResponse, AssessmentType, QuestionOption
+
+User = get_user_model()
+
+
+class AssessmentScoringTest(TestCase):
+
+    def setUp(self):
+        scoring.invalidate()
+        self.addCleanup(scoring.invalidate)
+        self.assessment_type = AssessmentType.objects.create(
+            name='PHQ9', display_name='PHQ-9', description='d', instructions='i',
+            total_questions=9, max_score=27
+        )
+        self.questions = []
+        for number in range(1, 10):
+            question = AssessmentQuestion.objects.create(
+                assessment_type=self.assessment_type, question_number=number, question_text=f'Q{number}'
+            )
+            # Created out of display order on purpose
+            for order in (3, 1, 2, 0):
+                QuestionOption.objects.create(question=question, text=f'{order}', score=order, order=order)
+            self.questions.append(question)
+        self.user = User.objects.create_user(email='taker@example.com', username='taker')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def submit(self, indexes, questions=None):
+        responses = [
+            {'question_id': question.id, 'selected_option_index': index}
+            for question, index in zip(questions or self.questions, indexes)
+        ]
+        return self.client.post(
+            '/api/assessments/take/',
+            {'assessment_type_id': self.assessment_type.id, 'responses': responses},
+            format='json'
+        )
+
+    def test_submit_scores_in_memory_and_bulk_inserts(self):
+        self.submit([0] * 9)  # compile the table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.submit([1, 1, 1, 2, 2, 2, 3, 3, 3])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_score'], 18)
+        self.assertEqual(response.data['risk_level'], 'moderately_severe')
+        self.assertEqual(response.data['percentage_score'], 66.7)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        # Plus one UPDATE each for the type, question and option answer counters
+        self.assertLessEqual(len(queries), 11)
+
+        saved = AssessmentResponse.objects.filter(assessment_id=response.data['id']).order_by('question_id')
+        self.assertEqual([row.response_value for row in saved], [1, 1, 1, 2, 2, 2, 3, 3, 3])
+        self.assertEqual(saved[8].selected_option_id.score, 3)
+
+    def test_reverse_scoring_and_invalid_responses(self):
+        first = self.questions[0]
+        first.is_reverse_scored = True
+        first.save()
+        response = self.submit([0], questions=[first])
+        self.assertEqual(response.data['total_score'], 3)
+
+        response = self.submit([4], questions=[first])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Invalid option index 4 for question. Available options: 4.')
+        other = AssessmentType.objects.create(name='GAD7', display_name='GAD-7', description='d', instructions='i')
+        foreign = AssessmentQuestion.objects.create(assessment_type=other, question_number=1, question_text='x')
+        self.assertEqual(self.submit([0], questions=[foreign]).status_code, 400)
+        self.assertEqual(self.submit([0, 1], questions=[first, first]).status_code, 400)
+
+    def test_option_changes_invalidate_compiled_table(self):
+        assessment_type = AssessmentType.objects.get(pk=self.assessment_type.pk)
+        table = scoring.get_scoring_table(assessment_type)
+        with self.assertNumQueries(0):
+            self.assertIs(scoring.get_scoring_table(assessment_type), table)
+
+        option = QuestionOption.objects.get(question=self.questions[0], order=0)
+        option.score = 10
+        option.save()
+        # Another worker only sees the bumped timestamp on the type it loads
+        scoring._tables[self.assessment_type.pk] = table
+        fresh = scoring.get_scoring_table(AssessmentType.objects.get(pk=self.assessment_type.pk))
+        self.assertIsNot(fresh, table)
+        self.assertEqual(fresh.questions[self.questions[0].id].score(0), (option.id, 10))
+
+    def test_risk_bands_match_published_cutoffs(self):
+        bands = scoring.RISK_BANDS
+        self.assertEqual(bands['PHQ9'].level(20), 'minimal')
+        self.assertEqual(bands['PHQ9'].level(20.1), 'mild')
+        self.assertEqual(bands['PCL5'].level(49.9), 'minimal')
+        self.assertEqual(bands['PCL5'].level(50), 'mild')
+        self.assertEqual(bands['GAD7'].level(100), 'severe')
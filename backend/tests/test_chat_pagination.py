@@ -0,0 +1,58 @@
+"""Tests for keyset pagination of chat history."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from community.models import ChatMessage, ChatRoom, ChatRoomParticipant
+
+User = get_user_model()
+
+
+class ChatHistoryPaginationTest(TestCase):
+    """Cursor paging walks history without OFFSET or COUNT."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='member@example.com', username='member')
+        self.room = ChatRoom.objects.create(name='Room', description='d', creator=self.user)
+        ChatRoomParticipant.objects.create(room=self.room, user=self.user)
+        self.messages = [
+            ChatMessage.objects.create(room=self.room, author=self.user, content=f'm{i}')
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/community/chat/{self.room.id}/get-messages/'
+
+    def contents(self, response):
+        return [m['content'] for m in response.data['messages']]
+
+    def test_before_cursor_walks_back_through_history(self):
+        """Should page from newest to oldest, each page oldest first."""
+        first = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(self.contents(first), ['m3', 'm4'])
+        self.assertTrue(first.data['has_more'])
+
+        second = self.client.get(self.url, {'page_size': 2, 'before': first.data['next_cursor']})
+        self.assertEqual(self.contents(second), ['m1', 'm2'])
+
+        last = self.client.get(self.url, {'page_size': 2, 'before': second.data['next_cursor']})
+        self.assertEqual(self.contents(last), ['m0'])
+        self.assertFalse(last.data['has_more'])
+
+    def test_since_cursor_returns_only_new_messages(self):
+        """Should return the delta after the client's last-seen message."""
+        latest = self.client.get(self.url, {'page_size': 10}).data['latest_cursor']
+        ChatMessage.objects.create(room=self.room, author=self.user, content='new')
+
+        delta = self.client.get(self.url, {'since': latest})
+        self.assertEqual(self.contents(delta), ['new'])
+        self.assertFalse(delta.data['has_more'])
+
+        empty = self.client.get(self.url, {'since': delta.data['latest_cursor']})
+        self.assertEqual(empty.data['messages'], [])
+        self.assertEqual(empty.data['latest_cursor'], delta.data['latest_cursor'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'before': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,109 @@
+"""Tests for the write-behind content view/play counter buffer."""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from content.counters import flush_counters
+from content.models import Article, ArticleView, AudioContent
+
+User = get_user_model()
+
+
+class ContentCounterBufferTest(TestCase):
+    """Increments are coalesced in memory and flushed as F() updates."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='viewer@example.com', username='viewer')
+        self.article = Article.objects.create(
+            title='Coping', excerpt='e', content='c', author=self.user,
+            is_published=True, published_at=timezone.now()
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.addCleanup(flush_counters)
+
+    @override_settings(CONTENT_COUNTER_FLUSH_SECONDS=3600)
+    def test_detail_views_are_buffered_until_flush(self):
+        for expected in (1, 2, 3):
+            response = self.client.get(f'/api/content/articles/{self.article.slug}/')
+            self.assertEqual(response.data['view_count'], expected)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 0)
+
+        result = flush_counters()
+        self.assertEqual((result.increments, result.updates), (3, 1))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 3)
+
+    @override_settings(CONTENT_COUNTER_FLUSH_SECONDS=3600)
+    def test_view_rows_written_in_one_batch(self):
+        for _ in range(4):
+            self.client.post(f'/api/content/articles/{self.article.id}/view/')
+        self.assertEqual(ArticleView.objects.count(), 0)
+
+        self.assertEqual(flush_counters().rows_written, 4)
+        self.assertEqual(ArticleView.objects.filter(article=self.article).count(), 4)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 4)
+
+    @override_settings(CONTENT_COUNTER_FLUSH_SECONDS=3600)
+    def test_failed_rows_are_requeued_without_holding_back_increments(self):
+        for _ in range(2):
+            self.client.post(f'/api/content/articles/{self.article.id}/view/')
+
+        with patch('django.db.models.QuerySet.bulk_create', side_effect=RuntimeError('db down')):
+            with self.assertLogs('content.counters', 'ERROR'):
+                result = flush_counters()
+        self.assertEqual((result.increments, result.rows_written), (2, 0))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 2)
+
+        result = flush_counters()
+        self.assertEqual((result.increments, result.rows_written), (0, 2))
+        self.assertEqual(ArticleView.objects.count(), 2)
+
+    @override_settings(CONTENT_COUNTER_FLUSH_SECONDS=3600, CONTENT_COUNTER_MAX_PENDING=1,
+                       CONTENT_COUNTER_MAX_ATTEMPTS=2)
+    def test_rows_that_keep_failing_are_dropped_and_retried_off_the_request(self):
+        with patch('django.db.models.QuerySet.bulk_create', side_effect=RuntimeError('db down')) as bulk_create:
+            with self.assertLogs('content.counters', 'ERROR'):
+                self.client.post(f'/api/content/articles/{self.article.id}/view/')
+                # Over the limit, but the retry is left to the flush timer
+                self.client.post(f'/api/content/articles/{self.article.id}/view/')
+            self.assertEqual(bulk_create.call_count, 1)
+
+            with self.assertLogs('content.counters', 'ERROR') as logs:
+                flush_counters()
+        self.assertIn('Dropped 0 counter increments and 1 view rows', logs.output[-1])
+
+        result = flush_counters()
+        self.assertEqual((result.increments, result.rows_written), (0, 1))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 2)
+        self.assertEqual(ArticleView.objects.count(), 1)
+
+    @override_settings(CONTENT_COUNTER_FLUSH_SECONDS=3600, CONTENT_COUNTER_MAX_ATTEMPTS=2)
+    def test_increments_that_keep_failing_are_dropped(self):
+        self.client.get(f'/api/content/articles/{self.article.slug}/')
+        with patch('django.db.models.QuerySet.update', side_effect=RuntimeError('db down')):
+            with self.assertLogs('content.counters', 'ERROR'):
+                self.assertEqual(flush_counters().increments, 0)
+            with self.assertLogs('content.counters', 'ERROR') as logs:
+                flush_counters()
+        self.assertIn('Dropped 1 counter increments', logs.output[-1])
+        self.assertEqual(flush_counters().increments, 0)
+
+    @override_settings(CONTENT_COUNTER_BUFFERED=False)
+    def test_unbuffered_writes_immediately(self):
+        audio = AudioContent.objects.create(
+            title='Breathing', description='d', audio_type='meditation', author=self.user,
+            is_published=True, published_at=timezone.now()
+        )
+        self.client.post(f'/api/content/audio/{audio.id}/view/')
+        audio.refresh_from_db()
+        self.assertEqual(audio.play_count, 1)
@@ -0,0 +1,61 @@
+"""Tests for batched "liked by me" resolution on content list endpoints."""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from content.models import Article, ArticleLike, AudioContent, AudioLike
+
+User = get_user_model()
+
+
+class ContentListLikesTest(TestCase):
+    """Likes for a page are resolved with one query, not one per item."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='reader@example.com', username='reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_articles(self, count):
+        return [
+            Article.objects.create(
+                title=f'Article {Article.objects.count()}', excerpt='e', content='c',
+                author=self.user, is_published=True, published_at=timezone.now()
+            )
+            for _ in range(count)
+        ]
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_article_likes_flagged_with_constant_queries(self):
+        liked = self.create_articles(2)
+        for article in liked:
+            ArticleLike.objects.create(user=self.user, article=article)
+        small, _ = self.count_queries('/api/content/articles/')
+
+        self.create_articles(6)
+        large, response = self.count_queries('/api/content/articles/')
+
+        self.assertEqual(small, large)
+        flags = {item['id']: item['isLiked'] for item in response.data['results']}
+        self.assertEqual({pk for pk, is_liked in flags.items() if is_liked}, {a.id for a in liked})
+
+    def test_audio_list_and_detail_agree(self):
+        audio = AudioContent.objects.create(
+            title='Breathing', description='d', audio_type='meditation', author=self.user,
+            is_published=True, published_at=timezone.now()
+        )
+        AudioLike.objects.create(user=self.user, audio=audio)
+
+        listing = self.client.get('/api/content/audio/')
+        self.assertTrue(listing.data['results'][0]['is_liked'])
+        detail = self.client.get(f'/api/content/audio/{audio.id}/')
+        self.assertTrue(detail.data['is_liked'])
@@ -0,0 +1,82 @@
+"""Tests for the database-side crisis response-time metrics."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from crisis.models import CrisisAlert
+from crisis.sla import intervention_metrics, percentile_cont
+
+User = get_user_model()
+
+
+class PercentileContTest(SimpleTestCase):
+
+    def test_interpolates_like_postgres(self):
+        self.assertIsNone(percentile_cont([], 0.5))
+        self.assertEqual(percentile_cont([7], 0.9), 7)
+        self.assertEqual(percentile_cont([4, 1, 3, 2], 0.5), 2.5)
+        self.assertAlmostEqual(percentile_cont([10, 20, 30, 40, 50], 0.9), 46)
+
+
+class CrisisResponseTimeTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='member@example.com', username='member')
+        self.now = timezone.now()
+        # Resolved after 10, 20, 30 and 100 minutes
+        for minutes_taken in (10, 20, 30, 100):
+            self.alert(
+                status='resolved', created=self.now - timedelta(days=1), acknowledged_after=5,
+                resolved_after=minutes_taken
+            )
+        self.alert(status='resolved', created=self.now - timedelta(days=1))  # no resolution time recorded
+        self.alert(status='active', severity_level='critical', created=self.now - timedelta(hours=2))
+        self.alert(status='acknowledged', created=self.now - timedelta(days=40), acknowledged_after=1)
+
+    def alert(self, status, created, severity_level='high', acknowledged_after=None, resolved_after=None):
+        alert = CrisisAlert.objects.create(
+            user=self.user, alert_type='self_reported', severity_level=severity_level, status=status
+        )
+        CrisisAlert.objects.filter(pk=alert.pk).update(
+            created_at=created,
+            acknowledged_at=created + timedelta(minutes=acknowledged_after) if acknowledged_after else None,
+            resolved_at=created + timedelta(minutes=resolved_after) if resolved_after else None,
+        )
+
+    def test_intervention_metrics_in_one_query(self):
+        alerts = CrisisAlert.objects.filter(created_at__gte=self.now - timedelta(days=30))
+        with self.assertNumQueries(1):
+            metrics = intervention_metrics(alerts)
+        self.assertEqual(metrics, {
+            'totalInterventions': 6,
+            'successfulInterventions': 5,
+            'escalations': 1,
+            'averageResponseTime': 40.0,
+            'medianResponseTime': 25.0,
+            'p90ResponseTime': 79.0,
+        })
+
+    def test_no_responses_report_zero(self):
+        metrics = intervention_metrics(CrisisAlert.objects.filter(status='active'))
+        self.assertEqual(
+            (metrics['averageResponseTime'], metrics['medianResponseTime'], metrics['p90ResponseTime']),
+            (0, 0, 0)
+        )
+
+    def test_crisis_stats_report_acknowledgement_percentiles(self):
+        admin = User.objects.create_user(email='admin@example.com', username='admin', role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        stats = client.get('/api/crisis/stats/').json()
+        self.assertEqual(stats['total_alerts'], 7)
+        self.assertEqual(stats['alerts_this_week'], 6)
+        self.assertEqual(stats['resolved_alerts'], 5)
+        # Only this week's acknowledged alerts count towards response time
+        self.assertEqual(
+            (stats['response_time_avg'], stats['response_time_median'], stats['response_time_p90']),
+            (5.0, 5.0, 5.0)
+        )
@@ -0,0 +1,95 @@
+"""Tests for the denormalized forum post/comment/reply counters."""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from community.models import ForumCategory, ForumComment, ForumPost
+
+User = get_user_model()
+
+
+class ForumCounterTest(TestCase):
+    """Counters follow creates, approval changes, moves and deletes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='poster@example.com', username='poster')
+        self.category = ForumCategory.objects.create(name='General', description='General talk')
+        self.other = ForumCategory.objects.create(name='Other', description='Other talk')
+        self.post = ForumPost.objects.create(
+            title='Hello there', content='First post content', author=self.user, category=self.category
+        )
+
+    def refresh(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+
+    def test_post_approval_and_move_update_category_counts(self):
+        self.refresh(self.category)
+        self.assertEqual(self.category.post_count, 1)
+
+        self.post.is_approved = False
+        self.post.save()
+        self.refresh(self.category)
+        self.assertEqual(self.category.post_count, 0)
+
+        self.post.is_approved = True
+        self.post.category = self.other
+        self.post.save()
+        self.refresh(self.category, self.other)
+        self.assertEqual((self.category.post_count, self.other.post_count), (0, 1))
+
+        self.post.delete()
+        self.refresh(self.other)
+        self.assertEqual(self.other.post_count, 0)
+
+    def test_comment_and_reply_counts(self):
+        comment = ForumComment.objects.create(post=self.post, author=self.user, content='Top level')
+        reply = ForumComment.objects.create(post=self.post, author=self.user, content='Reply', parent=comment)
+        self.refresh(self.post, comment)
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(comment.reply_count, 1)
+
+        reply.is_approved = False
+        reply.save()
+        self.refresh(self.post, comment)
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(comment.reply_count, 0)
+
+        comment.delete()
+        self.refresh(self.post)
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_saving_a_stale_instance_keeps_counters(self):
+        stale_post = ForumPost.objects.get(pk=self.post.pk)
+        comment = ForumComment.objects.create(post=self.post, author=self.user, content='Welcome')
+        stale_comment = ForumComment.objects.get(pk=comment.pk)
+        ForumComment.objects.create(post=self.post, parent=comment, author=self.user, content='Thanks')
+        ForumPost.objects.filter(pk=self.post.pk).update(like_count=3)
+
+        stale_post.title = 'Edited title'
+        stale_post.save()
+        stale_comment.content = 'Edited'
+        stale_comment.save()
+        category = ForumCategory.objects.get(pk=self.category.pk)
+        category.description = 'Edited'
+        ForumPost.objects.create(title='Second', content='More content', author=self.user, category=self.category)
+        category.save()
+
+        self.refresh(self.post, comment, self.category)
+        self.assertEqual(self.post.title, 'Edited title')
+        self.assertEqual((self.post.comment_count, self.post.like_count), (2, 3))
+        self.assertEqual((comment.content, comment.reply_count), ('Edited', 1))
+        self.assertEqual((self.category.description, self.category.post_count), ('Edited', 2))
+
+    def test_reconcile_command_repairs_drift(self):
+        ForumComment.objects.create(post=self.post, author=self.user, content='Top level')
+        ForumPost.objects.filter(pk=self.post.pk).update(comment_count=7)
+        ForumCategory.objects.filter(pk=self.category.pk).update(post_count=0)
+
+        call_command('reconcile_forum_counters', stdout=StringIO())
+        self.refresh(self.post, self.category)
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.category.post_count, 1)
@@ -0,0 +1,84 @@
+"""Tests for the guide client roster served by one annotated query."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assessments.models import Assessment, AssessmentType, ClientAssessmentAssignment
+
+User = get_user_model()
+
+
+class GuideRosterTest(TestCase):
+
+    def setUp(self):
+        self.assessment_type = AssessmentType.objects.create(
+            name='GAD7', display_name='GAD-7', description='d', instructions='i', max_score=21
+        )
+        self.guide = User.objects.create_user(email='guide@example.com', username='guide', role='guide')
+        self.client = APIClient()
+        self.client.force_authenticate(self.guide)
+        now = timezone.now()
+        self.calm = self.make_client('calm', [(now - timedelta(days=40), 'high'), (now, 'mild')])
+        self.risky = self.make_client('risky', [(now - timedelta(days=2), 'HIGH')])
+        self.lapsed = self.make_client('lapsed', [(now - timedelta(days=45), 'critical')])
+        self.new = self.make_client('new', [])
+        self.assignment = ClientAssessmentAssignment.objects.create(
+            guide=self.guide, client=self.risky, assessment_type=self.assessment_type
+        )
+
+    def make_client(self, name, assessments):
+        user = User.objects.create_user(email=f'{name}@example.com', username=name, role='user')
+        for completed_at, risk_level in assessments:
+            assessment = Assessment.objects.create(
+                user=user, assessment_type=self.assessment_type, total_score=5, risk_level=risk_level
+            )
+            Assessment.objects.filter(pk=assessment.pk).update(completed_at=completed_at)
+        return user
+
+    def get(self, **params):
+        response = self.client.get('/api/guide/clients/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_roster_rows_come_from_the_latest_assessment(self):
+        rows = {row['id']: row for row in self.get()['results']}
+        self.assertEqual(set(rows), {self.calm.id, self.risky.id, self.lapsed.id, self.new.id})
+        self.assertEqual(
+            {user_id: (row['status'], row['riskLevel'], row['assessmentCount']) for user_id, row in rows.items()},
+            {
+                self.calm.id: ('active', 'mild', 2),
+                self.risky.id: ('at_risk', 'high', 1),
+                self.lapsed.id: ('inactive', 'critical', 1),
+                self.new.id: ('inactive', 'low', 0),
+            },
+        )
+        self.assertIsNone(rows[self.new.id]['lastAssessment'])
+        self.assertEqual(rows[self.risky.id]['assignedDate'], self.assignment.assigned_date.isoformat())
+        self.assertEqual(rows[self.calm.id]['assignedDate'], self.calm.date_joined.isoformat())
+
+    def test_filters_by_status_and_risk(self):
+        self.assertEqual([row['id'] for row in self.get(status='inactive')['results']], [self.lapsed.id, self.new.id])
+        self.assertEqual([row['id'] for row in self.get(risk='low')['results']], [self.new.id])
+        self.assertEqual(self.get(status='at_risk', risk='high')['count'], 1)
+        self.assertEqual(self.client.get('/api/guide/clients/', {'status': 'busy'}).status_code, 400)
+
+    def test_pages_and_query_count_do_not_depend_on_population(self):
+        page = self.get(page_size=3)
+        self.assertEqual((page['count'], len(page['results'])), (4, 3))
+        self.assertEqual([row['id'] for row in self.get(page_size=3, page=2)['results']], [self.new.id])
+
+        # The total count and the page itself
+        with self.assertNumQueries(2):
+            self.get()
+        for index in range(5):
+            self.make_client(f'more{index}', [(timezone.now(), 'low')])
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get()['count'], 9)
+
+    def test_clients_cannot_list_the_roster(self):
+        self.client.force_authenticate(self.calm)
+        self.assertEqual(self.client.get('/api/guide/clients/').status_code, 403)
@@ -4,13 +4,20 @@ These tests focus on middleware-specific behaviors (headers, caching, and
 suspicious request detection) using Django's TestCase and request factory.
 """
 
+import json
+import os
+import shutil
+import tempfile
 import time
 from unittest.mock import patch
 
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import resolve
 from django.http import HttpResponse
 from django.core.cache import cache
 
+from backend import metrics
+from backend.system_sampler import SystemSnapshot
 from backend.middleware import (
     MonitoringMiddleware,
     MetricsMiddleware,
@@ -57,32 +64,15 @@ class MonitoringMiddlewareUnitTest(TestCase):
         in_flight_after = cache.get("concurrent_requests", 0)
         self.assertEqual(in_flight_after, 0)
 
-    @patch("backend.backend.middleware.psutil.virtual_memory")
-    @patch("backend.backend.middleware.psutil.cpu_percent")
-    @patch("backend.backend.middleware.psutil.disk_usage")
-    @patch("backend.backend.middleware.psutil.net_io_counters")
-    def test_system_metrics_cached_with_expected_fields(
-        self, mock_net, mock_disk, mock_cpu, mock_mem
-    ):
-        """Should cache system_metrics with CPU, memory, disk, and network data."""
-        # Configure fake psutil responses
-        mock_cpu.return_value = 12.5
-
-        class MemInfo:
-            percent = 50.0
-            available = 123456
-
-        class DiskInfo:
-            percent = 70.0
-            free = 987654
-
-        class NetInfo:
-            bytes_sent = 111
-            bytes_recv = 222
-
-        mock_mem.return_value = MemInfo()
-        mock_disk.return_value = DiskInfo()
-        mock_net.return_value = NetInfo()
+    @patch("backend.middleware.latest_snapshot")
+    def test_system_metrics_cached_with_expected_fields(self, mock_snapshot):
+        """Should cache the sampler's CPU, memory, disk, and network data."""
+        mock_snapshot.return_value = SystemSnapshot(
+            timestamp=time.time(), cpu_percent=12.5, cpu_count=4,
+            memory_percent=50.0, memory_total=1000000, memory_available=123456, memory_used=876544,
+            disk_percent=70.0, disk_total=2000000, disk_free=987654, disk_used=1012346,
+            network_bytes_sent=111, network_bytes_recv=222,
+        )
 
         # Call update_system_metrics directly
         self.middleware.update_system_metrics()
@@ -129,51 +119,75 @@ class MetricsMiddlewareUnitTest(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
         self.middleware = MetricsMiddleware(get_response=lambda r: HttpResponse("OK"))
-        cache.clear()
-
-    def tearDown(self):
-        cache.clear()
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        settings_override = override_settings(METRICS_DIR=metrics_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        registry_patch = patch.object(metrics, "registry", metrics.MetricsRegistry())
+        self.registry = registry_patch.start()
+        self.addCleanup(registry_patch.stop)
+
+    def request(self, path):
+        request = self.factory.get(path)
+        request.resolver_match = resolve(path)
+        return request
 
     def test_aggregates_endpoint_metrics_and_status_codes(self):
-        """Should aggregate per-endpoint counts, times, and status code tallies."""
-        request = self.factory.get("/api/test-endpoint/")
-        request._monitoring_start_time = time.time() - 0.05  # simulate 50ms work
+        """Should aggregate per-route counts, times, and status code tallies."""
+        request = self.request("/api/mood/stats/")
 
         response = HttpResponse("OK", status=201)
         self.middleware.update_metrics(request, response, 0.05)
 
-        metrics = cache.get("api_metrics")
-        self.assertIsNotNone(metrics)
-        self.assertEqual(metrics["total_requests"], 1)
-        self.assertAlmostEqual(metrics["total_response_time"], 0.05, places=3)
-        self.assertIn("201", metrics["status_codes"])
-        self.assertEqual(metrics["status_codes"]["201"], 1)
-
-        endpoint_key = "GET /api/test-endpoint/"
-        self.assertIn(endpoint_key, metrics["endpoints"])
-        endpoint_metrics = metrics["endpoints"][endpoint_key]
+        summary = metrics.api_summary()
+        self.assertEqual(summary["total_requests"], 1)
+        self.assertAlmostEqual(summary["total_response_time"], 0.05, places=3)
+        self.assertEqual(summary["status_codes"], {"201": 1})
+
+        endpoint_metrics = summary["endpoints"]["GET mood:mood-stats"]
         self.assertEqual(endpoint_metrics["count"], 1)
         self.assertAlmostEqual(endpoint_metrics["total_time"], 0.05, places=3)
         self.assertAlmostEqual(endpoint_metrics["avg_time"], 0.05, places=3)
 
-    def test_update_metrics_handles_multiple_calls_for_same_endpoint(self):
-        """Should correctly update counts and recompute average time over multiple calls."""
-        request = self.factory.get("/api/multi-endpoint/")
-
-        # First request ~10ms
-        self.middleware.update_metrics(request, HttpResponse("OK"), 0.01)
-        # Second request ~30ms
-        self.middleware.update_metrics(request, HttpResponse("OK"), 0.03)
-
-        metrics = cache.get("api_metrics")
-        endpoint_key = "GET /api/multi-endpoint/"
-        endpoint_metrics = metrics["endpoints"][endpoint_key]
+    def test_update_metrics_handles_multiple_calls_for_same_route(self):
+        """Different paths of one route share a key; averages are recomputed."""
+        self.middleware.update_metrics(self.request("/api/mood/entries/1/"), HttpResponse("OK"), 0.01)
+        self.middleware.update_metrics(self.request("/api/mood/entries/2/"), HttpResponse("OK"), 0.03)
 
+        endpoints = metrics.api_summary()["endpoints"]
+        self.assertEqual(list(endpoints), ["GET mood:mood-entry-detail"])
+        endpoint_metrics = endpoints["GET mood:mood-entry-detail"]
         self.assertEqual(endpoint_metrics["count"], 2)
         self.assertAlmostEqual(endpoint_metrics["total_time"], 0.04, places=3)
-        # Average should be 0.02 seconds
         self.assertAlmostEqual(endpoint_metrics["avg_time"], 0.02, places=3)
 
+    def test_latency_histogram_uses_fixed_buckets(self):
+        for seconds in (0.003, 0.2, 30):
+            self.registry.observe_request("r", "GET", 200, seconds)
+        (_, counts, total), = self.registry.collect()["histograms"].values()
+        self.assertEqual(len(counts), len(metrics.LATENCY_BUCKETS) + 1)
+        self.assertEqual((counts[0], counts[metrics.LATENCY_BUCKETS.index(0.25)], counts[-1]), (1, 1, 1))
+        self.assertAlmostEqual(total, 30.203)
+
+    def test_flushed_workers_are_merged(self):
+        """Snapshots written by other worker processes are summed in."""
+        self.registry.observe_request("r", "GET", 200, 0.1)
+        other_worker = self.registry.snapshot()
+        other_worker["pid"] = -1
+        with open(f"{metrics.metrics_dir()}/metrics--1.json", "w") as handle:
+            json.dump(other_worker, handle)
+
+        self.registry.gauge_add(metrics.REQUESTS_IN_FLIGHT, 1)
+        self.registry.observe_request("r", "GET", 500, 0.3)
+        path = self.registry.flush()
+        self.assertTrue(path.endswith(f"metrics-{os.getpid()}.json"))
+
+        summary = metrics.api_summary()
+        self.assertEqual(summary["total_requests"], 3)
+        self.assertEqual(summary["status_codes"], {"200": 2, "500": 1})
+        self.assertAlmostEqual(summary["endpoints"]["GET r"]["total_time"], 0.5)
+
 
 class HealthCheckMiddlewareUnitTest(TestCase):
     """Unit tests for HealthCheckMiddleware quick responses."""
@@ -0,0 +1,104 @@
+"""Tests for the queued, cached emotion-analysis pipeline."""
+
+import base64
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from mood import analysis
+from mood.models import EmotionAnalysisJob, MoodAnalysisSession
+
+User = get_user_model()
+
+IMAGE = 'data:image/jpeg;base64,' + base64.b64encode(b'\xff\xd8\xff\xe0face').decode()
+OTHER_IMAGE = base64.b64encode(b'\xff\xd8\xff\xe0another-face').decode()
+
+
+@override_settings(MOOD_ANALYZER='mood.analysis.LocalAnalyzer', MOOD_ANALYSIS_ASYNC=False)
+class EmotionAnalysisQueueTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(email='face@example.com', username='face')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def analyze(self, image=IMAGE, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/mood/analyze/', {'image_data': image, **extra}, format='json')
+
+    def test_post_returns_job_handle_and_poll_returns_result(self):
+        response = self.analyze(session_id='camera-session-1')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertNotIn('emotion', response.data)
+
+        polled = self.client.get(response.data['poll_url'])
+        self.assertEqual(polled.status_code, 200)
+        self.assertEqual(polled.data['status'], 'completed')
+        self.assertFalse(polled.data['cached'])
+        expected = analysis.LocalAnalyzer().analyze(base64.b64decode(IMAGE.split(',')[1]))
+        self.assertEqual(polled.data['emotion'], expected['emotion'])
+        self.assertAlmostEqual(sum(polled.data['emotions'].values()), 1.0)
+
+        session = MoodAnalysisSession.objects.get(session_id='camera-session-1')
+        self.assertEqual((session.total_captures, session.successful_analyses), (1, 1))
+        self.assertIsNotNone(session.processing_time)
+
+    def test_repeated_image_is_answered_from_cache(self):
+        self.analyze()
+        with mock.patch.object(analysis.LocalAnalyzer, 'analyze') as analyze:
+            response = self.analyze()
+        analyze.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['cached'])
+        self.assertIn('emotion', response.data)
+
+        # Breakdown choice is part of the cache key
+        response = self.analyze(include_breakdown=False)
+        self.assertEqual(response.status_code, 202)
+
+    def test_failed_analysis_is_reported_and_not_cached(self):
+        with mock.patch.object(analysis.LocalAnalyzer, 'analyze', side_effect=RuntimeError('down')):
+            response = self.analyze(image=OTHER_IMAGE)
+        job = EmotionAnalysisJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual((job.status, job.error), ('failed', 'down'))
+        self.assertEqual(job.session.successful_analyses, 0)
+        self.assertEqual(self.analyze(image=OTHER_IMAGE).status_code, 202)
+
+    def test_jobs_are_private_and_input_validated(self):
+        job_id = self.analyze().data['job_id']
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@example.com', username='other'))
+        self.assertEqual(other.get(f'/api/mood/analyze/{job_id}/').status_code, 404)
+        self.assertEqual(self.analyze(image='not base64!').status_code, 400)
+
+    def test_sessions_of_other_users_cannot_be_joined(self):
+        self.analyze(session_id='camera-session-a')
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@example.com', username='other'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = other.post(
+                '/api/mood/analyze/', {'image_data': OTHER_IMAGE, 'session_id': 'camera-session-a'}, format='json'
+            )
+        self.assertEqual(response.status_code, 404)
+        session = MoodAnalysisSession.objects.get(session_id='camera-session-a')
+        self.assertEqual((session.user, session.total_captures), (self.user, 1))
+        self.assertEqual(EmotionAnalysisJob.objects.filter(session=session).count(), 1)
+
+    def test_identical_image_in_flight_waits_for_the_running_analysis(self):
+        running = analysis.Future()
+        analysis._inflight['key'] = running
+        self.addCleanup(analysis._inflight.pop, 'key', None)
+
+        with mock.patch.object(analysis.LocalAnalyzer, 'analyze') as analyze:
+            with analysis.ThreadPoolExecutor(max_workers=1) as pool:
+                waiting = pool.submit(analysis._analyze_shared, 'key', b'img', True)
+                self.assertFalse(waiting.done())
+                running.set_result({'emotion': 'happy'})
+                self.assertEqual(waiting.result(timeout=5), {'emotion': 'happy'})
+        analyze.assert_not_called()
@@ -0,0 +1,83 @@
+"""Tests for storing camera mood snapshots as content-addressed blobs."""
+
+import base64
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from mood.models import MoodEntry
+
+User = get_user_model()
+
+IMAGE = b'\xff\xd8\xff\xe0fake-jpeg-bytes'
+DATA_URL = 'data:image/jpeg;base64,' + base64.b64encode(IMAGE).decode()
+BREAKDOWN = {'happy': 0.8, 'sad': 0.0, 'angry': 0.0, 'surprised': 0.1,
+             'neutral': 0.1, 'fear': 0.0, 'disgust': 0.0}
+
+
+class MoodImageBlobTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email='camera@example.com', username='camera')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_upload_stored_as_blob_and_not_listed(self):
+        for _ in range(2):
+            response = self.client.post('/api/mood/entries/', {
+                'emotion': 'happy', 'confidence': 0.8, 'emotions_breakdown': BREAKDOWN,
+                'image_data': DATA_URL,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        first, second = MoodEntry.objects.order_by('pk')
+        self.assertEqual(first.image_ref, second.image_ref)
+        self.assertTrue(first.image_ref.endswith('.jpg'))
+        self.assertEqual(first.image_size, len(IMAGE))
+        self.assertIsNone(MoodEntry.objects.defer(None).get(pk=first.pk).image_data)
+        with default_storage.open(first.image_ref) as blob:
+            self.assertEqual(blob.read(), IMAGE)
+
+        with CaptureQueriesContext(connection) as queries:
+            listing = self.client.get('/api/mood/entries/')
+        self.assertNotIn('image_data', ' '.join(q['sql'] for q in queries))
+        item = listing.data['results'][0]
+        self.assertNotIn('image_data', item)
+        self.assertTrue(item['image_url'].endswith(first.image_ref))
+
+    def test_migrate_command_moves_legacy_rows(self):
+        legacy = [
+            MoodEntry.objects.create(user=self.user, emotion='sad', confidence=0.4, image_data=DATA_URL)
+            for _ in range(3)
+        ]
+        untouched = MoodEntry.objects.create(user=self.user, emotion='sad', confidence=0.4)
+
+        call_command('migrate_mood_images', batch_size=2, stdout=StringIO())
+
+        for entry in legacy:
+            entry = MoodEntry.objects.defer(None).get(pk=entry.pk)
+            self.assertIsNone(entry.image_data)
+            self.assertEqual(entry.image_size, len(IMAGE))
+        self.assertEqual(MoodEntry.objects.get(pk=untouched.pk).image_ref, '')
+
+    def test_migration_loads_each_batch_in_one_query(self):
+        for _ in range(10):
+            MoodEntry.objects.create(user=self.user, emotion='sad', confidence=0.4, image_data=DATA_URL)
+
+        # Per batch of 5: one select and one update; then the empty select
+        with self.assertNumQueries(5):
+            call_command('migrate_mood_images', batch_size=5, stdout=StringIO())
@@ -0,0 +1,52 @@
+"""Tests for bulk notification fan-out on content publish."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from content.models import Article
+from notifications.fanout import fan_out_notification, iter_user_ids
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_FANOUT_ASYNC=False)
+class NotificationFanOutTest(TestCase):
+    """Fan-out writes one row per active user in batches after commit."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}')
+            for i in range(5)
+        ]
+        User.objects.create_user(email='inactive@example.com', username='inactive', is_active=False)
+        Notification.objects.all().delete()
+
+    def test_fan_out_writes_in_batches_and_reports(self):
+        """Should chunk inserts and report rows written."""
+        result = fan_out_notification(
+            iter_user_ids(),
+            notification_type='system_update',
+            title='Batch',
+            message='Hello',
+            batch_size=2,
+        )
+        self.assertEqual(result.rows_written, 5)
+        self.assertEqual(result.batches, 3)
+        self.assertGreaterEqual(result.duration, 0)
+        self.assertEqual(Notification.objects.filter(title='Batch').count(), 5)
+
+    def test_article_publish_fans_out_after_commit(self):
+        """Should not write rows until the publishing transaction commits."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Article.objects.create(
+                title='Sleep hygiene', excerpt='x', content='y',
+                author=self.users[0], is_published=True,
+            )
+            self.assertFalse(Notification.objects.filter(notification_type='content_recommendation').exists())
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            Notification.objects.filter(notification_type='content_recommendation').count(),
+            len(self.users),
+        )
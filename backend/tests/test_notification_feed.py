@@ -0,0 +1,147 @@
+"""Tests for the merged personal/broadcast notification feed."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import BroadcastNotification, BroadcastReceipt, Notification, NotificationCounter
+from notifications.utils import create_notification
+
+User = get_user_model()
+
+
+class NotificationFeedTest(TestCase):
+    """Broadcasts are stored once and merged into each user's feed."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='reader@example.com', username='reader')
+        self.other = User.objects.create_user(email='other@example.com', username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        create_notification(self.user, 'guide_message', 'Personal', 'Hi', priority='high')
+        self.broadcast = BroadcastNotification.objects.create(
+            notification_type='system_update', title='Broadcast', message='Update', priority='low'
+        )
+
+    def test_list_merges_personal_and_broadcast(self):
+        """Should return both sources with a combined unread count."""
+        response = self.client.get('/api/notifications/notifications/')
+        self.assertEqual(response.status_code, 200)
+        ids = {item['id'] for item in response.data['results']}
+        self.assertIn(f'b-{self.broadcast.id}', ids)
+        self.assertEqual(response.data['unread_count'], 2)
+        self.assertFalse(BroadcastReceipt.objects.exists())
+
+    def test_mark_read_and_dismiss_broadcast(self):
+        """Should track broadcast state per user without touching others."""
+        url = f'/api/notifications/notifications/b-{self.broadcast.id}/'
+        response = self.client.post(url + 'mark_read/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_read'])
+
+        unread = self.client.get('/api/notifications/notifications/unread/')
+        self.assertEqual(unread.data['count'], 1)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        feed = self.client.get('/api/notifications/notifications/')
+        self.assertEqual(feed.data['count'], 1)
+
+        other_client = APIClient()
+        other_client.force_authenticate(self.other)
+        other_feed = other_client.get('/api/notifications/notifications/')
+        self.assertEqual(other_feed.data['unread_count'], 1)
+
+    def test_mark_all_read_and_clear_all(self):
+        """Should cover broadcasts in bulk read and clear operations."""
+        response = self.client.post('/api/notifications/notifications/mark_all_read/')
+        self.assertEqual(response.data['count'], 2)
+
+        stats = self.client.get('/api/notifications/notifications/stats/')
+        self.assertEqual(stats.data['total'], 2)
+        self.assertEqual(stats.data['unread'], 0)
+        self.assertEqual(stats.data['by_priority'], {'high': 1, 'low': 1})
+
+        response = self.client.delete('/api/notifications/notifications/clear_all/')
+        self.assertEqual(response.data['count'], 2)
+        self.assertFalse(Notification.objects.filter(user=self.user).exists())
+        self.assertTrue(BroadcastReceipt.objects.get(user=self.user).is_dismissed)
+
+    def test_stats_is_a_single_query(self):
+        """Should aggregate totals and breakdowns in one query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/notifications/stats/')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['by_type'], {'guide_message': 1, 'system_update': 1})
+        stats_queries = [q for q in queries.captured_queries if 'notifications_notification' in q['sql']]
+        self.assertEqual(len(stats_queries), 1)
+
+    def test_unread_counter_follows_reads_and_deletes(self):
+        """Should keep the badge counter in step with personal notifications."""
+        badge = '/api/notifications/notifications/unread_count/'
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+
+        second = create_notification(self.user, 'achievement', 'Second', 'Well done')
+        self.assertEqual(self.client.get(badge).data['unread_count'], 3)
+
+        self.client.post(f'/api/notifications/notifications/{second.id}/mark_read/')
+        self.client.post(f'/api/notifications/notifications/{second.id}/mark_read/')
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+
+        self.client.post('/api/notifications/notifications/mark_all_read/')
+        self.assertEqual(self.client.get(badge).data['unread_count'], 0)
+
+    def test_read_state_only_changes_through_the_counter(self):
+        """Should ignore is_read in updates and leave already expired notifications out of the badge."""
+        badge = '/api/notifications/notifications/unread_count/'
+        personal = Notification.objects.get(user=self.user)
+        response = self.client.patch(
+            f'/api/notifications/notifications/{personal.id}/', {'is_read': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['is_read'])
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+
+        create_notification(
+            self.user, 'achievement', 'Stale', 'Gone', expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+        self.assertEqual(NotificationCounter.recalculate(self.user).unread_count, 1)
+
+    def test_badge_is_one_read_and_drops_notifications_as_they_expire(self):
+        """Should serve the badge from the counter row and recount only after an expiry."""
+        self.assertEqual(NotificationCounter.get_unread_count(self.user), 2)
+        expiring = create_notification(
+            self.user, 'achievement', 'Soon', 'Gone', expires_at=timezone.now() + timedelta(minutes=5)
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationCounter.get_unread_count(self.user), 3)
+
+        later = timezone.now() + timedelta(minutes=10)
+        with patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(NotificationCounter.get_unread_count(self.user), 2)
+            with self.assertNumQueries(1):
+                self.assertEqual(NotificationCounter.get_unread_count(self.user), 2)
+        # Expiry is not a read
+        self.assertFalse(Notification.objects.get(pk=expiring.pk).is_read)
+
+    def test_badge_follows_broadcasts_and_receipts(self):
+        """Should recount broadcasts after new broadcasts and the user's receipts."""
+        badge = '/api/notifications/notifications/unread_count/'
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+        second = BroadcastNotification.objects.create(
+            notification_type='system_update', title='Second', message='Update'
+        )
+        self.assertEqual(self.client.get(badge).data['unread_count'], 3)
+
+        self.client.post(f'/api/notifications/notifications/b-{second.id}/mark_read/')
+        self.assertEqual(self.client.get(badge).data['unread_count'], 2)
+        self.client.delete(f'/api/notifications/notifications/b-{self.broadcast.id}/')
+        self.assertEqual(self.client.get(badge).data['unread_count'], 1)
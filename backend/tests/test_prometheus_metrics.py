@@ -0,0 +1,128 @@
+"""Tests for the Prometheus text exposition endpoint at /metrics."""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend import metrics
+
+User = get_user_model()
+
+
+class PrometheusMetricsTest(TestCase):
+
+    def setUp(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        settings_override = override_settings(METRICS_DIR=metrics_dir, METRICS_BEARER_TOKEN='secret')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        registry_patch = patch.object(metrics, 'registry', metrics.MetricsRegistry())
+        self.registry = registry_patch.start()
+        self.addCleanup(registry_patch.stop)
+
+        self.user = User.objects.create_user(email='scrape@example.com', username='scrape')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self, **headers):
+        headers.setdefault('HTTP_AUTHORIZATION', 'Bearer secret')
+        response = self.client.get('/metrics', **headers)
+        return response, response.content.decode().splitlines()
+
+    def test_exposes_route_latency_status_db_and_process_metrics(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/mood/stats/').status_code, 200)
+
+        response, lines = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn('# TYPE http_requests_total counter', lines)
+        self.assertIn('http_requests_total{method="GET",route="mood:mood-stats",status="200"} 2', lines)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', lines)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{method="GET",route="mood:mood-stats",le="+Inf"} 2', lines
+        )
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="mood:mood-stats"} 2', lines)
+        self.assertIn('http_request_db_queries_count{route="mood:mood-stats"} 2', lines)
+        self.assertIn('metrics_workers 1', lines)
+        # The stats view queries the database on every request
+        self.assertIn('http_request_db_queries_bucket{route="mood:mood-stats",le="0"} 0', lines)
+        self.assertTrue(any(
+            line.startswith(f'process_resident_memory_bytes{{pid="{os.getpid()}"}} ') for line in lines
+        ))
+        self.assertIn('# TYPE process_cpu_seconds gauge', lines)
+
+    def test_bucket_lines_are_cumulative_and_ordered(self):
+        for seconds in (0.004, 0.004, 0.3):
+            self.registry.observe('job_seconds', seconds, queue='q')
+        _, lines = self.scrape()
+        buckets = [line for line in lines if line.startswith('job_seconds_bucket')]
+        self.assertEqual(buckets[0], 'job_seconds_bucket{queue="q",le="0.005"} 2')
+        self.assertEqual(buckets[-1], 'job_seconds_bucket{queue="q",le="+Inf"} 3')
+        counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+        self.assertEqual(counts, sorted(counts))
+        self.assertIn('# TYPE job_seconds untyped', lines)
+
+    def test_cache_hits_and_misses_are_counted(self):
+        cache.set('metrics-test', 1)
+        cache.get('metrics-test')
+        cache.get_many(['metrics-test', 'metrics-absent'])
+        self.assertIsNone(cache.get('metrics-absent'))
+        _, lines = self.scrape()
+        self.assertIn('cache_requests_total{result="hit"} 2', lines)
+        self.assertIn('cache_requests_total{result="miss"} 2', lines)
+
+    def test_other_worker_snapshots_are_merged(self):
+        self.registry.inc(metrics.REQUESTS_TOTAL, route='r', method='GET', status='200')
+        self.registry.gauge_add(metrics.QUEUE_DEPTH, 3, queue='mood_analysis')
+        other = self.registry.snapshot()
+        other['pid'] = -1
+        with open(os.path.join(metrics.metrics_dir(), 'metrics--1.json'), 'w') as handle:
+            json.dump(other, handle)
+
+        _, lines = self.scrape()
+        self.assertIn('http_requests_total{method="GET",route="r",status="200"} 2', lines)
+        self.assertIn('background_queue_depth{queue="mood_analysis"} 6', lines)
+        self.assertIn('metrics_workers 2', lines)
+
+    def test_exited_workers_keep_their_counters_but_not_their_gauges(self):
+        self.registry.inc(metrics.REQUESTS_TOTAL, route='r', method='GET', status='200')
+        self.registry.gauge_add(metrics.QUEUE_DEPTH, 3, queue='mood_analysis')
+        directory = metrics.metrics_dir()
+        for pid in (-1, -2):
+            snapshot = dict(self.registry.snapshot(), pid=pid, updated=time.time() - 3600)
+            metrics.write_snapshot('metrics', snapshot)
+            _, lines = self.scrape()
+            self.assertFalse(os.path.exists(os.path.join(directory, f'metrics-{pid}.json')))
+
+        self.assertEqual(sorted(os.listdir(directory)), ['metrics-0.json', 'metrics-archive.lock'])
+        # The live worker's request plus one from each exited worker
+        self.assertIn('http_requests_total{method="GET",route="r",status="200"} 3', lines)
+        self.assertIn('background_queue_depth{queue="mood_analysis"} 3', lines)
+        self.assertIn('metrics_workers 1', lines)
+
+    def test_bearer_token_or_staff_is_required(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='')[0].status_code, 401)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer secrets')[0].status_code, 401)
+
+        user_token = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION=f'Bearer {user_token}')[0].status_code, 401)
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION=f'Bearer {user_token}')[0].status_code, 200)
+
+    @override_settings(METRICS_BEARER_TOKEN='')
+    def test_unset_token_does_not_open_the_endpoint(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer ')[0].status_code, 401)
+        with override_settings(METRICS_AUTH_DISABLED=True):
+            self.assertEqual(self.scrape(HTTP_AUTHORIZATION='')[0].status_code, 200)
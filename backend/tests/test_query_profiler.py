@@ -0,0 +1,110 @@
+"""Tests for the sampled per-request query profiler and its report."""
+
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from backend import metrics, query_profiler
+from backend.query_profiler import QueryProfiler, fingerprint
+
+User = get_user_model()
+
+
+class FingerprintTest(TestCase):
+
+    def test_literals_placeholders_and_in_lists_are_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT "a"."id" FROM "a"\n WHERE "a"."id" IN (%s, %s, %s) AND name = \'x\' LIMIT 21'),
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) AND name = ? LIMIT ?',
+        )
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id = %s'), fingerprint('SELECT * FROM t WHERE id = 7'))
+
+
+@override_settings(DEBUG=False)
+class QueryProfilerTest(TestCase):
+
+    def setUp(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        settings_override = override_settings(METRICS_DIR=metrics_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        profiler_patch = patch.object(query_profiler, 'profiler', QueryProfiler())
+        self.profiler = profiler_patch.start()
+        self.addCleanup(profiler_patch.stop)
+        self.users = [User.objects.create_user(email=f'p{i}@example.com', username=f'p{i}') for i in range(8)]
+
+    def list_users(self, count, per_item_query):
+        self.assertTrue(self.profiler.start(rate=1))
+        users = list(User.objects.order_by('id')[:count])
+        if per_item_query:
+            for user in users:
+                User.objects.filter(pk=user.pk).exists()
+        return self.profiler.finish('users', Response([user.pk for user in users]))
+
+    def test_unsampled_requests_are_not_recorded(self):
+        self.assertFalse(self.profiler.start(rate=0))
+        User.objects.count()
+        self.assertIsNone(self.profiler.finish('users'))
+        self.assertEqual(query_profiler.report(top=1)['routes'], [])
+
+    def test_routes_whose_queries_grow_with_results_are_flagged(self):
+        for count in (1, 2, 4, 6, 8):
+            self.assertEqual(self.list_users(count, per_item_query=True)[0], count + 1)
+
+        report = query_profiler.report(top=2)
+        self.assertEqual(report['flagged'], ['users'])
+        route = report['routes'][0]
+        self.assertEqual(route['sampled_requests'], 5)
+        self.assertEqual(route['max_queries'], 9)
+        self.assertAlmostEqual(route['queries_per_item'], 1.0)
+        # The per-item lookup is the most repeated fingerprint
+        self.assertEqual(route['top_fingerprints'][0]['executions'], 21)
+        self.assertEqual(route['top_fingerprints'][0]['max_per_request'], 8)
+        self.assertIn('LIMIT ?', route['top_fingerprints'][0]['sql'])
+
+    def test_constant_query_count_is_not_flagged(self):
+        for count in (1, 2, 4, 6, 8):
+            self.list_users(count, per_item_query=False)
+        report = query_profiler.report()
+        self.assertEqual(report['flagged'], [])
+        self.assertAlmostEqual(report['routes'][0]['queries_per_item'], 0.0)
+
+    def test_flushed_workers_are_merged(self):
+        self.list_users(2, per_item_query=False)
+        self.profiler.flush()
+        other = QueryProfiler()
+        with patch('backend.query_profiler.os.getpid', return_value=-1):
+            self.assertTrue(other.start(rate=1))
+            User.objects.count()
+            other.finish('users')
+            other.flush()
+        route = query_profiler.report()['routes'][0]
+        self.assertEqual(route['sampled_requests'], 2)
+        self.assertEqual(query_profiler.report()['workers'], 2)
+
+    @override_settings(QUERY_PROFILER_SAMPLE_RATE=1.0)
+    def test_middleware_profiles_sampled_requests_and_views_report(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        with patch.object(metrics, 'registry', metrics.MetricsRegistry()):
+            self.assertEqual(client.get('/api/mood/entries/').status_code, 200)
+        self.assertEqual(client.get('/monitoring/queries/').status_code, 401)
+        self.users[0].is_staff = True
+        self.users[0].save(update_fields=['is_staff'])
+        client.force_login(self.users[0])
+        response = client.get('/monitoring/queries/')
+        self.assertEqual(response.status_code, 200)
+        routes = {route['route']: route for route in response.json()['data']['routes']}
+        self.assertGreaterEqual(routes['mood:mood-entries']['avg_queries'], 1)
+
+        out = StringIO()
+        call_command('query_report', stdout=out)
+        self.assertIn('mood:mood-entries:', out.getvalue())
@@ -0,0 +1,143 @@
+"""Tests for the incrementally maintained assessment answer counters."""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from assessments.models import (
+    Assessment, AssessmentQuestion, AssessmentResponse, AssessmentType, QuestionOption
+)
+from assessments.response_tracking import QuestionResponseTracker
+
+User = get_user_model()
+
+
+class QuestionStatsTest(TestCase):
+
+    def setUp(self):
+        self.assessment_type = AssessmentType.objects.create(
+            name='GAD7', display_name='GAD-7', description='d', instructions='i', max_score=6
+        )
+        self.questions = []
+        for number in (1, 2):
+            question = AssessmentQuestion.objects.create(
+                assessment_type=self.assessment_type, question_number=number, question_text=f'Q{number}'
+            )
+            for score in range(4):
+                QuestionOption.objects.create(question=question, text=f'opt{score}', score=score, order=score)
+            self.questions.append(question)
+        self.user = User.objects.create_user(email='answers@example.com', username='answers', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def submit(self, *indexes):
+        response = self.client.post('/api/assessments/take/', {
+            'assessment_type_id': self.assessment_type.id,
+            'responses': [
+                {'question_id': question.id, 'selected_option_index': index}
+                for question, index in zip(self.questions, indexes)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Assessment.objects.get(pk=response.data['id'])
+
+    def test_submissions_update_counters_and_analytics_reads_them(self):
+        self.submit(1, 3)
+        self.submit(3, 3)
+        first = AssessmentQuestion.objects.get(pk=self.questions[0].pk)
+        self.assertEqual((first.response_count, first.response_score_sum), (2, 4))
+        self.assertEqual(self.assessment_type.__class__.objects.get(pk=self.assessment_type.pk).assessment_count, 2)
+
+        with self.assertNumQueries(2):
+            analytics = QuestionResponseTracker.get_real_time_question_analytics(
+                assessment_type_id=self.assessment_type.id
+            )
+        self.assertEqual(analytics['total_responses'], 4)
+        by_question = {entry['question_id']: entry for entry in analytics['questions']}
+        self.assertEqual(by_question[first.pk]['average_score'], 2.0)
+        self.assertEqual(by_question[first.pk]['option_distribution'], {'opt0': 0, 'opt1': 1, 'opt2': 0, 'opt3': 1})
+        self.assertEqual(by_question[first.pk]['option_percentages']['opt3'], 50.0)
+
+        response = self.client.get('/api/assessments/questions/completion_rates/')
+        self.assertEqual(response.status_code, 200)
+        rates = {entry['assessment_type']: entry for entry in response.data['assessment_types']}
+        self.assertEqual(rates['GAD7']['total_completed'], 2)
+        self.assertEqual(rates['GAD7']['average_score'], 5.0)
+
+    def test_changed_and_deleted_answers_move_counters(self):
+        assessment = self.submit(0, 0)
+        response = AssessmentResponse.objects.get(assessment=assessment, question=self.questions[0])
+        option = QuestionOption.objects.get(question=self.questions[0], score=2)
+        QuestionResponseTracker.track_question_response(
+            assessment.id, self.questions[0].id, self.user.id, option, 2
+        )
+        counts = dict(QuestionOption.objects.filter(question=self.questions[0]).values_list('score', 'response_count'))
+        self.assertEqual(counts, {0: 0, 1: 0, 2: 1, 3: 0})
+        self.assertEqual(AssessmentQuestion.objects.get(pk=self.questions[0].pk).response_score_sum, 2)
+
+        # Editing a stale question instance keeps the counters
+        self.questions[0].question_text = 'Edited'
+        self.questions[0].save()
+        self.assertEqual(AssessmentQuestion.objects.get(pk=self.questions[0].pk).response_count, 1)
+
+        assessment.delete()
+        self.assertFalse(AssessmentResponse.objects.filter(pk=response.pk).exists())
+        self.assertEqual(
+            list(AssessmentQuestion.objects.values_list('response_count', 'response_score_sum')), [(0, 0), (0, 0)]
+        )
+        self.assertEqual(AssessmentType.objects.get(pk=self.assessment_type.pk).assessment_count, 0)
+
+    def test_bulk_delete_releases_counters_and_fast_deletes_responses(self):
+        self.submit(1, 3)
+        self.submit(2, 0)
+        table = AssessmentResponse._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            Assessment.objects.all().delete()
+        response_queries = [q['sql'] for q in queries.captured_queries if f'FROM "{table}"' in q['sql']]
+        # One read per assessment for the counters, then a fast delete of
+        # every response row by assessment instead of by collected pk
+        self.assertEqual(len(response_queries), 3)
+        self.assertTrue(response_queries[-1].startswith('DELETE'))
+        self.assertIn('"assessment_id" IN', response_queries[-1])
+        self.assertFalse(AssessmentResponse.objects.exists())
+
+        self.assertEqual(
+            list(AssessmentQuestion.objects.values_list('response_count', 'response_score_sum')), [(0, 0), (0, 0)]
+        )
+        self.assertFalse(QuestionOption.objects.exclude(response_count=0).exists())
+        assessment_type = AssessmentType.objects.get(pk=self.assessment_type.pk)
+        self.assertEqual((assessment_type.assessment_count, assessment_type.assessment_score_sum), (0, 0))
+
+    def test_deleting_an_option_releases_its_responses(self):
+        self.submit(1, 3)
+        self.submit(1, 2)
+        QuestionOption.objects.get(question=self.questions[0], score=1).delete()
+        self.assertEqual(AssessmentResponse.objects.filter(question=self.questions[0]).count(), 0)
+        self.assertEqual(
+            list(AssessmentQuestion.objects.order_by('pk').values_list('response_count', 'response_score_sum')),
+            [(0, 0), (2, 5)]
+        )
+
+        # Deleting a question cascades through its options
+        self.questions[1].delete()
+        self.assertFalse(AssessmentResponse.objects.exists())
+
+    def test_rebuild_command_fixes_drift(self):
+        self.submit(2, 1)
+        AssessmentQuestion.objects.update(response_count=9, response_score_sum=0)
+        QuestionOption.objects.update(response_count=0)
+        out = StringIO()
+        call_command('rebuild_question_stats', stdout=out)
+        self.assertIn('AssessmentQuestion: 2 row(s) corrected', out.getvalue())
+        self.assertEqual(
+            list(AssessmentQuestion.objects.order_by('pk').values_list('response_count', 'response_score_sum')),
+            [(1, 2), (1, 1)]
+        )
+        self.assertEqual(QuestionOption.objects.filter(response_count=1).count(), 2)
+        call_command('rebuild_question_stats', stdout=out)
+        self.assertIn('QuestionOption: 0 row(s) corrected', out.getvalue())
@@ -0,0 +1,123 @@
+"""Tests for the realtime push broker and model event publishing."""
+
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from community.models import ChatMessage, ChatRoom, ChatRoomParticipant
+from realtime.broker import LocalBroker, get_broker
+from realtime.signals import chat_channel, user_channel
+
+User = get_user_model()
+
+
+class LocalBrokerTest(TestCase):
+    """Delivery, resume-from-cursor and reset behaviour."""
+
+    def test_subscriber_receives_only_its_channels(self):
+        broker = LocalBroker(history_size=10)
+
+        async def run():
+            subscription = broker.subscribe({'chat:1'})
+            broker.publish('chat:2', 'chat.message', {'id': 1})
+            broker.publish('chat:1', 'chat.message', {'id': 2})
+            event = await subscription.get(timeout=1)
+            subscription.close()
+            return event
+
+        event = async_to_sync(run)()
+        self.assertEqual(event.data, {'id': 2})
+
+    def test_resume_replays_missed_events(self):
+        broker = LocalBroker(history_size=10)
+        first = broker.publish('chat:1', 'chat.message', {'id': 1})
+        broker.publish('chat:1', 'chat.message', {'id': 2})
+        broker.publish('chat:2', 'chat.message', {'id': 3})
+
+        async def run():
+            subscription = broker.subscribe({'chat:1'}, cursor=broker.format_cursor(first))
+            event = await subscription.get(timeout=1)
+            subscription.close()
+            return subscription, event
+
+        subscription, event = async_to_sync(run)()
+        self.assertFalse(subscription.needs_reset)
+        self.assertEqual(event.data, {'id': 2})
+
+    def test_expired_or_foreign_cursor_requests_reset(self):
+        broker = LocalBroker(history_size=2)
+        first = broker.publish('chat:1', 'chat.message', {'id': 1})
+        for i in range(3):
+            broker.publish('chat:1', 'chat.message', {'id': i})
+
+        async def run(cursor):
+            subscription = broker.subscribe({'chat:1'}, cursor=cursor)
+            subscription.close()
+            return subscription.needs_reset
+
+        self.assertTrue(async_to_sync(run)(broker.format_cursor(first)))
+        self.assertTrue(async_to_sync(run)('otherepoch-3'))
+
+
+class RealtimePublishingTest(TestCase):
+    """Model writes are published once the transaction commits."""
+
+    def test_chat_message_published_after_commit(self):
+        from realtime.broker import get_broker
+
+        user = User.objects.create_user(email='chat@example.com', username='chat')
+        room = ChatRoom.objects.create(name='Room', description='d', creator=user)
+        ChatRoomParticipant.objects.create(room=room, user=user)
+
+        broker = get_broker()
+        with self.captureOnCommitCallbacks(execute=True):
+            message = ChatMessage.objects.create(room=room, author=user, content='hi')
+
+        event = broker._history[-1]
+        self.assertEqual(event.channel, chat_channel(room.id))
+        self.assertEqual(event.type, 'chat.message')
+        self.assertEqual(event.data['id'], message.id)
+
+    def test_stream_is_disabled_by_default(self):
+        response = self.client.get('/api/realtime/stream/')
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(PUSH_STREAM_ENABLED=True)
+    def test_stream_requires_asgi(self):
+        response = self.client.get('/api/realtime/stream/')
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(PUSH_STREAM_ENABLED=True, PUSH_HEARTBEAT_SECONDS=5)
+class RealtimeStreamTest(TestCase):
+    """The ASGI stream delivers events published to the user's channels."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='stream@example.com', username='stream')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def test_stream_receives_published_events(self):
+        response = await self.async_client.get('/api/realtime/stream/', {'token': self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        try:
+            # The subscription is registered once the stream starts
+            self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+            event = get_broker().publish(user_channel(self.user.id), 'notification.created', {'id': 7})
+            chunk = (await anext(stream)).decode()
+        finally:
+            await stream.aclose()
+
+        lines = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+        self.assertEqual(lines['id'], get_broker().format_cursor(event))
+        self.assertEqual(lines['event'], 'notification.created')
+        self.assertEqual(json.loads(lines['data']), {'channel': user_channel(self.user.id), 'data': {'id': 7}})
+
+    async def test_stream_rejects_missing_token(self):
+        response = await self.async_client.get('/api/realtime/stream/')
+        self.assertEqual(response.status_code, 401)
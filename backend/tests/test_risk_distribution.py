@@ -0,0 +1,47 @@
+"""Tests for the set-based latest-assessment risk distribution."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from assessments.management.commands.benchmark_risk_distribution import legacy_risk_distribution
+from assessments.models import Assessment, AssessmentType
+from assessments.risk import risk_distribution
+
+User = get_user_model()
+
+
+class RiskDistributionTest(TestCase):
+    """One grouped query, same output as the per-user loop."""
+
+    def setUp(self):
+        self.assessment_type = AssessmentType.objects.create(
+            name='PHQ9', display_name='PHQ-9', description='d', instructions='i'
+        )
+        now = timezone.now()
+        # Newest assessment first
+        levels = [['low', 'high'], ['critical'], ['HIGH', 'medium'], ['severe'], [''], []]
+        for i, history in enumerate(levels):
+            user = User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}')
+            for age, level in enumerate(history):
+                assessment = Assessment.objects.create(
+                    user=user, assessment_type=self.assessment_type, total_score=1,
+                    risk_level=level, interpretation='-'
+                )
+                Assessment.objects.filter(pk=assessment.pk).update(completed_at=now - timedelta(days=age))
+
+    def test_matches_legacy_loop(self):
+        users = User.objects.filter(role='user')
+        with CaptureQueriesContext(connection) as queries:
+            result = risk_distribution(users, unassessed_as_low=True)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(result, legacy_risk_distribution(users))
+        self.assertEqual(result, {'lowRisk': 3, 'mediumRisk': 0, 'highRisk': 1, 'criticalRisk': 1})
+
+    def test_unassessed_users_skipped_for_guides(self):
+        result = risk_distribution(User.objects.filter(role='user'))
+        self.assertEqual(result, {'lowRisk': 1, 'mediumRisk': 0, 'highRisk': 1, 'criticalRisk': 1})
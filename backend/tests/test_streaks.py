@@ -0,0 +1,132 @@
+"""Streak engine matches the previous day-by-day implementations."""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Avg, Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from mood.models import MoodEntry as CameraMoodEntry
+from mood.views import calculate_mood_streak, get_mood_trend_data
+from wellness.enhanced_views import MoodEntryViewSet
+from wellness.models import MoodEntry
+
+User = get_user_model()
+
+
+def legacy_mood_streak(user):
+    """mood.views.calculate_mood_streak before the streak engine"""
+    current_date = timezone.now().date()
+    streak = 0
+    while True:
+        if CameraMoodEntry.objects.filter(user=user, timestamp__date=current_date).exists():
+            streak += 1
+            current_date -= timedelta(days=1)
+        else:
+            break
+        if streak > 365:
+            break
+    return streak
+
+
+def legacy_consecutive_mood_days(user):
+    """MoodEntryViewSet.get_consecutive_mood_days before the streak engine"""
+    today = timezone.now().date()
+    consecutive_days = 0
+    for i in range(365):
+        if MoodEntry.objects.filter(user=user, date=today - timedelta(days=i)).exists():
+            consecutive_days += 1
+        else:
+            break
+    return consecutive_days
+
+
+def legacy_mood_trend_data(user, days):
+    """mood.views.get_mood_trend_data before bucketing (dominant emotion ties aside)"""
+    end_date = timezone.now().date()
+    current_date = end_date - timedelta(days=days - 1)
+    trend_data = []
+    while current_date <= end_date:
+        day_entries = CameraMoodEntry.objects.filter(user=user, timestamp__date=current_date)
+        if day_entries.exists():
+            avg_confidence = day_entries.aggregate(avg=Avg('confidence'))['avg']
+            dominant_emotion = day_entries.values('emotion').annotate(
+                count=Count('emotion')
+            ).order_by('-count').first()['emotion']
+        else:
+            avg_confidence = None
+            dominant_emotion = None
+        trend_data.append({
+            'date': current_date.isoformat(),
+            'average_confidence': round(avg_confidence, 3) if avg_confidence else None,
+            'dominant_emotion': dominant_emotion,
+            'entry_count': day_entries.count()
+        })
+        current_date += timedelta(days=1)
+    return trend_data
+
+
+class StreakEngineTest(TestCase):
+    """Constant-query streaks and daily series agree with the old loops."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='streak@example.com', username='streak')
+        self.now = timezone.now()
+
+    def add_camera_entries(self, days_ago):
+        for offset in days_ago:
+            entry = CameraMoodEntry.objects.create(user=self.user, emotion='happy', confidence=0.5)
+            CameraMoodEntry.objects.filter(pk=entry.pk).update(timestamp=self.now - timedelta(days=offset))
+
+    def add_wellness_entries(self, days_ago):
+        for offset in days_ago:
+            MoodEntry.objects.create(
+                user=self.user, mood_rating=3, energy_level=3, anxiety_level=3, sleep_quality=3,
+                date=self.now.date() - timedelta(days=offset)
+            )
+
+    def test_matches_legacy_on_patterns(self):
+        rng = random.Random(7)
+        patterns = [
+            [],
+            [1, 2, 3],
+            [0, 0, 1, 2, 4],
+            [0, 1, 2, 3, 4, 5, 6, 9],
+            sorted(rng.sample(range(20), 12)),
+        ]
+        for days_ago in patterns:
+            with self.subTest(days_ago=days_ago):
+                CameraMoodEntry.objects.all().delete()
+                MoodEntry.objects.all().delete()
+                self.add_camera_entries(days_ago)
+                self.add_wellness_entries(sorted(set(days_ago)))
+                self.assertEqual(calculate_mood_streak(self.user), legacy_mood_streak(self.user))
+                self.assertEqual(
+                    MoodEntryViewSet().get_consecutive_mood_days(self.user),
+                    legacy_consecutive_mood_days(self.user)
+                )
+
+    def test_caps_match_legacy_with_single_query(self):
+        self.add_camera_entries(range(370))
+        self.add_wellness_entries(range(370))
+
+        with CaptureQueriesContext(connection) as queries:
+            mood_streak = calculate_mood_streak(self.user)
+            wellness_streak = MoodEntryViewSet().get_consecutive_mood_days(self.user)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(mood_streak, legacy_mood_streak(self.user))
+        self.assertEqual(wellness_streak, legacy_consecutive_mood_days(self.user))
+        self.assertEqual((mood_streak, wellness_streak), (366, 365))
+
+    def test_trend_data_matches_legacy(self):
+        self.add_camera_entries([0, 0, 0, 2, 5, 5, 40])
+        CameraMoodEntry.objects.filter(pk=CameraMoodEntry.objects.order_by('pk').first().pk).update(emotion='sad')
+
+        with CaptureQueriesContext(connection) as queries:
+            trend = get_mood_trend_data(self.user, 30)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(trend, legacy_mood_trend_data(self.user, 30))
@@ -0,0 +1,66 @@
+"""Tests for the background system sampler and the views reading from it."""
+
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from backend import system_sampler
+from backend.system_sampler import SystemSampler
+
+
+def non_blocking_cpu_percent(interval=None):
+    assert interval is None, "cpu_percent must not block"
+    return 42.0
+
+
+@patch('backend.system_sampler.psutil.cpu_percent', non_blocking_cpu_percent)
+class SystemSamplerTest(SimpleTestCase):
+
+    def sampler(self, **kwargs):
+        sampler = SystemSampler(**kwargs)
+        self.addCleanup(sampler.stop)
+        return sampler
+
+    def test_latest_leaves_cpu_to_the_thread_when_buffer_empty(self):
+        sampler = self.sampler(interval=3600)
+        with patch.object(sampler, 'start'), \
+                patch('backend.system_sampler.psutil.cpu_percent') as cpu_percent:
+            snapshot = sampler.latest()
+        # Reading on the request thread would reset the sampler's baseline
+        cpu_percent.assert_not_called()
+        self.assertIsNone(snapshot.cpu_percent)
+        self.assertGreater(snapshot.memory_total, 0)
+        self.assertEqual(sampler.history(), [])
+
+        recorded = sampler.record()
+        self.assertEqual(recorded.cpu_percent, 42.0)
+        self.assertIs(sampler.latest(), recorded)
+
+    def test_ring_buffer_keeps_most_recent_samples(self):
+        sampler = self.sampler(interval=3600, history=3)
+        recorded = [sampler.record() for _ in range(5)]
+        self.assertEqual(sampler.history(), recorded[-3:])
+        self.assertEqual(sampler.history(seconds=0), [])
+
+    def test_thread_fills_buffer_and_restarts_after_fork(self):
+        sampler = self.sampler(interval=0.01)
+        sampler.start()
+        first_thread = sampler._thread
+        deadline = time.time() + 5
+        while len(sampler.history()) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(sampler.history()), 2)
+
+        # A forked worker sees a different pid and starts its own thread
+        sampler._pid = -1
+        sampler.start()
+        self.assertIsNot(sampler._thread, first_thread)
+
+    def test_system_metrics_view_reads_sampler(self):
+        sampler = self.sampler(interval=3600)
+        sampler.record()
+        with patch.object(system_sampler, '_sampler', sampler):
+            response = self.client.get('/monitoring/system/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['cpu']['percent'], 42.0)
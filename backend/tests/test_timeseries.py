@@ -0,0 +1,123 @@
+"""Tests for the embedded performance-trends time-series store."""
+
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from backend import metrics, timeseries
+from backend.timeseries import DAY, HOUR, MINUTE, Point, Recorder, TimeSeriesStore
+
+NOW = 1_700_000_000 - 1_700_000_000 % HOUR + 30 * MINUTE + 5
+
+
+def histogram(counts=None):
+    """Histogram counts from ``{bucket upper bound: count}`` (``float('inf')`` for +Inf)"""
+    counts = counts or {}
+    return [counts.get(bound, 0) for bound in list(metrics.LATENCY_BUCKETS) + [float('inf')]]
+
+
+def collected(requests, errors, latency_sum, counts):
+    return {
+        'counters': {
+            (metrics.REQUESTS_TOTAL, (('method', 'GET'), ('route', 'r'), ('status', '200'))): requests - errors,
+            (metrics.REQUESTS_TOTAL, (('method', 'GET'), ('route', 'r'), ('status', '503'))): errors,
+        },
+        'histograms': {
+            (metrics.REQUEST_DURATION, (('method', 'GET'), ('route', 'r'))):
+                (metrics.LATENCY_BUCKETS, counts, latency_sum),
+        },
+        'gauges': {},
+    }
+
+
+class TimeSeriesStoreTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'trends.sqlite3')
+        self.store = TimeSeriesStore(self.path)
+
+    def point(self, requests, errors=0, cpu=None):
+        return Point(
+            requests=requests, errors=errors, latency_sum=requests * 0.02,
+            histogram=histogram({0.025: requests}), cpu_percent=cpu, memory_percent=cpu,
+        )
+
+    def test_percentile_interpolates_within_buckets(self):
+        counts = histogram({0.01: 50, 0.1: 45, 1.0: 5})
+        buckets = metrics.LATENCY_BUCKETS
+        self.assertAlmostEqual(timeseries.percentile(buckets, counts, 0.5), 0.01)
+        self.assertAlmostEqual(timeseries.percentile(buckets, counts, 0.95), 0.1)
+        self.assertAlmostEqual(timeseries.percentile(buckets, counts, 0.99), 0.5 + 0.5 * 4 / 5)
+        self.assertEqual(timeseries.percentile(buckets, histogram({float('inf'): 3}), 0.5), buckets[-1])
+        self.assertIsNone(timeseries.percentile(buckets, histogram(), 0.5))
+
+    def test_minutes_roll_up_into_five_minute_and_hourly_points(self):
+        start = NOW - NOW % HOUR
+        for minute in range(7):
+            self.store.write(start + minute * MINUTE, self.point(10, errors=minute % 2, cpu=minute), now=NOW)
+
+        day = self.store.query(24, now=NOW)
+        self.assertEqual(day['resolution'], MINUTE)
+        self.assertEqual(len(day['timestamps']), 7)
+        self.assertEqual(day['error_rates'][:2], [0.0, 0.1])
+        self.assertAlmostEqual(day['request_rates'][0], 10 / 60)
+        self.assertAlmostEqual(day['response_time_percentiles']['p50'][0], 0.0175)
+
+        week = self.store.query(7 * 24, now=NOW)
+        self.assertEqual(week['resolution'], 5 * MINUTE)
+        self.assertEqual(week['timestamps'], [start, start + 5 * MINUTE])
+        self.assertAlmostEqual(week['request_rates'][0], 50 / 300)
+        self.assertEqual(week['cpu_usage'], [2.0, 5.5])
+        self.assertAlmostEqual(week['response_times'][0], 0.02)
+
+        month = self.store.query(30 * 24, now=NOW)
+        self.assertEqual(month['resolution'], HOUR)
+        self.assertEqual(month['timestamps'], [start])
+        self.assertAlmostEqual(month['error_rates'][0], 3 / 70)
+
+    def test_retention_is_bounded_per_resolution(self):
+        old = NOW - 3 * DAY
+        self.store.write(old - old % HOUR, self.point(1), now=old)
+        self.store.write(NOW - NOW % MINUTE, self.point(1), now=NOW)
+        self.assertEqual(len(self.store.query(30 * 24, now=NOW)['timestamps']), 2)
+        self.assertEqual(len(self.store.query(7 * 24, now=NOW)['timestamps']), 2)
+        # The old minute point is past its two-day retention
+        self.assertEqual(self.store.query(48, now=NOW)['timestamps'], [NOW - NOW % MINUTE])
+
+    def test_recorder_writes_deltas_of_merged_totals(self):
+        recorder = Recorder(self.store)
+        self.assertIsNone(recorder.tick(now=NOW, collected=collected(10, 0, 0.1, histogram({0.01: 10}))))
+
+        point = recorder.tick(now=NOW + MINUTE, collected=collected(
+            30, 2, 1.1, histogram({0.01: 12, 0.5: 18})
+        ))
+        self.assertEqual((point.requests, point.errors), (20, 2))
+        self.assertAlmostEqual(point.latency_sum, 1.0)
+        self.assertEqual(sum(point.histogram), 20)
+        minute = NOW - NOW % MINUTE
+        self.assertEqual(self.store.query(1, now=NOW + MINUTE)['timestamps'], [minute])
+
+        # Cleared metric files reset the counters; count from zero again
+        point = recorder.tick(now=NOW + 2 * MINUTE, collected=collected(4, 0, 0.04, histogram({0.01: 4})))
+        self.assertEqual(point.requests, 4)
+
+    def test_only_one_recorder_holds_the_lock(self):
+        first, second = Recorder(self.store), Recorder(self.store)
+        self.assertTrue(first.is_leader())
+        self.assertFalse(second.is_leader())
+        first._lock.release()
+        self.assertTrue(second.is_leader())
+        second._lock.release()
+
+    def test_trends_view_queries_store(self):
+        self.store.write(int(time.time()) // MINUTE * MINUTE - MINUTE, self.point(6, cpu=12.0))
+        with override_settings(TIMESERIES_PATH=self.path):
+            data = self.client.get('/monitoring/trends/?hours=1').json()['data']
+        self.assertEqual(data['resolution'], MINUTE)
+        self.assertEqual(data['cpu_usage'], [12.0])
+        self.assertEqual(data['request_rates'], [0.1])
@@ -10,6 +10,7 @@ from django.db.models import Avg, Count, Q, Sum
 from datetime import datetime, timedelta
 import json
 
+from backend.time_buckets import current_streak
 from .models import (
     MoodEntry, Achievement, UserAchievement, UserPoints,
     DailyChallenge, UserChallengeCompletion, WellnessTip, UserWellnessTip,
@@ -66,18 +67,8 @@ class MoodEntryViewSet(viewsets.ModelViewSet):
             self.award_achievement(user, "30_day_streak")
     
     def get_consecutive_mood_days(self, user):
-        """Calculate consecutive days of mood tracking"""
-        today = timezone.now().date()
-        consecutive_days = 0
-        
-        for i in range(365):  # Check up to a year
-            check_date = today - timedelta(days=i)
-            if MoodEntry.objects.filter(user=user, date=check_date).exists():
-                consecutive_days += 1
-            else:
-                break
-        
-        return consecutive_days
+        """Calculate consecutive days of mood tracking (up to a year)"""
+        return current_streak(MoodEntry.objects.filter(user=user), 'date', limit=365)
     
     def award_achievement(self, user, achievement_name):
         """Award achievement if not already earned"""
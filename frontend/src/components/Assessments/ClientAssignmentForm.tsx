@@ -69,21 +69,32 @@ export const ClientAssignmentForm: React.FC<ClientAssignmentFormProps> = ({
         setAssessmentTypes(assessmentData.results || assessmentData);
       }
 
-      // Fetch guide's clients
-      const clientsResponse = await fetch(`${API_BASE_URL}/guide/clients/`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json',
-        },
-      });
-      
-      if (clientsResponse.ok) {
+      // Fetch guide's clients; the roster is paginated, so follow `next`
+      // until every client is loaded
+      const allClients: Client[] = [];
+      let clientsUrl: string | null = `${API_BASE_URL}/guide/clients/?page_size=100`;
+      while (clientsUrl) {
+        const clientsResponse = await fetch(clientsUrl, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json',
+          },
+        });
+
+        if (!clientsResponse.ok) {
+          console.warn('Clients endpoint not available, using empty list');
+          allClients.length = 0;
+          break;
+        }
         const clientsData = await clientsResponse.json();
-        setClients(clientsData.results || clientsData);
-      } else {
-        console.warn('Clients endpoint not available, using empty list');
-        setClients([]);
+        if (!clientsData.results) {
+          allClients.push(...clientsData);
+          break;
+        }
+        allClients.push(...clientsData.results);
+        clientsUrl = clientsData.next;
       }
+      setClients(allClients);
     } catch (error) {
       console.error('Error fetching data:', error);
     }
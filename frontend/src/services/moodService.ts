@@ -41,6 +41,17 @@ export interface EmotionAnalysisResponse {
   processing_time: number;
 }
 
+export interface EmotionAnalysisJob extends Partial<EmotionAnalysisResponse> {
+  job_id: string;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  cached: boolean;
+  error?: string;
+  poll_url: string;
+}
+
+const ANALYSIS_POLL_INTERVAL_MS = 500;
+const ANALYSIS_POLL_TIMEOUT_MS = 20000;
+
 export interface MoodStats {
   total_entries: number;
   most_common_emotion: string;
@@ -63,7 +74,22 @@ class MoodService {
         include_breakdown: true
       };
 
-      const result = await apiClient.post<EmotionAnalysisResponse>('/mood/analyze/', requestData);
+      // The backend queues the analysis and returns a job to poll;
+      // recently analysed images come back completed straight away
+      let job = await apiClient.post<EmotionAnalysisJob>('/mood/analyze/', requestData);
+      const deadline = Date.now() + ANALYSIS_POLL_TIMEOUT_MS;
+      while (job.status === 'pending' || job.status === 'running') {
+        if (Date.now() > deadline) {
+          throw new Error('Emotion analysis timed out');
+        }
+        await new Promise(resolve => setTimeout(resolve, ANALYSIS_POLL_INTERVAL_MS));
+        job = await apiClient.get<EmotionAnalysisJob>(`/mood/analyze/${job.job_id}/`);
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Emotion analysis failed');
+      }
+
+      const result = job as EmotionAnalysisResponse & EmotionAnalysisJob;
       console.log('Emotion analysis result:', result);
       
       return result;